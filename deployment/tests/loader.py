@@ -0,0 +1,28 @@
+"""Load verifier-machine.py, which is not importable by its name."""
+import os
+import sys
+
+
+NAME = 'verifier_machine'
+PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'verifier-machine.py'
+)
+
+
+def load_script():
+    if NAME in sys.modules:
+        return sys.modules[NAME]
+
+    try:
+        from importlib.util import module_from_spec, spec_from_file_location
+    except ImportError:
+        # Python 2.
+        import imp
+        return imp.load_source(NAME, PATH)
+
+    spec = spec_from_file_location(NAME, PATH)
+    module = module_from_spec(spec)
+    sys.modules[NAME] = module
+    spec.loader.exec_module(module)
+    return module
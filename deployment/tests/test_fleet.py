@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from loader import load_script
+
+machine = load_script()
+
+
+# Stand-ins for docker and docker-machine, logging their calls (and the
+# docker host they were given) instead of running anything.
+DOCKER_STUB = '''#!/bin/sh
+echo "docker $DOCKER_HOST $*" >> "$STUB_LOG"
+if [ -n "$STUB_OUTPUT" ]; then
+    printf "$STUB_OUTPUT"
+fi
+if [ -n "$STUB_FAIL" ]; then
+    echo "$STUB_FAIL"
+    exit 1
+fi
+'''
+DOCKER_MACHINE_STUB = '''#!/bin/sh
+echo "docker-machine $*" >> "$STUB_LOG"
+echo "export DOCKER_TLS_VERIFY=\\"1\\""
+echo "export DOCKER_HOST=\\"tcp://$4:2376\\""
+echo "# Run this command to configure your shell:"
+'''
+
+PROFILES = {
+    'a': {
+        'machineId': 'm1', 'groups': ['eu'], 'dockerGroupId': '999',
+        'firebaseSecret': 'secret',
+    },
+    'b': {'machineId': 'm2', 'groups': ['us']},
+    'c': {'groups': ['eu', 'us']},
+}
+
+
+class TestFleetProfiles(unittest.TestCase):
+
+    def test_ids(self):
+        selected = machine.fleet_profiles(PROFILES, ['c', 'a'], None)
+        self.assertEqual(['c', 'a'], list(selected))
+
+    def test_group(self):
+        selected = machine.fleet_profiles(PROFILES, ['b'], 'eu')
+        self.assertEqual(['b', 'a', 'c'], list(selected))
+
+    def test_unknown(self):
+        with self.assertRaises(SystemExit):
+            machine.fleet_profiles(PROFILES, ['d'], None)
+
+
+class TestFleet(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.events = []
+
+    def action(self, profile_id, profile):
+        with self.lock:
+            self.events.append(('start', profile_id))
+        time.sleep(0.01)
+        if profile.get('fail'):
+            raise machine.FleetError('%s failed' % profile_id)
+        with self.lock:
+            self.events.append(('end', profile_id))
+        return 'done %s' % profile_id
+
+    def profiles(self, *ids, **profiles):
+        return machine.collections.OrderedDict(
+            (profile_id, profiles.get(profile_id, {})) for profile_id in ids
+        )
+
+    def test_run(self):
+        results = machine.Fleet(jobs=2).run(
+            self.profiles('a', 'b', 'c', 'd', d={'fail': True}), self.action
+        )
+
+        self.assertEqual(['a', 'b', 'c', 'd'], list(results))
+        self.assertEqual({'status': 'ok', 'output': 'done a'}, results['a'])
+        self.assertEqual(
+            {'status': 'failed', 'output': 'd failed'}, results['d']
+        )
+
+    def test_exit(self):
+        def action(profile_id, profile):
+            exit(128)
+
+        results = machine.Fleet().run(self.profiles('a'), action)
+        self.assertEqual(
+            {'status': 'failed', 'output': 'exit 128'}, results['a']
+        )
+
+    def test_rolling_order(self):
+        results = machine.Fleet(jobs=8).rolling(
+            self.profiles('a', 'b', 'c', 'd', 'e'), self.action, 2
+        )
+
+        self.assertEqual(['a', 'b', 'c', 'd', 'e'], list(results))
+        self.assertTrue(all(r['status'] == 'ok' for r in results.values()))
+        # Each batch ends before the next one starts.
+        batches = [set(['a', 'b']), set(['c', 'd']), set(['e'])]
+        for i, batch in enumerate(batches):
+            starts = [
+                n for n, (e, p) in enumerate(self.events)
+                if e == 'start' and p in batch
+            ]
+            ends = [
+                n for n, (e, p) in enumerate(self.events)
+                if e == 'end' and p in batch
+            ]
+            if i:
+                self.assertGreater(min(starts), previous_end)
+            previous_end = max(ends)
+
+    def test_rolling_stops_on_failure(self):
+        results = machine.Fleet().rolling(
+            self.profiles('a', 'b', 'c', 'd', b={'fail': True}),
+            self.action, 2
+        )
+
+        self.assertEqual(
+            ['ok', 'failed', 'skipped', 'skipped'],
+            [results[p]['status'] for p in 'abcd']
+        )
+        self.assertEqual(
+            set(['a', 'b']), set(p for _, p in self.events)
+        )
+
+
+class StubTestCase(unittest.TestCase):
+    """Run docker and docker-machine stubs from a temporary directory."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.environ = dict(os.environ)
+        self.dir = tempfile.mkdtemp()
+        for name, script in (
+            ('docker', DOCKER_STUB), ('docker-machine', DOCKER_MACHINE_STUB)
+        ):
+            path = os.path.join(self.dir, name)
+            with open(path, 'w') as fp:
+                fp.write(script)
+            os.chmod(path, 0o755)
+
+        self.log = os.path.join(self.dir, 'calls.log')
+        os.environ['STUB_LOG'] = self.log
+        os.environ['PATH'] = self.dir + os.pathsep + os.environ['PATH']
+        os.environ.pop('DOCKER_HOST', None)
+        os.environ.pop('STUB_FAIL', None)
+        os.environ.pop('STUB_OUTPUT', None)
+
+        os.chdir(self.dir)
+        with open('.singpath-verifiers.json', 'w') as fp:
+            json.dump(PROFILES, fp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        os.environ.clear()
+        os.environ.update(self.environ)
+        shutil.rmtree(self.dir)
+
+    def calls(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as fp:
+            return fp.read().splitlines()
+
+
+class TestFleetCommands(StubTestCase):
+
+    def test_machine_env(self):
+        env = machine.machine_env('m1')
+
+        self.assertEqual('tcp://m1:2376', env['DOCKER_HOST'])
+        self.assertEqual('1', env['DOCKER_TLS_VERIFY'])
+        self.assertEqual(self.log, env['STUB_LOG'])
+        self.assertEqual(['docker-machine env --shell sh m1'], self.calls())
+
+    def test_machine_env_local(self):
+        env = machine.machine_env(None)
+        self.assertNotIn('DOCKER_HOST', env)
+        self.assertEqual([], self.calls())
+
+    def test_command(self):
+        machine.fleet_command('pull', 'a', PROFILES['a'], ['-t', 'v2'])
+
+        self.assertEqual(
+            [
+                'docker-machine env --shell sh m1',
+                'docker tcp://m1:2376 pull singpath/verifier2:v2',
+            ],
+            self.calls()
+        )
+
+    def test_command_failure(self):
+        os.environ['STUB_FAIL'] = 'no such image'
+        with self.assertRaises(machine.FleetError) as ctx:
+            machine.fleet_command('pull', 'c', PROFILES['c'], [])
+        self.assertIn('no such image', str(ctx.exception))
+
+    def test_restart(self):
+        output = machine.fleet_restart(
+            'a', PROFILES['a'], ['-t', 'v2'], ['--max-worker', '3'],
+            logging.INFO
+        )
+
+        self.assertEqual('', output)
+        calls = self.calls()
+        # docker-machine env runs once; every command gets its host.
+        self.assertEqual('docker-machine env --shell sh m1', calls[0])
+        self.assertEqual(
+            'docker tcp://m1:2376 pull singpath/verifier2:v2', calls[1]
+        )
+        self.assertTrue(
+            calls[2].startswith('docker tcp://m1:2376 ps -a --filter ')
+        )
+        start = calls[3].split()
+        self.assertEqual(
+            ['docker', 'tcp://m1:2376', 'run', '-d'], start[:4]
+        )
+        self.assertIn('--group-add 999', calls[3])
+        self.assertIn('SINGPATH_MAX_WORKER=3', calls[3])
+        self.assertIn('SINGPATH_IMAGE_TAG=v2', calls[3])
+        self.assertIn('SINGPATH_FIREBASE_SECRET=secret', calls[3])
+        self.assertIn('--label singpath.profile=a', calls[3])
+        self.assertEqual(4, len(calls))
+
+
+class TestReplicaNames(StubTestCase):
+
+    def test_labels(self):
+        os.environ['STUB_OUTPUT'] = (
+            'verifier-foo-1\\tfoo\\n'
+            'verifier-foo-0\\tfoo\\n'
+            'verifier-foo-1-0\\tfoo-1\\n'
+            'verifier-foo-10\\tfoo\\n'
+        )
+        self.assertEqual(
+            ['verifier-foo-0', 'verifier-foo-1', 'verifier-foo-10'],
+            machine.replica_names('foo')
+        )
+
+    def test_other_profile(self):
+        # The "foo-1" profile container name looks like a "foo" replica.
+        os.environ['STUB_OUTPUT'] = 'verifier-foo-1\\tfoo-1\\n'
+        self.assertEqual([], machine.replica_names('foo'))
+        self.assertEqual(['verifier-foo-1'], machine.replica_names('foo-1'))
+
+    def test_unlabeled(self):
+        os.environ['STUB_OUTPUT'] = (
+            'verifier-foo\\t\\n'
+            'verifier-foo.bar\\t\\n'
+            'verifier-foo-bar\\t\\n'
+        )
+        self.assertEqual(['verifier-foo'], machine.replica_names('foo'))
+        self.assertEqual(
+            ['verifier-foo.bar'], machine.replica_names('foo.bar')
+        )
@@ -0,0 +1,118 @@
+import io
+import json
+import threading
+import unittest
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from loader import load_script
+
+machine = load_script()
+
+
+TASKS = u'''{"language": "python", "tests": ">>> a\\n1", "solution": "a = 1"}
+{"language": "python", "tests": ">>> a\\n1",
+
+{"language": "python", "tests": ">>> a\\n1"}
+{"language": "python", "tests": ">>> b\\n2", "solution": "b = 2"}
+'''
+TASK = {'language': 'python', 'tests': '>>> a\n1', 'solution': 'a = 1'}
+
+
+class FirebaseHandler(BaseHTTPRequestHandler):
+    """Stand-in for the Firebase REST API, recording the pushed tasks."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with server.lock:
+            server.requests.append((self.path, json.loads(body.decode())))
+            failing = server.failures > 0
+            server.failures -= 1
+
+        if failing:
+            self.reply(503, {'error': 'unavailable'})
+        else:
+            self.reply(200, {'name': '-K%d' % len(server.requests)})
+
+    def reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPush(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), FirebaseHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failures = 0
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/singpath/queues/default/tasks.json' % (
+            self.server.server_address[1]
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pusher(self, **kw):
+        return machine.Pusher(
+            self.url, 'secret', backoff=0, report_interval=60, **kw
+        )
+
+    def test_load_tasks_skips_invalid(self):
+        tasks = list(machine.load_tasks(io.StringIO(TASKS), 'jsonl'))
+        self.assertEqual(
+            ['a = 1', 'b = 2'], [task['solution'] for task in tasks]
+        )
+
+    def test_push(self):
+        pusher = self.pusher(concurrency=2)
+        pusher.push_all(machine.load_tasks(io.StringIO(TASKS), 'jsonl'))
+
+        self.assertEqual(2, pusher.pushed)
+        self.assertEqual(0, pusher.failed)
+        paths = set(path for path, _ in self.server.requests)
+        self.assertEqual(
+            set(['/singpath/queues/default/tasks.json?auth=secret']), paths
+        )
+        tasks = [task for _, task in self.server.requests]
+        self.assertEqual(
+            ['a = 1', 'b = 2'],
+            sorted(task['payload']['solution'] for task in tasks)
+        )
+        for task in tasks:
+            self.assertFalse(task['started'])
+            self.assertEqual(pusher.owner, task['owner'])
+            self.assertEqual({'.sv': 'timestamp'}, task['createdAt'])
+
+    def test_retry(self):
+        self.server.failures = 2
+        pusher = self.pusher(concurrency=1, retries=2)
+        pusher.push_all([TASK])
+
+        self.assertEqual(1, pusher.pushed)
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_give_up(self):
+        self.server.failures = 3
+        pusher = self.pusher(concurrency=1, retries=2)
+        pusher.push_all([TASK])
+
+        self.assertEqual(0, pusher.pushed)
+        self.assertEqual(1, pusher.failed)
@@ -26,12 +26,30 @@
 from __future__ import print_function
 
 import argparse
+import collections
 import getpass
 import json
 import logging
 import os
+import random
+import re
+import shlex
+import socket
 import subprocess
 import sys
+import threading
+import time
+import uuid
+
+try:
+    import httplib
+    from Queue import Empty, Queue
+    from urllib import urlencode
+    from urlparse import urlsplit
+except ImportError:
+    import http.client as httplib
+    from queue import Empty, Queue
+    from urllib.parse import urlencode, urlsplit
 
 
 DOCKER_GID_KEY = 'dockerGroupId'
@@ -41,6 +59,7 @@ FB_QUEUE_KEY = 'firebaseQueueName'
 FB_SECRET_KEY = 'firebaseSecret'
 MAX_WORKER_KEY = 'maxWorker'
 VERIFIER_TAG_KEY = 'verifierTag'
+GROUPS_KEY = 'groups'
 
 DEFAULT_SETTINGS = {
     FB_ID_KEY: 'singpath-play',
@@ -52,6 +71,28 @@ DEFAULT_SETTINGS = {
     VERIFIER_TAG_KEY: 'latest'
 }
 
+PUSH_CONCURRENCY = 8
+PUSH_RETRIES = 5
+PUSH_BACKOFF = 0.2
+PUSH_REPORT_INTERVAL = 5
+STATUS_INSPECT_FORMAT = (
+    '{{.Name}}\t{{.State.Status}}\t{{.HostConfig.CpusetCpus}}\t'
+    '{{range .Config.Env}}{{.}} {{end}}'
+)
+BENCH_VERIFY_CMD = 'docker run --rm {image}:{tag} verify'
+IMAGES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'images.json'
+)
+SAMPLES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'load-test', 'samples'
+)
+
+FLEET_JOBS = 8
+FLEET_COMMANDS = ('pull', 'start', 'stop', 'restart', 'docker-gid')
+MACHINE_ENV_LINE = re.compile(r'^export (\w+)="(.*)"$')
+# Label of the verifier containers started for a profile.
+PROFILE_LABEL = 'singpath.profile'
+
 SOCKET_PATH = '/var/run/docker.sock'
 SSH_CMD = ("""
 export DOCKER_GROUP_NAME=`ls -l %s | awk '{ print $4 }'`;
@@ -70,7 +111,8 @@ def main():
     logging.basicConfig(
         format='%(asctime)s - %(message)s', level=args.level
     )
-    args.func(args)
+    # Commands return the exit code of the docker command they ran, if any.
+    sys.exit(args.func(args))
 
 
 class Settings(object):
@@ -148,7 +190,11 @@ class Settings(object):
         self.docker_gid_parser(subparsers)
         self.start_parser(subparsers)
         self.stop_parser(subparsers)
+        self.status_parser(subparsers)
         self.push_parser(subparsers)
+        self.bench_parser(subparsers)
+        self.tune_parser(subparsers)
+        self.fleet_parser(subparsers)
 
         return parser
 
@@ -171,7 +217,6 @@ class Settings(object):
         )
 
     def init_parser(self, subparsers):
-        self.docker_gid_parser(subparsers)
         parser = subparsers.add_parser(
             'init',
             help='configure verifier',
@@ -229,6 +274,14 @@ class Settings(object):
         parser.add_argument('-c', '--max-worker')
         parser.add_argument('-i', '--interactive', action='store_true')
         parser.add_argument('-k', '--skip-build', action='store_true')
+        parser.add_argument(
+            '-r', '--replicas', type=int, default=1,
+            help=(
+                'Number of daemon containers to share the queue and the '
+                'max worker limit; each is pinned to its own CPUs and '
+                'memory slice'
+            )
+        )
         parser.set_defaults(
             func=start,
             firebase_id=self.get(FB_ID_KEY),
@@ -253,6 +306,20 @@ class Settings(object):
         parser.add_argument('-p', '--profile-id')
         parser.set_defaults(func=stop)
 
+    @staticmethod
+    def status_parser(subparsers):
+        parser = subparsers.add_parser(
+            'status',
+            help='show the verifier replicas',
+            description=(
+                'Show the verifier replicas and their share of the work - '
+                'docker should already be set to use the correct machine '
+                '(see `docker-machine env` on OS X / Windows).'
+            ),
+        )
+        parser.add_argument('-p', '--profile-id')
+        parser.set_defaults(func=status)
+
     def push_parser(self, subparsers):
         parser = subparsers.add_parser(
             'push',
@@ -265,7 +332,38 @@ class Settings(object):
         parser.add_argument('-S', '--firebase-auth-secret')
         parser.add_argument('-t', '--verifier-tag')
         parser.add_argument(
-            'payload',
+            '--file',
+            help=(
+                'Stream the tasks of a multi-document YAML or JSON Lines '
+                'file ("-" for stdin) to the queue via the Firebase REST '
+                'API, without starting a container'
+            )
+        )
+        parser.add_argument(
+            '--format', choices=['yaml', 'jsonl'],
+            help='Format of --file (default: guessed from its extension)'
+        )
+        parser.add_argument(
+            '-c', '--concurrency', type=int, default=PUSH_CONCURRENCY,
+            help='Number of concurrent requests (and connections)'
+        )
+        parser.add_argument(
+            '--retries', type=int, default=PUSH_RETRIES,
+            help='Retries of a failing request, with an exponential backoff'
+        )
+        parser.add_argument(
+            '--report-interval', type=float, default=PUSH_REPORT_INTERVAL,
+            help='Seconds between progress reports'
+        )
+        parser.add_argument(
+            '--firebase-url',
+            help=(
+                'Firebase database URL (default: '
+                'https://<firebase-id>.firebaseio.com); e.g. a local stand-in'
+            )
+        )
+        parser.add_argument(
+            'payload', nargs='?',
             help='Payload(s), json or yaml encoded, to send the queue'
         )
         parser.set_defaults(
@@ -276,6 +374,181 @@ class Settings(object):
             verifier_tag=self.get(VERIFIER_TAG_KEY),
         )
 
+    def bench_parser(self, subparsers):
+        parser = subparsers.add_parser(
+            'bench',
+            help='replay tasks and report their latency',
+            description=(
+                'Replay the tasks of JSON Lines or YAML files against the '
+                'verify CLI or a running verifier daemon, and report '
+                'latency percentiles by language and outcome'
+            ),
+        )
+        parser.add_argument('-p', '--profile-id')
+        parser.add_argument('-f', '--firebase-id')
+        parser.add_argument('-q', '--firebase-queue')
+        parser.add_argument('-S', '--firebase-auth-secret')
+        parser.add_argument('-t', '--verifier-tag')
+        parser.add_argument(
+            '--target', choices=['verify', 'daemon'], default='verify',
+            help=(
+                'Run tasks with the verify CLI, or push them to the queue '
+                'of a running daemon and wait for their results'
+            )
+        )
+        parser.add_argument(
+            '--verify-cmd',
+            default=BENCH_VERIFY_CMD,
+            help=(
+                'verify command; "{language}", "{image}" and "{tag}" are '
+                'replaced and the payload appended (default: "%(default)s")'
+            )
+        )
+        parser.add_argument(
+            '-n', '--count', type=int,
+            help='Number of tasks to run (default: the corpus size)'
+        )
+        parser.add_argument(
+            '-c', '--concurrency', type=int, default=PUSH_CONCURRENCY,
+            help='Number of tasks running at the same time'
+        )
+        parser.add_argument(
+            '-r', '--rate', type=float,
+            help='Start tasks at this rate (tasks/s) instead of back to back'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds before a task is reported as timing out'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=0.1,
+            help='Seconds between checks of a daemon task completion'
+        )
+        parser.add_argument(
+            '--report-interval', type=float, default=1,
+            help='Seconds per throughput report line'
+        )
+        parser.add_argument(
+            '--firebase-url',
+            help='Firebase database URL (default: from the firebase id)'
+        )
+        parser.add_argument(
+            '-o', '--output', help='Save each task latency (JSON Lines)'
+        )
+        parser.add_argument(
+            'corpus', nargs='+',
+            help='JSON Lines (.jsonl) or YAML files of tasks to replay'
+        )
+        parser.set_defaults(
+            func=bench,
+            firebase_id=self.get(FB_ID_KEY),
+            firebase_queue=self.get(FB_QUEUE_KEY),
+            firebase_auth_secret=self.get(FB_SECRET_KEY),
+            verifier_tag=self.get(VERIFIER_TAG_KEY),
+        )
+
+    def tune_parser(self, subparsers):
+        parser = subparsers.add_parser(
+            'tune',
+            help='calibrate the profile max worker',
+            description=(
+                'Ramp up the number of solutions each language image '
+                'verifies at the same time and save the highest worth it '
+                'as the profile maxWorker - '
+                'docker should already be set to use the correct machine.'
+            ),
+        )
+        parser.add_argument('-p', '--profile-id')
+        parser.add_argument('-t', '--verifier-tag')
+        parser.add_argument(
+            '--images', default=IMAGES_PATH,
+            help='images.json of the languages to calibrate'
+        )
+        parser.add_argument(
+            '--samples', nargs='+',
+            default=[
+                os.path.join(SAMPLES_DIR, '%s.yaml' % lang)
+                for lang in ('java', 'javascript', 'python')
+            ],
+            help='JSON Lines or YAML files of tasks to calibrate with'
+        )
+        parser.add_argument(
+            '--verify-cmd', default=BENCH_VERIFY_CMD,
+            help='verify command template (default: "%(default)s")'
+        )
+        parser.add_argument(
+            '--max-p95', type=float, default=2000,
+            help='p95 latency (in ms) not to exceed (default: %(default)s)'
+        )
+        parser.add_argument(
+            '--min-gain', type=float, default=0.05,
+            help='Throughput growth a level must bring (default: 5%%)'
+        )
+        parser.add_argument(
+            '--rounds', type=int, default=4,
+            help='Tasks run by each worker at each level'
+        )
+        parser.add_argument(
+            '--max-per-cpu', type=int, default=4,
+            help='Levels tried go up to this many workers per CPU'
+        )
+        parser.add_argument(
+            '--worker-memory', type=int, default=512,
+            help='Memory (in MB) to reserve per worker'
+        )
+        parser.add_argument('--timeout', type=float, default=60)
+        parser.add_argument(
+            '-n', '--dry-run', action='store_true',
+            help='Only print the recommended maxWorker'
+        )
+        parser.set_defaults(
+            func=tune,
+            verifier_tag=self.get(VERIFIER_TAG_KEY),
+        )
+
+    @staticmethod
+    def fleet_parser(subparsers):
+        parser = subparsers.add_parser(
+            'fleet',
+            help='run a command on many profiles',
+            description=(
+                'Run pull, start, stop, restart or docker-gid on many '
+                'profiles at once, each with the docker environment of its '
+                'machine (see `docker-machine env`). Restarts are rolled '
+                'out a few profiles at a time. Fleet options go before the '
+                'command; the arguments after it are passed to the command.'
+            ),
+        )
+        parser.add_argument(
+            '-p', '--profile-id', dest='profiles', action='append',
+            help='Profile to run the command on (repeatable)'
+        )
+        parser.add_argument(
+            '-G', '--group',
+            help='Run the command on the profiles listing this group'
+        )
+        parser.add_argument(
+            '-j', '--jobs', type=int, default=FLEET_JOBS,
+            help=(
+                'Profiles to run the command on at once '
+                '(default: %(default)s)'
+            )
+        )
+        parser.add_argument(
+            '--max-unavailable', type=int, default=1,
+            help='Profiles restarting at once (default: %(default)s)'
+        )
+        parser.add_argument(
+            '-t', '--verifier-tag',
+            help='Verifier image tag to pull and start'
+        )
+        parser.add_argument('command', choices=FLEET_COMMANDS)
+        parser.add_argument(
+            'args', nargs=argparse.REMAINDER,
+            help='Extra arguments for the command (start for restart)'
+        )
+        parser.set_defaults(func=fleet)
+
 
 def pull(opts):
     image = 'singpath/verifier2:%s' % opts.verifier_tag
@@ -321,10 +594,13 @@ def start(opts):
         logging.error('Firebase secret is missing.')
         exit(129)
 
-    queue_url = "https://%s.firebaseio.com/singpath/queues/%s" % (
-        opts.firebase_id,
-        opts.firebase_queue,
-    )
+    if opts.replicas < 1:
+        logging.error('The number of replicas should be at least 1.')
+        exit(128)
+
+    if opts.replicas > 1 and opts.interactive:
+        logging.error('Replicas can only be started in daemon mode.')
+        exit(128)
 
     if opts.profile_id:
         container_name = 'verifier-%s' % opts.profile_id
@@ -333,23 +609,10 @@ def start(opts):
             opts.firebase_id, opts.firebase_queue
         )
 
-    cmd = [
-        'docker', 'run', '--rm', '--name', container_name,
-        '-v', '/var/run/docker.sock:/var/run/docker.sock',
-        '--group-add', str(opts.docker_gid),
-        '-e', 'SINGPATH_FIREBASE_SECRET=%s' % opts.firebase_auth_secret,
-        '-e', 'SINGPATH_FIREBASE_QUEUE=%s' % queue_url,
-        '-e', 'SINGPATH_MAX_WORKER=%s' % opts.max_worker,
-        '-e', 'SINGPATH_IMAGE_TAG=%s' % opts.verifier_tag,
-        '-e', 'SKIP_BUILD=%s' % 1 if opts.skip_build else 0,
-        'singpath/verifier2',
-        '/app/bin/verifier',
-    ]
+    if opts.replicas > 1:
+        return start_replicas(opts, container_name)
 
-    if opts.level == logging.DEBUG:
-        cmd.append('-d')
-
-    cmd.append('run')
+    cmd = daemon_cmd(opts, container_name, opts.max_worker)
 
     if not opts.interactive:
         cmd.remove('--rm')
@@ -376,6 +639,92 @@ def start(opts):
         subprocess.Popen(['docker', 'kill', container_name]).wait()
 
 
+def start_replicas(opts, container_name):
+    cpus, memory = host_resources()
+    replicas = replica_shares(
+        opts.replicas, int(opts.max_worker), cpus, memory
+    )
+
+    returncode = 0
+    for i, (max_worker, cpuset, worker_memory) in enumerate(replicas):
+        name = '%s-%d' % (container_name, i)
+        cmd = daemon_cmd(
+            opts, name, max_worker, cpuset=cpuset, memory=worker_memory
+        )
+        cmd.remove('--rm')
+        cmd.insert(2, '-d')
+        logging.info(
+            'Starting verifier replica %s (CPUs %s, %d workers)...',
+            name, cpuset, max_worker
+        )
+        returncode = subprocess.Popen(cmd).wait() or returncode
+
+    return returncode
+
+
+def daemon_cmd(opts, container_name, max_worker, cpuset=None, memory=None):
+    queue_url = "https://%s.firebaseio.com/singpath/queues/%s" % (
+        opts.firebase_id,
+        opts.firebase_queue,
+    )
+
+    cmd = [
+        'docker', 'run', '--rm', '--name', container_name,
+        '-v', '/var/run/docker.sock:/var/run/docker.sock',
+        '--group-add', str(opts.docker_gid),
+        '-e', 'SINGPATH_FIREBASE_SECRET=%s' % opts.firebase_auth_secret,
+        '-e', 'SINGPATH_FIREBASE_QUEUE=%s' % queue_url,
+        '-e', 'SINGPATH_MAX_WORKER=%s' % max_worker,
+        '-e', 'SINGPATH_IMAGE_TAG=%s' % opts.verifier_tag,
+        '-e', 'SKIP_BUILD=%s' % (1 if opts.skip_build else 0),
+    ]
+
+    if opts.profile_id:
+        cmd.extend(['--label', '%s=%s' % (PROFILE_LABEL, opts.profile_id)])
+
+    if cpuset is not None:
+        # The daemon starts its verifier containers on the same CPUs and
+        # splits its memory slice between them.
+        cmd.extend([
+            '--cpuset-cpus', cpuset,
+            '-e', 'SINGPATH_CPUSET=%s' % cpuset,
+        ])
+    if memory:
+        cmd.extend(['-e', 'SINGPATH_MEMORY=%d' % memory])
+
+    cmd.extend(['singpath/verifier2', '/app/bin/verifier'])
+
+    if opts.level == logging.DEBUG:
+        cmd.append('-d')
+
+    cmd.append('run')
+    return cmd
+
+
+def replica_shares(replicas, max_worker, cpus, memory):
+    """Split the host CPUs, memory and max worker limit between replicas.
+
+    Returns a (max worker, cpuset, verifier container memory) tuple for
+    each replica. Each replica gets at least one worker and one CPU; with
+    more replicas than CPUs, CPUs are shared. The memory is zero when the
+    host memory is unknown.
+
+    """
+    shares = []
+    for i in range(replicas):
+        workers = max(
+            1, max_worker // replicas + (1 if i < max_worker % replicas else 0)
+        )
+        if replicas <= cpus:
+            first = i * cpus // replicas
+            last = (i + 1) * cpus // replicas - 1
+        else:
+            first = last = i % cpus
+        cpuset = str(first) if first == last else '%d-%d' % (first, last)
+        shares.append((workers, cpuset, memory // replicas // workers))
+    return shares
+
+
 def stop(opts):
     if not opts.profile_id:
         logging.error(
@@ -384,21 +733,134 @@ def stop(opts):
         )
         exit(128)
 
-    container_name = 'verifier-%s' % opts.profile_id
-    cmd = ['docker', 'rm', '-f', container_name]
+    names = replica_names(opts.profile_id)
+    if not names:
+        logging.info(
+            'No verifier container running for "%s".', opts.profile_id
+        )
+        return 0
+
+    cmd = ['docker', 'rm', '-f'] + names
     logging.info(
-        'Stopping verifier container (named "%s")...',
-        container_name
+        'Stopping verifier container(s) (named "%s")...',
+        '", "'.join(names)
     )
     docker = subprocess.Popen(cmd)
     return docker.wait()
 
 
+def replica_names(profile_id):
+    """Return the names of the verifier containers of a profile.
+
+    Containers are matched by their profile label; containers started
+    without it (by an older version) by their name.
+
+    """
+    docker = subprocess.Popen(
+        [
+            'docker', 'ps', '-a',
+            '--filter', 'name=verifier-%s' % profile_id,
+            '--format', '{{.Names}}\t{{.Label "%s"}}' % PROFILE_LABEL
+        ],
+        stdout=subprocess.PIPE
+    )
+    stdout, _ = docker.communicate()
+    if docker.returncode != 0:
+        logging.error('Failed to list the verifier containers.')
+        exit(1)
+
+    # The docker filter matches substrings of the names; the names of
+    # another profile's containers may even match the pattern (e.g. the
+    # "verifier-foo-1" container of the "foo-1" profile for "foo").
+    pattern = re.compile(r'^verifier-%s(?:-(\d+))?$' % re.escape(profile_id))
+    replicas = []
+    for line in stdout.decode('utf-8').splitlines():
+        name, _, label = line.strip().partition('\t')
+        if label and label != profile_id:
+            continue
+        match = pattern.match(name)
+        if match:
+            replicas.append((int(match.group(1) or -1), name))
+    return [name for _, name in sorted(replicas)]
+
+
+def status(opts):
+    if not opts.profile_id:
+        logging.error('The profile id is missing.')
+        exit(128)
+
+    names = replica_names(opts.profile_id)
+    if not names:
+        logging.info(
+            'No verifier container running for "%s".', opts.profile_id
+        )
+        return 0
+
+    inspect = subprocess.Popen(
+        ['docker', 'inspect', '--format', STATUS_INSPECT_FORMAT] + names,
+        stdout=subprocess.PIPE
+    )
+    stats = subprocess.Popen(
+        [
+            'docker', 'stats', '--no-stream', '--format',
+            '{{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}'
+        ] + names,
+        stdout=subprocess.PIPE
+    )
+    details = lines_by_name(inspect.communicate()[0])
+    usage = lines_by_name(stats.communicate()[0])
+    tasks = dict((name, task_count(name)) for name in names)
+    total = sum(tasks.values())
+
+    print('%-24s %-10s %-8s %7s %7s %12s %8s  %s' % (
+        'replica', 'state', 'cpus', 'workers', 'tasks', 'share', 'cpu',
+        'memory'
+    ))
+    for name in names:
+        state, cpuset, env = (details.get(name) or ['?', '', ''])[:3]
+        workers = re.search(r'SINGPATH_MAX_WORKER=(\S+)', env)
+        cpu, mem = (usage.get(name) or ['-', '-'])[:2]
+        print('%-24s %-10s %-8s %7s %7d %11.1f%% %8s  %s' % (
+            name, state, cpuset or 'all',
+            workers.group(1) if workers else '?',
+            tasks[name], 100.0 * tasks[name] / total if total else 0,
+            cpu, mem
+        ))
+
+
+def lines_by_name(output):
+    """Index tab separated "name<TAB>field..." lines by name."""
+    rows = {}
+    for line in output.decode('utf-8').splitlines():
+        fields = line.split('\t')
+        rows[fields[0].lstrip('/')] = fields[1:]
+    return rows
+
+
+def task_count(name):
+    """Count the tasks a daemon container logged as run."""
+    logs = subprocess.Popen(
+        ['docker', 'logs', name],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    )
+    count = sum(1 for line in logs.stdout if b'") run.' in line)
+    logs.wait()
+    return count
+
+
 def push(opts):
     if opts.firebase_auth_secret is None:
         logging.error('Firebase secret is missing.')
         exit(129)
 
+    if opts.file:
+        return push_file(opts)
+
+    if opts.payload is None:
+        logging.error('The payload (or --file) is missing.')
+        exit(128)
+
     queue_url = "https://%s.firebaseio.com/singpath/queues/%s" % (
         opts.firebase_id,
         opts.firebase_queue,
@@ -437,6 +899,894 @@ def push(opts):
         subprocess.Popen(['docker', 'kill', container_name]).wait()
 
 
+def tasks_url(opts):
+    base_url = opts.firebase_url or (
+        'https://%s.firebaseio.com' % opts.firebase_id
+    )
+    return '%s/singpath/queues/%s/tasks.json' % (
+        base_url.rstrip('/'), opts.firebase_queue
+    )
+
+
+def tasks_format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.json')) else 'yaml'
+
+
+def push_file(opts):
+    fmt = opts.format or tasks_format(opts.file)
+    pusher = Pusher(
+        tasks_url(opts), opts.firebase_auth_secret,
+        concurrency=opts.concurrency,
+        retries=opts.retries,
+        report_interval=opts.report_interval,
+    )
+
+    fp = sys.stdin if opts.file == '-' else open(opts.file)
+    try:
+        pusher.push_all(load_tasks(fp, fmt))
+    finally:
+        if fp is not sys.stdin:
+            fp.close()
+
+    if pusher.failed:
+        exit(1)
+
+
+def load_tasks(fp, fmt):
+    """Yield the task payloads of a YAML or JSON Lines stream.
+
+    Documents are parsed as they are read; invalid ones are skipped.
+
+    """
+    if fmt == 'jsonl':
+        docs = json_lines(fp)
+    else:
+        try:
+            import yaml
+        except ImportError:
+            logging.error('Loading YAML tasks requires PyYAML.')
+            exit(130)
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        docs = yaml.load_all(fp, Loader=loader)
+
+    for doc in docs:
+        if not isinstance(doc, dict):
+            continue
+
+        payload = dict(
+            (key, doc.get(key)) for key in ('language', 'tests', 'solution')
+        )
+        if not all(payload.values()):
+            logging.error(
+                'The verifier requires a language, some tests and a '
+                'solution. Got: %s', json.dumps(doc)
+            )
+            continue
+
+        yield payload
+
+
+def json_lines(fp):
+    """Yield the JSON documents of a JSON Lines stream, skipping invalid
+    lines.
+
+    """
+    for number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            logging.error('Skipping line %d, invalid JSON: %s', number, e)
+
+
+class Pusher(object):
+    """Push tasks to a queue with the Firebase REST API.
+
+    Each of the `concurrency` threads keeps its own keep-alive connection.
+    Failing requests (connection errors, 429 and 5xx responses) are
+    retried up to `retries` times, with an exponential backoff.
+
+    """
+
+    def __init__(
+        self, url, auth, concurrency=PUSH_CONCURRENCY, retries=PUSH_RETRIES,
+        backoff=PUSH_BACKOFF, report_interval=PUSH_REPORT_INTERVAL
+    ):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.query = urlencode({'auth': auth})
+        self.path = '%s?%s' % (parts.path, self.query)
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.report_interval = report_interval
+        self.owner = 'pusher-%s' % uuid.uuid4()
+        self.pushed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def push_all(self, payloads):
+        queue = Queue(maxsize=2 * self.concurrency)
+        workers = [
+            threading.Thread(target=self._worker, args=(queue,))
+            for _ in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        start = last_report = time.time()
+        for payload in payloads:
+            queue.put(payload)
+            now = time.time()
+            if now - last_report >= self.report_interval:
+                self._report(now - start)
+                last_report = now
+
+        for _ in workers:
+            queue.put(None)
+        for worker in workers:
+            worker.join()
+
+        self._report(time.time() - start)
+
+    def _report(self, elapsed):
+        done = self.pushed + self.failed
+        logging.info(
+            '%d tasks pushed, %d failed (%.1f tasks/s)',
+            self.pushed, self.failed, done / elapsed if elapsed else 0
+        )
+
+    def _worker(self, queue):
+        conn = None
+        while True:
+            payload = queue.get()
+            if payload is None:
+                break
+
+            body = json.dumps(self.task(payload))
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    delay = self.backoff * 2 ** (attempt - 1)
+                    time.sleep(delay * random.uniform(1, 2))
+                if conn is None:
+                    conn = self._connect()
+
+                try:
+                    status, data = self._post(conn, body)
+                except (httplib.HTTPException, socket.error) as e:
+                    logging.debug('Push failed: %s', e)
+                    conn.close()
+                    conn = None
+                    continue
+
+                if status == 429 or status >= 500:
+                    logging.debug('Push failed: %s %s', status, data)
+                    continue
+
+                ok = 200 <= status < 300
+                if not ok:
+                    logging.error('Push rejected: %s %s', status, data)
+                break
+            else:
+                ok = False
+                logging.error('Push failed after %d attempts', attempt + 1)
+
+            with self.lock:
+                if ok:
+                    self.pushed += 1
+                else:
+                    self.failed += 1
+
+        if conn is not None:
+            conn.close()
+
+    def task(self, payload):
+        return {
+            'started': False,
+            'completed': False,
+            'consumed': False,
+            'owner': self.owner,
+            'payload': payload,
+            'createdAt': {'.sv': 'timestamp'},
+        }
+
+    def _connect(self):
+        if self.scheme == 'https':
+            conn = httplib.HTTPSConnection(self.netloc, timeout=30)
+        else:
+            conn = httplib.HTTPConnection(self.netloc, timeout=30)
+
+        try:
+            conn.connect()
+            # Small requests on a reused connection; don't let Nagle's
+            # algorithm delay them.
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (httplib.HTTPException, socket.error) as e:
+            # The request will fail (and be retried) on a new attempt.
+            logging.debug('Connection failed: %s', e)
+        return conn
+
+    def task_path(self, name):
+        """Path of a pushed task, from the name the push returned."""
+        tasks, _ = self.path.split('?', 1)
+        return '%s/%s.json?%s' % (tasks[:-len('.json')], name, self.query)
+
+    def _post(self, conn, body):
+        return self.request(conn, 'POST', self.path, body)
+
+    def request(self, conn, method, path, body=None):
+        conn.request(
+            method, path, body, {
+                'Content-Type': 'application/json',
+                'Connection': 'keep-alive',
+            }
+        )
+        resp = conn.getresponse()
+        # The response must be read before the connection is reused.
+        return resp.status, resp.read()
+
+
+def bench(opts):
+    tasks = []
+    for path in opts.corpus:
+        with open(path) as fp:
+            tasks.extend(load_tasks(fp, tasks_format(path)))
+    if not tasks:
+        logging.error('No task to replay.')
+        exit(128)
+
+    if opts.target == 'daemon':
+        if opts.firebase_auth_secret is None:
+            logging.error('Firebase secret is missing.')
+            exit(129)
+        target = DaemonTarget(
+            Pusher(tasks_url(opts), opts.firebase_auth_secret),
+            timeout=opts.timeout,
+            poll_interval=opts.poll_interval,
+        )
+    else:
+        target = VerifyTarget(
+            opts.verify_cmd, opts.verifier_tag, timeout=opts.timeout
+        )
+
+    count = opts.count or len(tasks)
+    bench = Bench(
+        target, concurrency=opts.concurrency, rate=opts.rate,
+        report_interval=opts.report_interval
+    )
+    logging.info(
+        'Replaying %d tasks (%d in the corpus) against %s...',
+        count, len(tasks), opts.target
+    )
+    bench.run(tasks[i % len(tasks)] for i in range(count))
+    bench.report(opts.report_interval)
+
+    if opts.output:
+        with open(opts.output, 'w') as fp:
+            for record in bench.records:
+                fp.write(json.dumps(record, sort_keys=True) + '\n')
+        logging.info('Raw data saved in %s', opts.output)
+
+
+class Histogram(object):
+    """Log-linear histogram of positive integer values (HDR-style).
+
+    Values below 2 ** SUB_BUCKET_BITS are counted exactly; larger ones in
+    buckets less than 1% wide.
+
+    """
+
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        value = max(0, int(value))
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS)
+        key = (shift, value >> shift)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Return (an upper bound of) the value at the p-th percentile."""
+        if not self.total:
+            return 0
+        rank = max(1, int(round(self.total * p / 100.0)))
+        seen = 0
+        for shift, bucket in sorted(self.counts, key=lambda k: k[1] << k[0]):
+            seen += self.counts[(shift, bucket)]
+            if seen >= rank:
+                return min(self.max, ((bucket + 1) << shift) - 1)
+        return self.max
+
+
+class VerifyTarget(object):
+    """Run each task with the verify CLI of its language.
+
+    `cmd` is a command template; "{language}", "{image}" (from `images`,
+    "singpath/verifier2-<language>" by default) and "{tag}" are replaced
+    and the JSON payload is appended as its last argument.
+
+    """
+
+    def __init__(self, cmd, tag, timeout=None, images=None):
+        self.cmd = cmd
+        self.tag = tag
+        self.timeout = timeout
+        self.images = images or {}
+
+    def __call__(self, payload):
+        language = payload['language']
+        image = self.images.get(language, 'singpath/verifier2-%s' % language)
+        cmd = shlex.split(
+            self.cmd.replace('{language}', language).replace(
+                '{image}', image
+            ).replace('{tag}', self.tag or 'latest')
+        )
+        cmd.append(json.dumps({
+            'solution': payload['solution'], 'tests': payload['tests']
+        }))
+
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        timed_out = []
+
+        def kill():
+            timed_out.append(True)
+            proc.kill()
+
+        timer = None
+        if self.timeout:
+            timer = threading.Timer(self.timeout, kill)
+            timer.start()
+        try:
+            stdout, stderr = proc.communicate()
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if timed_out:
+            return 'timeout'
+        if proc.returncode != 0:
+            logging.debug('verify failed: %s', stderr.strip())
+            return 'error'
+
+        try:
+            return outcome(json.loads(stdout.decode('utf-8')))
+        except ValueError:
+            return 'error'
+
+
+class DaemonTarget(object):
+    """Push each task to a running daemon queue and wait for its result."""
+
+    def __init__(self, pusher, timeout=None, poll_interval=0.1):
+        self.pusher = pusher
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.local = threading.local()
+
+    def __call__(self, payload):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = self.pusher._connect()
+
+        try:
+            status, data = self.pusher.request(
+                conn, 'POST', self.pusher.path,
+                json.dumps(self.pusher.task(payload))
+            )
+            if status != 200:
+                logging.debug('Push failed: %s %s', status, data)
+                return 'error'
+
+            path = self.pusher.task_path(json.loads(data)['name'])
+            deadline = time.time() + (self.timeout or float('inf'))
+            while time.time() < deadline:
+                time.sleep(self.poll_interval)
+                status, data = self.pusher.request(conn, 'GET', path)
+                task = json.loads(data) if status == 200 else None
+                if task and task.get('completed'):
+                    return outcome(task.get('results') or {})
+            return 'timeout'
+        except (httplib.HTTPException, socket.error, ValueError) as e:
+            logging.debug('Request failed: %s', e)
+            conn.close()
+            self.local.conn = None
+            return 'error'
+
+
+def outcome(result):
+    if result.get('solved'):
+        return 'solved'
+    if result.get('errors'):
+        return 'error'
+    return 'failed'
+
+
+class Bench(object):
+    """Replay tasks against a target and record their latency.
+
+    Without a `rate`, `concurrency` tasks are kept running (closed loop).
+    With a `rate`, tasks are started at that many tasks per second by up
+    to `concurrency` threads; their latency counts from their scheduled
+    start, so a saturated target does not hide its queueing delay.
+
+    """
+
+    def __init__(
+        self, target, concurrency=PUSH_CONCURRENCY, rate=None,
+        report_interval=PUSH_REPORT_INTERVAL
+    ):
+        self.target = target
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.report_interval = report_interval
+        self.histograms = {}
+        self.records = []
+        self.start = None
+        self.lock = threading.Lock()
+
+    def run(self, payloads):
+        queue = Queue(maxsize=0 if self.rate else self.concurrency)
+        workers = [
+            threading.Thread(target=self._worker, args=(queue,))
+            for _ in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        self.start = time.time()
+        last_report = self.start
+        for i, payload in enumerate(payloads):
+            scheduled = None
+            if self.rate:
+                scheduled = self.start + i / float(self.rate)
+                delay = scheduled - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            queue.put((payload, scheduled))
+
+            now = time.time()
+            if now - last_report >= self.report_interval:
+                logging.info('%d tasks completed', len(self.records))
+                last_report = now
+
+        for _ in workers:
+            queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def _worker(self, queue):
+        while True:
+            item = queue.get()
+            if item is None:
+                break
+
+            payload, scheduled = item
+            start = scheduled or time.time()
+            result = self.target(payload)
+            end = time.time()
+            self._record(payload['language'], result, start, end)
+
+    def _record(self, language, result, start, end):
+        latency = (end - start) * 1000
+        with self.lock:
+            key = (language, result)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            # Recorded in microseconds.
+            self.histograms[key].record(latency * 1000)
+            self.records.append({
+                'language': language,
+                'outcome': result,
+                'start': start - self.start,
+                'latency': latency,
+            })
+
+    def report(self, interval):
+        print('%-12s %-8s %7s %10s %10s %10s %10s' % (
+            'language', 'outcome', 'count',
+            'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'max (ms)'
+        ))
+        for (language, result), hist in sorted(self.histograms.items()):
+            print('%-12s %-8s %7d %10.1f %10.1f %10.1f %10.1f' % (
+                language, result, hist.total,
+                hist.percentile(50) / 1000.0, hist.percentile(95) / 1000.0,
+                hist.percentile(99) / 1000.0, hist.max / 1000.0
+            ))
+
+        if not self.records:
+            return
+
+        interval = interval or 1
+        completed = {}
+        for record in self.records:
+            end = record['start'] + record['latency'] / 1000.0
+            slot = int(end // interval)
+            completed[slot] = completed.get(slot, 0) + 1
+
+        print('\n%10s %12s' % ('time (s)', 'tasks/s'))
+        for slot in range(max(completed) + 1):
+            print('%10.0f %12.1f' % (
+                slot * interval, completed.get(slot, 0) / float(interval)
+            ))
+
+
+def tune(opts):
+    if not opts.profile_id and not opts.dry_run:
+        logging.error('The profile id is missing (or use --dry-run).')
+        exit(128)
+
+    with open(opts.images) as fp:
+        images = json.load(fp)
+
+    cpus, memory = host_resources()
+    logging.info(
+        'Host: %d CPU(s), %d MB of memory', cpus, memory // (1024 * 1024)
+    )
+    max_level = max(1, cpus * opts.max_per_cpu)
+    if memory and opts.worker_memory:
+        max_level = min(
+            max_level, max(1, memory // (opts.worker_memory * 1024 * 1024))
+        )
+
+    target = VerifyTarget(
+        opts.verify_cmd, opts.verifier_tag, timeout=opts.timeout,
+        images=dict((lang, image['name']) for lang, image in images.items())
+    )
+
+    recommendations = {}
+    for language in sorted(images):
+        tasks = calibration_tasks(opts.samples, language)
+        if not tasks:
+            logging.warning('No sample task for %s; skipped.', language)
+            continue
+
+        logging.info(
+            'Calibrating %s (up to %d workers)...', language, max_level
+        )
+        recommendations[language] = calibrate(
+            target, tasks, max_level, opts.rounds, opts.max_p95,
+            opts.min_gain
+        )
+        logging.info('%s: %d workers', language, recommendations[language])
+
+    if not recommendations:
+        logging.error('No language could be calibrated.')
+        exit(1)
+
+    # The daemon runs all languages with the same worker limit.
+    max_worker = min(recommendations.values())
+    print('Recommended maxWorker: %d' % max_worker)
+
+    if opts.dry_run:
+        return
+
+    settings = Settings()
+    settings.load(opts.profile_id)
+    profile = dict(settings._settings())
+    profile[MAX_WORKER_KEY] = str(max_worker)
+    Settings.save(opts.profile_id, profile)
+
+
+def host_resources():
+    """Return the docker host CPU count and memory (in bytes).
+
+    Asks docker (the host may be a docker-machine), falling back to this
+    machine's.
+
+    """
+    try:
+        info = subprocess.Popen(
+            ['docker', 'info', '--format', '{{.NCPU}} {{.MemTotal}}'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        stdout, _ = info.communicate()
+        if info.returncode == 0:
+            cpus, memory = stdout.decode('utf-8').split()
+            return int(cpus), int(memory)
+    except (OSError, ValueError) as e:
+        logging.debug('Failed to query docker info: %s', e)
+
+    cpus = os.sysconf('SC_NPROCESSORS_ONLN')
+    try:
+        memory = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError):
+        memory = 0
+    return cpus, memory
+
+
+def calibration_tasks(paths, language):
+    tasks = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path) as fp:
+            tasks.extend(
+                t for t in load_tasks(fp, tasks_format(path))
+                if t['language'] == language
+            )
+    return tasks
+
+
+def calibrate(target, tasks, max_level, rounds, max_p95, min_gain):
+    """Ramp up concurrency and return the level after which it stops paying.
+
+    Each level runs `rounds` tasks per worker. The ramp stops once the
+    throughput grows by less than `min_gain` or the p95 latency exceeds
+    `max_p95` milliseconds.
+
+    """
+    best_level, best_throughput = 1, 0
+    level = 1
+    while level <= max_level:
+        bench = Bench(target, concurrency=level)
+        count = level * rounds
+        start = time.time()
+        bench.run(tasks[i % len(tasks)] for i in range(count))
+        elapsed = time.time() - start
+
+        hist = Histogram()
+        for record in bench.records:
+            hist.record(record['latency'] * 1000)
+        p95 = hist.percentile(95) / 1000.0
+        throughput = count / elapsed
+        failures = sum(
+            1 for r in bench.records if r['outcome'] in ('error', 'timeout')
+        )
+        logging.info(
+            '  %3d workers: %6.1f tasks/s, p95 %7.1f ms, %d errors',
+            level, throughput, p95, failures
+        )
+
+        if p95 > max_p95 or failures:
+            break
+        if best_throughput and throughput < best_throughput * (1 + min_gain):
+            break
+
+        best_level, best_throughput = level, throughput
+        if level == max_level:
+            break
+        level = min(level * 2, max_level)
+
+    return best_level
+
+
+def fleet(opts):
+    settings = Settings()
+    settings.load(None)
+    profiles = fleet_profiles(settings.profiles, opts.profiles, opts.group)
+    if not profiles:
+        logging.error('No profile selected (use --profile-id or --group).')
+        exit(128)
+
+    args = list(opts.args)
+    if args and args[0] == '--':
+        args = args[1:]
+    tag_args = ['-t', opts.verifier_tag] if opts.verifier_tag else []
+
+    if opts.command == 'docker-gid':
+        action = fleet_docker_gid
+    elif opts.command == 'restart':
+        def action(profile_id, profile):
+            return fleet_restart(
+                profile_id, profile, tag_args, args, opts.level
+            )
+    else:
+        if opts.command in ('pull', 'start'):
+            args = tag_args + args
+
+        def action(profile_id, profile):
+            return fleet_command(
+                opts.command, profile_id, profile, args, opts.level
+            )
+
+    pool = Fleet(jobs=opts.jobs)
+    logging.info(
+        'Running %s on %d profile(s)...', opts.command, len(profiles)
+    )
+    if opts.command == 'restart':
+        results = pool.rolling(profiles, action, opts.max_unavailable)
+    else:
+        results = pool.run(profiles, action)
+
+    print('%-24s %-20s %-8s %s' % ('profile', 'machine', 'status', 'output'))
+    for profile_id, result in results.items():
+        print('%-24s %-20s %-8s %s' % (
+            profile_id,
+            profiles[profile_id].get(MACHINE_ID_KEY) or '-',
+            result['status'],
+            result['output'],
+        ))
+
+    if any(r['status'] != 'ok' for r in results.values()):
+        exit(1)
+
+
+def fleet_profiles(profiles, profile_ids, group):
+    """Select profiles by id and by group, in the order they were given.
+
+    A profile belongs to the groups listed in its "groups" setting.
+
+    """
+    selected = collections.OrderedDict()
+    for profile_id in profile_ids or []:
+        if profile_id not in profiles:
+            logging.error('Unknown profile "%s".', profile_id)
+            exit(128)
+        selected[profile_id] = profiles[profile_id]
+
+    if group:
+        for profile_id in sorted(profiles):
+            if group in (profiles[profile_id].get(GROUPS_KEY) or []):
+                selected[profile_id] = profiles[profile_id]
+
+    return selected
+
+
+class Fleet(object):
+    """Run an action on many profiles with a bounded pool of threads.
+
+    `action(profile_id, profile)` returns the output to report; errors it
+    raises (including `exit()` calls) are reported as the profile failure.
+
+    """
+
+    def __init__(self, jobs=FLEET_JOBS):
+        self.jobs = max(1, jobs)
+
+    def run(self, profiles, action):
+        results = collections.OrderedDict(
+            (profile_id, None) for profile_id in profiles
+        )
+        queue = Queue()
+        for profile_id in profiles:
+            queue.put(profile_id)
+
+        workers = [
+            threading.Thread(
+                target=self._worker, args=(queue, profiles, action, results)
+            )
+            for _ in range(min(self.jobs, len(profiles)))
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        return results
+
+    def rolling(self, profiles, action, max_unavailable=1):
+        """Run the action on at most `max_unavailable` profiles at once.
+
+        Stops at the first batch with a failure; the profiles left are
+        reported as skipped.
+
+        """
+        ids = list(profiles)
+        batch_size = max(1, max_unavailable)
+        results = collections.OrderedDict()
+        for i in range(0, len(ids), batch_size):
+            batch = collections.OrderedDict(
+                (profile_id, profiles[profile_id])
+                for profile_id in ids[i:i + batch_size]
+            )
+            results.update(self.run(batch, action))
+            if any(r['status'] != 'ok' for r in results.values()):
+                for profile_id in ids[i + batch_size:]:
+                    results[profile_id] = {
+                        'status': 'skipped', 'output': ''
+                    }
+                break
+
+        return results
+
+    def _worker(self, queue, profiles, action, results):
+        while True:
+            try:
+                profile_id = queue.get_nowait()
+            except Empty:
+                return
+
+            try:
+                output = action(profile_id, profiles[profile_id])
+                result = {'status': 'ok', 'output': output or ''}
+            except SystemExit as e:
+                result = {'status': 'failed', 'output': 'exit %s' % e.code}
+            except Exception as e:
+                result = {'status': 'failed', 'output': str(e)}
+
+            # Each worker sets its own keys; no lock needed.
+            results[profile_id] = result
+
+
+class FleetError(Exception):
+    pass
+
+
+def machine_env(machine_id):
+    """Return the environment to use docker on a docker-machine host."""
+    env = dict(os.environ)
+    if not machine_id:
+        return env
+
+    cmd = subprocess.Popen(
+        ['docker-machine', 'env', '--shell', 'sh', machine_id],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    stdout, stderr = cmd.communicate()
+    if cmd.returncode != 0:
+        raise FleetError(
+            'docker-machine env failed: %s' % stderr.decode('utf-8').strip()
+        )
+
+    for line in stdout.decode('utf-8').splitlines():
+        match = MACHINE_ENV_LINE.match(line)
+        if match:
+            env[match.group(1)] = match.group(2)
+    return env
+
+
+def fleet_command(
+    command, profile_id, profile, args, level=logging.INFO, env=None
+):
+    """Run a verifier-machine.py command for a profile on its host."""
+    cmd = [sys.executable, os.path.abspath(__file__)]
+    if level == logging.DEBUG:
+        cmd.append('-v')
+    cmd.extend([command, '-p', profile_id] + list(args))
+
+    proc = subprocess.Popen(
+        cmd,
+        env=env or machine_env(profile.get(MACHINE_ID_KEY)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    )
+    stdout, _ = proc.communicate()
+    lines = stdout.decode('utf-8').strip().splitlines()
+    for line in lines:
+        logging.debug('[%s] %s', profile_id, line)
+
+    last_line = lines[-1] if lines else ''
+    if proc.returncode != 0:
+        raise FleetError(
+            '%s exited with %d: %s' % (command, proc.returncode, last_line)
+        )
+    return last_line
+
+
+def fleet_restart(profile_id, profile, tag_args, args, level=logging.INFO):
+    env = machine_env(profile.get(MACHINE_ID_KEY))
+
+    # Pull first so the verifier is down only while it restarts.
+    fleet_command('pull', profile_id, profile, tag_args, level, env)
+    fleet_command('stop', profile_id, profile, [], level, env)
+    return fleet_command(
+        'start', profile_id, profile, tag_args + args, level, env
+    )
+
+
+def fleet_docker_gid(profile_id, profile):
+    machine_id = profile.get(MACHINE_ID_KEY)
+    gid = remote_socket_gid(machine_id) if machine_id else local_socket_gid()
+    if gid is None:
+        raise FleetError('No docker socket found')
+    return str(gid)
+
+
 def prompt(msg, default):
     result = raw_input('%s [%s]: ' % (msg, default,))
     result = result if result else default
@@ -15,6 +15,7 @@ exports.dockerClient = () => Promise.resolve(new Docker());
 exports.logger = log;
 exports.singpathQueue = singpathQueue;
 exports.verify = verifier.verify;
+exports.ContainerPool = verifier.ContainerPool;
 exports.images = images;
 exports.firebase = firebase;
 exports.singpath = singpath;
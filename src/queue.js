@@ -28,6 +28,9 @@ module.exports = class Queue extends events.EventEmitter {
     this.logger = options.logger || console;
 
     this.imageTag = options.imageTag;
+    this.cpuset = options.cpuset;
+    this.memory = options.memory;
+    this.pool = options.pool;
     this.opts = {
       presenceDelay: options.presenceDelay || DEFAULT_PRESENCE_DELAY,
       taskTimeout: options.taskTimeout || DEFAULT_TASK_TIMEOUT,
@@ -337,7 +340,10 @@ module.exports = class Queue extends events.EventEmitter {
     ).then(
       () => verifier.verify(this.dockerClient, task.data.payload, {
         logger: this.logger,
-        imageTag: this.imageTag
+        imageTag: this.imageTag,
+        cpuset: this.cpuset,
+        memory: this.memory,
+        pool: this.pool
       })
     ).then(results => {
       this.logger.info('Task ("%s") run.', task.key);
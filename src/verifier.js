@@ -5,6 +5,7 @@ const Writable = require('stream').Writable;
 const verifierImages = require('../images.json');
 
 const DELAY = 10000;
+const POOL_WINDOW = 60000;
 
 /**
  * Writeable stream collecting verifier sdtout stream.
@@ -100,17 +101,38 @@ class Verifier {
   /**
    * Attach a stream collecting the container stdout into a buffer.
    *
-   * @return {Promise} Resolve to the verifier once the the container is
-   *                   attached.
+   * @param  {boolean} stdin Also attach (hijack) the container stdin.
+   * @return {Promise}       Resolve to the verifier once the the container is
+   *                         attached.
    *
    */
-  attach() {
-    return this._wrap(this.container.attach, {stream: true, stdout: true, stderr: true}).then(stream => {
+  attach(stdin) {
+    const opts = {stream: true, stdout: true, stderr: true};
+
+    if (stdin) {
+      opts.stdin = true;
+      opts.hijack = true;
+    }
+
+    return this._wrap(this.container.attach, opts).then(stream => {
+      this.stream = stream;
       this.out = new Response(this.container, stream);
       return this;
     });
   }
 
+  /**
+   * Write data to the container stdin (it must be attached with stdin).
+   *
+   * @param  {Buffer}  data
+   * @return {Promise}      Resolve to the verifier once data is flushed.
+   */
+  send(data) {
+    return new Promise(resolve => {
+      this.stream.write(data, () => resolve(this));
+    });
+  }
+
   /**
    * Start the container.
    *
@@ -177,13 +199,49 @@ const support = exports.support = function(lang) {
   return verifierImages[lang] !== undefined;
 };
 
+/**
+ * Tell if the verifier image for that language can read its payload from
+ * stdin (as a frame, see `frame()`) instead of its command arguments.
+ *
+ * @param  {string}  lang
+ * @return {boolean}
+ */
+const supportStdin = exports.supportStdin = function(lang) {
+  return support(lang) && verifierImages[lang].stdin === true;
+};
+
+/**
+ * Encode a payload as a frame: a 4 bytes big-endian length followed by
+ * the JSON encoded payload.
+ *
+ * @param  {Object} payload
+ * @return {Buffer}
+ */
+const frame = exports.frame = function(payload) {
+  const body = new Buffer(JSON.stringify({
+    'solution': payload.solution,
+    'tests': payload.tests
+  }), 'utf8');
+  const header = new Buffer(4);
+
+  header.writeUInt32BE(body.length, 0);
+  return Buffer.concat([header, body]);
+};
+
 /**
  * Run solution inside a docker container.
  *
  * Returns a promise resolving to the verification result.
  *
+ * Options: `logger`, `imageTag`, `timeout`, `stdin`, and `cpuset` and
+ * `memory` (in bytes) to limit the container to some CPUs and memory.
+ *
+ * With a `pool` (see `ContainerPool`), payloads sent to stdin run in one of
+ * its pre-created containers.
+ *
  * @param  {Dockerode} client
  * @param  {Object}    payload
+ * @param  {Object}    options
  * @return {Promise}
  */
 exports.verify = function verify(client, payload, options) {
@@ -200,19 +258,23 @@ exports.verify = function verify(client, payload, options) {
   const logger = options.logger || console;
   const tag = options.imageTag || 'latest';
   const delay = options.timeout || DELAY;
-
-  return new Promise((resolve, reject) => {
-    client.createContainer(containerOptions(payload, tag), (err, container) => {
-      if (err) {
-        reject(err);
-      } else {
-        resolve(new Verifier(container, logger));
-      }
-    });
-  }).then(
-    verifier => verifier.attach()
+  const stdin = options.stdin !== false && supportStdin(payload.language);
+  const limits = {cpuset: options.cpuset, memory: options.memory};
+  const pool = options.pool;
+  const container = (
+    stdin && pool && pool.supports(payload.language, tag) ?
+      pool.acquire(payload.language) :
+      createContainer(client, containerOptions(payload, tag, stdin, limits))
+  );
+
+  return container.then(
+    container => new Verifier(container, logger)
+  ).then(
+    verifier => verifier.attach(stdin)
   ).then(
     verifier => verifier.start()
+  ).then(
+    verifier => stdin ? verifier.send(frame(payload)) : verifier
   ).then(
     verifier => verifier.wait(delay)
   ).catch(err => {
@@ -227,26 +289,267 @@ exports.verify = function verify(client, payload, options) {
   });
 };
 
-function containerOptions(payload, tag) {
+function createContainer(client, opts) {
+  return new Promise((resolve, reject) => {
+    client.createContainer(opts, (err, container) => {
+      if (err) {
+        reject(err);
+      } else {
+        resolve(container);
+      }
+    });
+  });
+}
+
+/**
+ * Pool of containers created ahead of the tasks they will run.
+ *
+ * Only verifiers reading their payload from stdin can use a container
+ * created before the payload is known. Each container still runs a single
+ * payload; the pool is refilled in the background after each acquisition.
+ *
+ * The pool size of each language follows its arrival rate over the last
+ * minute and the time it takes to create a container, between 1 and
+ * `maxWorker` containers.
+ *
+ */
+class ContainerPool {
+
+  /**
+   * ContainerPool constructor.
+   *
+   * @param  {Dockerode} client
+   * @param  {Object}    options  `logger`, `imageTag`, `maxWorker`, `cpuset`
+   *                              and `memory`.
+   */
+  constructor(client, options) {
+    options = options || {};
+
+    this.client = client;
+    this.logger = options.logger || console;
+    this.imageTag = options.imageTag || 'latest';
+    this.maxSize = Math.max(1, parseInt(options.maxWorker, 10) || 1);
+    this.limits = {cpuset: options.cpuset, memory: options.memory};
+    this.window = options.window || POOL_WINDOW;
+    this.closed = false;
+    this.languages = Object.keys(verifierImages).filter(supportStdin).reduce(
+      (languages, language) => {
+        languages[language] = {
+          idle: [],
+          pending: 0,
+          arrivals: [],
+          hits: 0,
+          misses: 0,
+          refills: 0,
+          refillTime: 0,
+          errors: 0
+        };
+        return languages;
+      }, {}
+    );
+  }
+
+  /**
+   * Fill the pool of each language.
+   *
+   * @return {ContainerPool}
+   */
+  start() {
+    Object.keys(this.languages).forEach(language => this.refill(language));
+    return this;
+  }
+
+  /**
+   * Tell if the pool can provide containers for a language and image tag.
+   *
+   * @param  {string}  language
+   * @param  {string}  tag
+   * @return {boolean}
+   */
+  supports(language, tag) {
+    return (
+      !this.closed &&
+      this.languages[language] !== undefined &&
+      (tag || 'latest') === this.imageTag
+    );
+  }
+
+  /**
+   * Take a container out of the pool (or create one if the pool is empty)
+   * and refill the pool.
+   *
+   * @param  {string}  language
+   * @return {Promise}          Resolve to a created container.
+   */
+  acquire(language) {
+    const state = this.languages[language];
+    const now = Date.now();
+    let container;
+
+    state.arrivals.push(now);
+    while (state.arrivals[0] <= now - this.window) {
+      state.arrivals.shift();
+    }
+
+    if (state.idle.length > 0) {
+      state.hits += 1;
+      container = Promise.resolve(state.idle.shift());
+    } else {
+      state.misses += 1;
+      container = this.create(language);
+    }
+
+    this.refill(language);
+    return container;
+  }
+
+  /**
+   * Number of containers a language pool should hold.
+   *
+   * Enough containers to cover the tasks arriving while new ones are
+   * created.
+   *
+   * @param  {string} language
+   * @return {number}
+   */
+  targetSize(language) {
+    const state = this.languages[language];
+    const rate = state.arrivals.length / this.window;
+    const refillTime = state.refills ? state.refillTime / state.refills : 0;
+
+    return Math.min(
+      this.maxSize,
+      Math.max(1, Math.ceil(rate * refillTime) + 1)
+    );
+  }
+
+  /**
+   * Create containers in the background until the language pool is full.
+   *
+   * @param {string} language
+   */
+  refill(language) {
+    const state = this.languages[language];
+    const size = this.targetSize(language);
+
+    while (!this.closed && state.idle.length + state.pending < size) {
+      const start = Date.now();
+
+      state.pending += 1;
+      this.create(language).then(container => {
+        state.pending -= 1;
+        state.refills += 1;
+        state.refillTime += Date.now() - start;
+
+        if (this.closed) {
+          return removeContainer(container);
+        }
+
+        state.idle.push(container);
+      }).catch(err => {
+        // The next acquisition will try again.
+        state.pending -= 1;
+        state.errors += 1;
+        this.logger.error('Failed to create a %s container: %s', language, err);
+      });
+    }
+  }
+
+  create(language) {
+    return createContainer(
+      this.client,
+      containerOptions({language}, this.imageTag, true, this.limits)
+    );
+  }
+
+  /**
+   * Pool metrics per language.
+   *
+   * `refillLatency` is the average time (in ms) to create a container.
+   *
+   * @return {Object}
+   */
+  metrics() {
+    return Object.keys(this.languages).reduce((metrics, language) => {
+      const state = this.languages[language];
+
+      metrics[language] = {
+        size: state.idle.length,
+        pending: state.pending,
+        target: this.targetSize(language),
+        hits: state.hits,
+        misses: state.misses,
+        refills: state.refills,
+        refillLatency: state.refills ? state.refillTime / state.refills : 0,
+        errors: state.errors
+      };
+      return metrics;
+    }, {});
+  }
+
+  /**
+   * Stop refilling the pool and remove its containers.
+   *
+   * @return {Promise}
+   */
+  drain() {
+    this.closed = true;
+
+    return Promise.all(Object.keys(this.languages).reduce(
+      (removals, language) => removals.concat(
+        this.languages[language].idle.splice(0).map(removeContainer)
+      ), []
+    ));
+  }
+
+}
+
+exports.ContainerPool = ContainerPool;
+
+function removeContainer(container) {
+  return new Promise(resolve => {
+    container.remove({force: true}, () => resolve());
+  });
+}
+
+function containerOptions(payload, tag, stdin, limits) {
+  // With stdin, the payload is sent once the container is started; it
+  // doesn't need to be copied in the command arguments.
+  const cmd = stdin ? ['verify', '--stdin'] : ['verify', JSON.stringify({
+    'solution': payload.solution,
+    'tests': payload.tests
+  })];
+
+  const hostConfig = {
+    'CapDrop': ['All'],
+    // 'LogConfig': {
+    //   'Type': 'syslog',
+    //   'Config': {
+    //     'tag': `'verifier-${payload.language}'`
+    //   }
+    // },
+    'NetworkMode': 'none'
+  };
+
+  // Pin the container to the CPUs (and memory slice) of the daemon replica
+  // running it.
+  if (limits && limits.cpuset) {
+    hostConfig.CpusetCpus = limits.cpuset;
+  }
+
+  if (limits && limits.memory) {
+    hostConfig.Memory = parseInt(limits.memory, 10);
+  }
+
   return {
-    'AttachStdin': false,
+    'AttachStdin': Boolean(stdin),
     'AttachStdout': true,
     'AttachStderr': true,
+    'OpenStdin': Boolean(stdin),
+    'StdinOnce': Boolean(stdin),
     'Tty': false,
-    'Cmd': ['verify', JSON.stringify({
-      'solution': payload.solution,
-      'tests': payload.tests
-    })],
+    'Cmd': cmd,
     'Image': `${verifierImages[payload.language].name}:${tag}`,
-    'HostConfig': {
-      'CapDrop': ['All'],
-      // 'LogConfig': {
-      //   'Type': 'syslog',
-      //   'Config': {
-      //     'tag': `'verifier-${payload.language}'`
-      //   }
-      // },
-      'NetworkMode': 'none'
-    }
+    'HostConfig': hostConfig
   };
 }
@@ -969,6 +969,33 @@ describe('queue', () => {
       });
     });
 
+    it('should verify the task within the queue cpu set', () => {
+      queue.cpuset = '0-1';
+      queue.memory = 536870912;
+
+      return queue.runTask({key, data}).then(() => {
+        sinon.assert.calledWithExactly(
+          verifierComponent.verify,
+          queue.dockerClient,
+          data.payload,
+          sinon.match({cpuset: '0-1', memory: 536870912})
+        );
+      });
+    });
+
+    it('should verify the task with the queue container pool', () => {
+      queue.pool = {};
+
+      return queue.runTask({key, data}).then(() => {
+        sinon.assert.calledWithExactly(
+          verifierComponent.verify,
+          queue.dockerClient,
+          data.payload,
+          sinon.match.has('pool', queue.pool)
+        );
+      });
+    });
+
     it('should reject if it fails to verify the task', () => {
       const err = new Error();
 
@@ -10,8 +10,20 @@ const noop = () => undefined;
 
 describe('verifier', () => {
 
+  describe('frame', () => {
+
+    it('should prefix the JSON encoded payload with its length', () => {
+      const data = verifier.frame({solution: 'foo = 1', tests: '>>> foo\n1', language: 'python'});
+      const body = JSON.stringify({solution: 'foo = 1', tests: '>>> foo\n1'});
+
+      expect(data.readUInt32BE(0)).to.be(body.length);
+      expect(data.slice(4).toString('utf8')).to.be(body);
+    });
+
+  });
+
   describe('verify', () => {
-    let client, payload, results, container, stream;
+    let client, payload, results, container, stream, stdin;
 
     beforeEach(() => {
       payload = {
@@ -25,13 +37,24 @@ describe('verifier', () => {
 
       stream = new MemoryStream();
 
+      // The attached stream is a duplex: what the verifier writes goes to
+      // the container stdin; what the container outputs can be read.
+      stdin = [];
+      stream.write = (data, cb) => {
+        stdin.push(data);
+        if (cb) {
+          setImmediate(cb);
+        }
+        return true;
+      };
+
       container = {
         start: sinon.stub().yields(null, {}),
         stop: sinon.stub().yields(null, {}),
         attach: sinon.stub().yields(null, stream),
         wait: (cb) => {
           // Not setting docker log header
-          stream.write(new Buffer(JSON.stringify(results)));
+          MemoryStream.prototype.write.call(stream, new Buffer(JSON.stringify(results)));
           stream.end();
 
           setImmediate(cb, null, {});
@@ -133,6 +156,25 @@ describe('verifier', () => {
       });
     });
 
+    it('should create a container to run the payload on a cpu set', () => {
+      return verifier.verify(client, payload, {cpuset: '2-3', memory: '268435456'}).then(() => {
+        sinon.assert.calledWithExactly(
+          client.createContainer,
+          sinon.match.has('HostConfig', sinon.match({CpusetCpus: '2-3', Memory: 268435456})),
+          sinon.match.func
+        );
+      });
+    });
+
+    it('should create a container to run the payload without cpu set by default', () => {
+      return verifier.verify(client, payload).then(() => {
+        const config = client.createContainer.lastCall.args[0];
+
+        expect(config.HostConfig).not.to.have.key('CpusetCpus');
+        expect(config.HostConfig).not.to.have.key('Memory');
+      });
+    });
+
     it('should create a container to run the payload with stdout and sdterr attached', () => {
       return verifier.verify(client, payload, {imageTag: '2.1.5'}).then(() => {
         sinon.assert.calledWithExactly(
@@ -148,6 +190,42 @@ describe('verifier', () => {
       });
     });
 
+    it('should send the payload to the container stdin', () => {
+      return verifier.verify(client, payload).then(() => {
+        sinon.assert.calledWithExactly(
+          client.createContainer,
+          sinon.match({
+            'Cmd': ['verify', '--stdin'],
+            'AttachStdin': true,
+            'OpenStdin': true,
+            'StdinOnce': true
+          }),
+          sinon.match.func
+        );
+        sinon.assert.calledWithExactly(
+          container.attach,
+          sinon.match({stdin: true, hijack: true}),
+          sinon.match.func
+        );
+        expect(stdin).to.have.length(1);
+        expect(stdin[0].toString('hex')).to.be(verifier.frame(payload).toString('hex'));
+      });
+    });
+
+    it('should send the payload as argument if stdin is disabled', () => {
+      return verifier.verify(client, payload, {stdin: false}).then(() => {
+        sinon.assert.calledWithExactly(
+          client.createContainer,
+          sinon.match({
+            'Cmd': ['verify', JSON.stringify({solution: 'foo = 1', tests: '>>> foo\n1'})],
+            'AttachStdin': false
+          }),
+          sinon.match.func
+        );
+        expect(stdin).to.be.empty();
+      });
+    });
+
     it('should reject if the container could not be created', () => {
       const error = new Error();
 
@@ -221,6 +299,46 @@ describe('verifier', () => {
       );
     });
 
+    it('should run the payload in a container from the pool', () => {
+      const pool = {
+        supports: sinon.stub().returns(true),
+        acquire: sinon.stub().returns(Promise.resolve(container))
+      };
+
+      return verifier.verify(client, payload, {pool}).then(resp => {
+        expect(resp.solved).to.be(true);
+        sinon.assert.calledOnce(pool.acquire);
+        sinon.assert.calledWithExactly(pool.acquire, 'python');
+        sinon.assert.notCalled(client.createContainer);
+        sinon.assert.calledOnce(container.remove);
+      });
+    });
+
+    it('should create the container if the pool does not support the payload', () => {
+      const pool = {
+        supports: sinon.stub().returns(false),
+        acquire: sinon.stub()
+      };
+
+      return verifier.verify(client, payload, {pool}).then(() => {
+        sinon.assert.calledWithExactly(pool.supports, 'python', 'latest');
+        sinon.assert.notCalled(pool.acquire);
+        sinon.assert.calledOnce(client.createContainer);
+      });
+    });
+
+    it('should not use the pool if stdin is disabled', () => {
+      const pool = {
+        supports: sinon.stub().returns(true),
+        acquire: sinon.stub()
+      };
+
+      return verifier.verify(client, payload, {pool, stdin: false}).then(() => {
+        sinon.assert.notCalled(pool.acquire);
+        sinon.assert.calledOnce(client.createContainer);
+      });
+    });
+
     it('should reject and remove container if it times out', () => {
       container.wait = noop;
 
@@ -241,4 +359,119 @@ describe('verifier', () => {
 
   });
 
+  describe('ContainerPool', () => {
+    let client, containers, pool, clock;
+
+    beforeEach(() => {
+      clock = sinon.useFakeTimers(Date.now());
+      containers = [];
+      client = {
+        createContainer: sinon.spy((opts, cb) => {
+          const container = {remove: sinon.stub().yields(null, {})};
+
+          containers.push(container);
+          cb(null, container);
+        })
+      };
+      pool = new verifier.ContainerPool(client, {maxWorker: 4, imageTag: '2.1.5'});
+    });
+
+    afterEach(() => {
+      clock.restore();
+    });
+
+    it('should only support languages reading their payload from stdin', () => {
+      expect(pool.supports('python', '2.1.5')).to.be(true);
+      expect(pool.supports('java', '2.1.5')).to.be(false);
+    });
+
+    it('should only support its image tag', () => {
+      expect(pool.supports('python', 'latest')).to.be(false);
+    });
+
+    it('should pre-create network-less containers with no capability', () => {
+      pool.start();
+
+      return Promise.resolve().then(() => {
+        sinon.assert.calledOnce(client.createContainer);
+        sinon.assert.calledWithExactly(
+          client.createContainer,
+          sinon.match({
+            'Image': 'singpath/verifier2-python:2.1.5',
+            'Cmd': ['verify', '--stdin'],
+            'OpenStdin': true,
+            'HostConfig': sinon.match({'CapDrop': ['All'], 'NetworkMode': 'none'})
+          }),
+          sinon.match.func
+        );
+      });
+    });
+
+    it('should resolve to a pre-created container', () => {
+      pool.start();
+
+      return Promise.resolve().then(
+        () => pool.acquire('python')
+      ).then(container => {
+        expect(container).to.be(containers[0]);
+        expect(pool.metrics().python).to.have.property('hits', 1);
+        expect(pool.metrics().python).to.have.property('misses', 0);
+      });
+    });
+
+    it('should create a container if the pool is empty', () => {
+      return pool.acquire('python').then(container => {
+        expect(container).to.be(containers[0]);
+        expect(pool.metrics().python).to.have.property('misses', 1);
+      });
+    });
+
+    it('should refill the pool after each acquisition', () => {
+      pool.start();
+
+      return Promise.resolve().then(
+        () => pool.acquire('python')
+      ).then(() => {
+        sinon.assert.calledTwice(client.createContainer);
+        expect(pool.metrics().python).to.have.property('refills', 2);
+        expect(pool.metrics().python).to.have.property('size', 1);
+      });
+    });
+
+    it('should grow with the arrival rate up to maxWorker', () => {
+      const state = pool.languages.python;
+
+      state.refills = 1;
+      state.refillTime = 1000;
+      expect(pool.targetSize('python')).to.be(1);
+
+      state.arrivals = new Array(120).fill(Date.now());
+      expect(pool.targetSize('python')).to.be(3);
+
+      state.arrivals = new Array(6000).fill(Date.now());
+      expect(pool.targetSize('python')).to.be(4);
+    });
+
+    it('should forget arrivals older than a minute', () => {
+      pool.acquire('python');
+      clock.tick(61000);
+      pool.acquire('python');
+
+      expect(pool.languages.python.arrivals).to.have.length(1);
+    });
+
+    it('should remove its containers when drained', () => {
+      pool.start();
+
+      return Promise.resolve().then(
+        () => pool.drain()
+      ).then(() => {
+        sinon.assert.calledOnce(containers[0].remove);
+        expect(pool.supports('python', '2.1.5')).to.be(false);
+        expect(pool.metrics().python).to.have.property('size', 0);
+      });
+    });
+
+  });
+
 });
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+#
+# Microbenchmarks of the python verifier: TestRunner throughput, printed
+# output capture, payload parsing and end-to-end `verify` latency.
+#
+# usage: python3 benchmarks/micro.py [-k PATTERN] [--scale 1.0]
+#                                    [--output results.json]
+#        python3 benchmarks/micro.py --compare BASE.json NEW.json
+#                                    [--threshold 0.1]
+#
+# Results are durations per iteration in microseconds; --compare exits
+# with 1 when a benchmark median is more than --threshold slower.
+#
+import argparse
+import fnmatch
+import glob
+import importlib.machinery
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from codeverifier import StandardStreams, TestRunner  # noqa: E402
+from codeverifier.cache import TestSuiteCache  # noqa: E402
+
+
+VERIFY_SCRIPT = os.path.join(ROOT, 'verify')
+EXAMPLES = sorted(glob.glob(os.path.join(ROOT, 'examples', '*.yaml')))
+SAMPLES = os.path.join(
+    ROOT, '..', '..', 'deployment', 'load-test', 'samples', 'python.yaml'
+)
+PERCENTILES = (50, 90, 95, 99)
+
+parser = argparse.ArgumentParser(
+    description="Run the python verifier microbenchmarks."
+)
+parser.add_argument(
+    "-k", dest='pattern', default='*',
+    help="Only run the benchmarks matching this glob pattern"
+)
+parser.add_argument(
+    "--scale", type=float, default=1.0,
+    help="Multiply the number of iterations of each benchmark"
+)
+parser.add_argument("-o", "--output", help="Save the results to this file")
+parser.add_argument(
+    "--compare", nargs=2, metavar=('BASE', 'NEW'),
+    help="Compare two saved results instead of running the benchmarks"
+)
+parser.add_argument(
+    "--threshold", type=float, default=0.1,
+    help="Median slowdown reported as a regression (default: 10%%)"
+)
+
+
+def load_verify():
+    loader = importlib.machinery.SourceFileLoader('verify', VERIFY_SCRIPT)
+    return loader.load_module()
+
+
+def run_tests(solution, tests):
+    def bench():
+        # A fresh suite cache, like a new code runner process would have.
+        runner = TestRunner(solution, tests, cache=TestSuiteCache())
+        runner.run()
+        if runner.errors:
+            raise RuntimeError(runner.errors)
+    return bench
+
+
+def print_lines(count, limit):
+    def bench():
+        patcher = StandardStreams(limit=limit)
+        patcher.switch()
+        try:
+            for i in range(count):
+                print('line', i)
+        finally:
+            patcher.restore().getvalue()
+            patcher.close()
+    return bench
+
+
+def parse(fn, payload):
+    def bench():
+        fn(payload)
+    return bench
+
+
+def run_verify(payload):
+    def bench():
+        subprocess.run(
+            [sys.executable, VERIFY_SCRIPT, '-q', payload],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    return bench
+
+
+def benchmarks():
+    """Yield (name, function, iterations) for each benchmark."""
+    verify = load_verify()
+
+    yield 'runner.small', run_tests(
+        'def foo(x):\n  return x * 2\n',
+        '>>> foo(1)\n2\n>>> foo(2)\n4\n>>> foo(3)\n6\n'
+    ), 2000
+
+    yield 'runner.large', run_tests(
+        ''.join(
+            'def f%d(x):\n  return list(range(x))\n' % i for i in range(500)
+        ),
+        '>>> f0(10000) == list(range(10000))\nTrue\n'
+        '>>> f499(2000)\n%r\n' % list(range(2000))
+    ), 200
+
+    yield 'runner.many', run_tests(
+        'def foo(x):\n  return x * 2\n',
+        ''.join('>>> foo(%d)\n%d\n' % (i, i * 2) for i in range(500))
+    ), 100
+
+    yield 'streams.print.capped', print_lines(100000, 64 * 1024), 20
+    yield 'streams.print.unbounded', print_lines(100000, None), 20
+
+    payload = {
+        'solution': ''.join(
+            'def f%d(x):\n  return x + %d\n' % (i, i) for i in range(50)
+        ),
+        'tests': ''.join('>>> f%d(1)\n%d\n' % (i, i + 1) for i in range(50)),
+    }
+    import yaml
+    yield 'parse.yaml', parse(
+        verify.parse_yaml, '---\n' + yaml.safe_dump(payload)
+    ), 200
+    yield 'parse.json', parse(verify.parse_json, json.dumps(payload)), 2000
+
+    for path in EXAMPLES:
+        with open(path) as fp:
+            content = fp.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        yield 'verify.examples.%s' % name, run_verify(content), 10
+
+    if os.path.exists(SAMPLES):
+        with open(SAMPLES) as fp:
+            samples = list(yaml.safe_load_all(fp))
+        for i, sample in enumerate(samples):
+            yield 'verify.samples.%d' % i, run_verify(json.dumps({
+                'solution': sample['solution'], 'tests': sample['tests']
+            })), 10
+
+
+def measure(fn, iterations):
+    fn()  # warm up
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return stats(samples)
+
+
+def stats(samples):
+    samples = sorted(samples)
+    data = {
+        'iterations': len(samples),
+        'mean': sum(samples) / len(samples),
+        'min': samples[0],
+        'max': samples[-1],
+    }
+    for p in PERCENTILES:
+        index = max(0, int(round(len(samples) * p / 100.0)) - 1)
+        data['p%d' % p] = samples[index]
+    return data
+
+
+def run(args):
+    results = {}
+    print('%-28s %8s %12s %12s %12s' % (
+        'benchmark', 'n', 'p50 (us)', 'p95 (us)', 'p99 (us)'
+    ))
+    for name, fn, iterations in benchmarks():
+        if not fnmatch.fnmatch(name, args.pattern):
+            continue
+        result = measure(fn, max(1, int(iterations * args.scale)))
+        results[name] = result
+        print('%-28s %8d %12.1f %12.1f %12.1f' % (
+            name, result['iterations'], result['p50'], result['p95'],
+            result['p99']
+        ))
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'benchmarks': results,
+            }, fp, indent=2, sort_keys=True)
+
+
+def compare(args):
+    with open(args.compare[0]) as fp:
+        base = json.load(fp)['benchmarks']
+    with open(args.compare[1]) as fp:
+        new = json.load(fp)['benchmarks']
+
+    regressions = 0
+    print('%-28s %12s %12s %8s' % (
+        'benchmark', 'base p50', 'new p50', 'change'
+    ))
+    for name in sorted(set(base) & set(new)):
+        before, after = base[name]['p50'], new[name]['p50']
+        change = (after - before) / before if before else 0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print('%-28s %12.1f %12.1f %+7.1f%%%s' % (
+            name, before, after, change * 100, flag
+        ))
+
+    for name in sorted(set(base) ^ set(new)):
+        print('%-28s only in %s' % (name, 'base' if name in base else 'new'))
+
+    exit(1 if regressions else 0)
+
+
+def main(args):
+    if args.compare:
+        compare(args)
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+# Compares the latency of running a solution with `verify`'s fork+exec
+# path (`spawn()`: runner interpreter flags, payload frame on stdin and
+# results on their own pipe) and with the zygote (fork only) path.
+#
+# usage: python3 benchmarks/spawn_latency.py [-n 200]
+#
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codeverifier import RUNNER_FLAGS  # noqa: E402
+from codeverifier.framing import write_frame  # noqa: E402
+from codeverifier.zygote import Zygote  # noqa: E402
+
+
+RUNNER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'runner'
+)
+SOLUTION = 'import math\ndef foo(x):\n  return math.floor(x * 2)\n'
+TESTS = '>>> foo(1)\n2\n>>> foo(2.5)\n5\n'
+
+parser = argparse.ArgumentParser(
+    description="Compare fork+exec and zygote code runner latency."
+)
+parser.add_argument("-n", "--iterations", type=int, default=200)
+
+
+def exec_run():
+    # The same path as `verify`'s `spawn()`: interpreter flags, payload
+    # frame on stdin and results on their own pipe.
+    fd, result_fd = os.pipe()
+    proc = subprocess.Popen(
+        [sys.executable] + RUNNER_FLAGS + [
+            RUNNER_SCRIPT, '--result-fd', str(result_fd)
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        pass_fds=(result_fd,),
+    )
+    os.close(result_fd)
+    try:
+        write_frame(proc.stdin, {'solution': SOLUTION, 'tests': TESTS})
+        proc.stdin.close()
+        while os.read(fd, 65536):
+            pass
+    finally:
+        os.close(fd)
+    if proc.wait(timeout=5) != 0:
+        raise RuntimeError('Code runner exit with code %d' % proc.returncode)
+
+
+def measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.mean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main(args):
+    zygote = Zygote()
+    zygote.warm()
+
+    report = [
+        ('fork+exec', measure(exec_run, args.iterations)),
+        ('zygote', measure(
+            lambda: zygote.run(SOLUTION, TESTS, timeout=5), args.iterations
+        )),
+    ]
+
+    print('%-10s %10s %10s %10s' % (
+        'mode', 'mean (ms)', 'p50 (ms)', 'p95 (ms)'
+    ))
+    for name, stats in report:
+        print('%-10s %10.2f %10.2f %10.2f' % (
+            name, stats['mean'], stats['p50'], stats['p95']
+        ))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+# Measures the code runner import time and the wall time of cold `verify`
+# calls; exits with 1 if startup regressed.
+#
+# usage: python3 benchmarks/startup.py [-n 20] [--max-ms 250]
+#                                      [--baseline startup.json]
+#                                      [--save startup.json]
+#
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VERIFY_SCRIPT = os.path.join(ROOT, 'verify')
+RUNNER_SCRIPT = os.path.join(ROOT, 'runner')
+PAYLOAD = json.dumps({
+    'solution': 'def foo(x):\n  return x * 2\n',
+    'tests': '>>> foo(1)\n2\n>>> foo(2)\n4\n',
+})
+
+parser = argparse.ArgumentParser(
+    description="Measure the python verifier startup time."
+)
+parser.add_argument("-n", "--iterations", type=int, default=20)
+parser.add_argument(
+    "--top", type=int, default=15,
+    help="Number of slowest imports to show"
+)
+parser.add_argument(
+    "--max-ms", type=float,
+    help="Fail if the median cold verify call takes longer"
+)
+parser.add_argument(
+    "--baseline",
+    help="Fail if slower than the results saved in this file"
+)
+parser.add_argument(
+    "--tolerance", type=float, default=0.2,
+    help="Slowdown allowed relative to the baseline (default: 20%%)"
+)
+parser.add_argument("--save", help="Save the results to this file")
+
+
+def import_times(top):
+    """Parse `-X importtime` output of the runner; slowest imports first.
+
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-E', '-s', '-S',
+         RUNNER_SCRIPT, 'foo = 1', '>>> foo\n1'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    times = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        times.append((name.rstrip(), int(self_us), int(cumulative_us)))
+
+    times.sort(key=lambda t: t[2], reverse=True)
+    return times[:top]
+
+
+def cold_calls(iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, VERIFY_SCRIPT, '-q', PAYLOAD],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'min': samples[0],
+        'p50': samples[len(samples) // 2],
+        'max': samples[-1],
+    }
+
+
+def main(args):
+    if sys.version_info >= (3, 7):
+        print('%-40s %10s %10s' % ('import', 'self (ms)', 'cumul (ms)'))
+        for name, self_us, cumulative_us in import_times(args.top):
+            print('%-40s %10.2f %10.2f' % (
+                name, self_us / 1000, cumulative_us / 1000
+            ))
+        print()
+
+    stats = cold_calls(args.iterations)
+    print('cold verify call: min %(min).1f ms, p50 %(p50).1f ms, '
+          'max %(max).1f ms' % stats)
+
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump(stats, fp, indent=2)
+
+    failed = False
+    if args.max_ms is not None and stats['p50'] > args.max_ms:
+        print('FAIL: p50 above %.1f ms' % args.max_ms)
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        limit = baseline['p50'] * (1 + args.tolerance)
+        if stats['p50'] > limit:
+            print('FAIL: p50 regressed from %.1f ms (limit %.1f ms)' % (
+                baseline['p50'], limit
+            ))
+            failed = True
+
+    exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
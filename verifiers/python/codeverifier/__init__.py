@@ -1,16 +1,127 @@
-import doctest
+import errno
 import io
-import logging
 import sys
 
+from codeverifier import compare
+from codeverifier.operations import OperationLimitExceeded
+from codeverifier.cache import suites
+from codeverifier.timing import now_ns
 
-__all__ = ['StandardStreams', 'TestRunner']
+
+__version__ = '3.1.0'
+__all__ = [
+    'CappedStream', 'StandardStreams', 'TestRunner',
+    'TIMEOUT_ERROR', 'UNEXPECTED_ERROR',
+    'MEMORY_LIMIT_ERROR', 'CPU_LIMIT_ERROR', 'FILE_SIZE_LIMIT_ERROR',
+    'OPERATION_LIMIT_ERROR', 'RUNNER_FLAGS',
+]
+
+
+UNEXPECTED_ERROR = 'Unexpected error.'
+TIMEOUT_ERROR = 'The verification timed out.'
+MEMORY_LIMIT_ERROR = 'Memory limit exceeded.'
+CPU_LIMIT_ERROR = 'CPU limit exceeded.'
+FILE_SIZE_LIMIT_ERROR = 'File size limit exceeded.'
+OPERATION_LIMIT_ERROR = 'Operation budget exceeded.'
+PRINTED_LIMIT = 64 * 1024
+TRUNCATION_MARKER = '\n... [%d characters truncated] ...\n'
+# Interpreter flags of the code runner: no site initialization (it only
+# needs the standard library and codeverifier) and no PYTHON* variables.
+RUNNER_FLAGS = ['-E', '-s', '-S']
+
+
+class CappedStream(io.TextIOBase):
+    """Text stream keeping only the head and the tail of what is written.
+
+    Of the `limit` characters kept, the first half is the start of the
+    output and the second half its end; `dropped` counts the characters
+    in between that were discarded.
+
+    Until the limit is reached, writes go straight to a `StringIO`; the
+    tail is then kept in a list, trimmed once it holds twice its size.
+
+    """
+
+    def __init__(self, limit=PRINTED_LIMIT):
+        super().__init__()
+        self.limit = limit
+        self.head_size = limit // 2
+        self.tail_size = limit - self.head_size
+        self.output = io.StringIO()
+        self._write = self.output.write
+        self.room = limit
+        self.head = None
+        self.tail = None
+        self.tail_len = 0
+        self._dropped = 0
+
+    @property
+    def dropped(self):
+        return self._dropped + max(self.tail_len - self.tail_size, 0)
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.output.close()
+        super().close()
+
+    def write(self, s):
+        # StringIO checks the stream is open and `s` a str.
+        size = self._write(s)
+        self.room -= size
+        if self.room < 0:
+            self._cap()
+        return size
+
+    def _write_tail(self, s):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        if not isinstance(s, str):
+            raise TypeError(
+                'string argument expected, got %r' % type(s).__name__
+            )
+
+        self.tail.append(s)
+        self.tail_len += len(s)
+        if self.tail_len > 2 * self.tail_size:
+            self._trim()
+        return len(s)
+
+    def getvalue(self):
+        if self.tail is None:
+            return self.output.getvalue()
+
+        self._trim()
+        tail = self.tail[0]
+        if self.dropped:
+            return self.head + TRUNCATION_MARKER % self.dropped + tail
+        return self.head + tail
+
+    def _cap(self):
+        value = self.output.getvalue()
+        self.output.close()
+        self.head = value[:self.head_size]
+        self.tail = [value[self.head_size:]]
+        self.tail_len = len(self.tail[0])
+        self._trim()
+        self.write = self._write_tail
+
+    def _trim(self):
+        tail = ''.join(self.tail)
+        excess = len(tail) - self.tail_size
+        if excess > 0:
+            self._dropped += excess
+            tail = tail[excess:]
+        self.tail = [tail]
+        self.tail_len = len(tail)
 
 
 class StandardStreams:
 
-    def __init__(self, streams=None):
+    def __init__(self, streams=None, limit=None):
         self.streams = streams if streams else sys
+        self.limit = limit
         self.stdout = None
         self.stderr = None
         self.mock = None
@@ -21,7 +132,10 @@ class StandardStreams:
 
         if self.mock:
             self.mock.close()
-        self.mock = io.StringIO()
+        if self.limit is None:
+            self.mock = io.StringIO()
+        else:
+            self.mock = CappedStream(self.limit)
 
         self.stdout = self.streams.stdout
         self.stderr = self.streams.stderr
@@ -40,6 +154,17 @@ class StandardStreams:
             self.mock.close()
 
 
+def error_message(e):
+    """Return the error reported for an exception raised by a run."""
+    if isinstance(e, MemoryError):
+        return MEMORY_LIMIT_ERROR
+    if isinstance(e, OSError) and e.errno == errno.EFBIG:
+        return FILE_SIZE_LIMIT_ERROR
+    if isinstance(e, OperationLimitExceeded):
+        return OPERATION_LIMIT_ERROR
+    return str(e)
+
+
 class TestRunner(object):
     """Run some python code and tests the local values it generated
     against test written in doctest.
@@ -56,29 +181,66 @@ class TestRunner(object):
 
         return (
             self.results is not None
-            and all(r['correct'] for r in self.results if 'correct' in r)
+            and all(
+                r.get('correct', True) and r.get('within_budget', True)
+                for r in self.results
+            )
         )
 
-    def __init__(self, solution, tests):
+    def __init__(
+        self, solution, tests, cache=None, listener=None,
+        printed_limit=PRINTED_LIMIT, timings=None, profile=None,
+        operations=None
+    ):
         self.solution = solution
         self.tests = tests
+        self.cache = cache
+        self.listener = listener
+        self.printed_limit = printed_limit
         self.results = None
         self.errors = None
         self.printed = None
+        self.truncated = 0
+        # A `codeverifier.timing.Timings` to record the run phases in;
+        # nothing is timed without it.
+        self.timings = timings
+        # A `codeverifier.profiling.Profile` to profile the solution and
+        # its examples with; nothing is profiled without it.
+        self.profile = profile
+        # A `codeverifier.operations.OperationCounter` limiting the lines
+        # the solution and its examples run; nothing is counted without it.
+        self.operations = operations
         self._globals = {}
         # init _globals
         self._exec('')
 
     def run(self):
-        patcher = StandardStreams()
+        patcher = StandardStreams(limit=self.printed_limit)
         patcher.switch()
+        if self.profile is not None:
+            self.profile.enable()
+        if self.operations is not None:
+            self.operations.start()
         try:
-            self._run_solution()
+            if self.timings is None:
+                self._run_solution()
+            else:
+                start = now_ns()
+                self._run_solution()
+                self.timings.add('solution', start)
             self._run_tests()
         except Exception as e:
-            self.errors = str(e)
+            self.errors = error_message(e)
         finally:
-            self.printed = patcher.restore().getvalue()
+            if self.operations is not None:
+                self.operations.stop()
+                if self.operations.exceeded:
+                    self.errors = OPERATION_LIMIT_ERROR
+            if self.profile is not None:
+                self.profile.disable()
+            mock = patcher.restore()
+            self.printed = mock.getvalue()
+            self.truncated = getattr(mock, 'dropped', 0)
             patcher.close()
 
     def to_dict(self):
@@ -86,10 +248,18 @@ class TestRunner(object):
             'solved': self.solved,
             'printed': self.printed
         }
+        if self.truncated:
+            data['truncated'] = self.truncated
         if self.errors:
             data['errors'] = self.errors
         else:
             data['results'] = self.results
+        if self.timings is not None:
+            data['timings'] = self.timings.to_dict()
+        if self.profile is not None:
+            data['profile'] = self.profile.to_list()
+        if self.operations is not None:
+            data['operations'] = self.operations.count
 
         return data
 
@@ -101,26 +271,100 @@ class TestRunner(object):
         )
 
     def _run_tests(self):
-        examples = doctest.DocTestParser().get_examples(self.tests)
-        self.results = [self._run_example(e) for e in examples]
+        if self.timings is None:
+            suite = (self.cache or suites).get(self.tests)
+            run = self._run_example
+        else:
+            start = now_ns()
+            suite = (self.cache or suites).get(self.tests)
+            self.timings.add('suite', start)
+            run = self._timed_example
+
+        if any(e.budget is not None for e in suite.examples):
+            # Calibrate before the examples run (and, in isolation mode,
+            # before they are forked).
+            from codeverifier import budget
+
+            budget.speed_factor()
+
+        if self.listener is None:
+            self.results = [run(e) for e in suite.examples]
+            return
+
+        results = []
+        for example in suite.examples:
+            self.listener.start(example.call)
+            result = run(example)
+            self.listener.result(result)
+            results.append(result)
+        self.results = results
+
+    def _timed_example(self, example):
+        start = now_ns()
+        try:
+            return self._run_example(example)
+        finally:
+            self.timings.example(start)
 
     def _run_example(self, example):
-        """See https://docs.python.org/3.4/library/doctest.html#doctest.Example
+        """Run a `codeverifier.cache.Example`.
 
         """
-        call = example.source.strip()
+        if example.error is not None:
+            raise example.error
+
+        if example.budget is not None:
+            return self._run_budgeted_example(example)
+
         if not example.want:
-            self._exec(call)
-            return {'call': call}
+            exec(example.code, self._globals)
+            return {'call': example.call}
+
+        expected = example.expected_value(self._globals)
+        got = eval(example.code, self._globals)
+        return self._timed_result(example.call, expected, got)
+
+    def _run_budgeted_example(self, example):
+        from codeverifier import budget
+
+        limit = budget.scaled(example.budget)
+
+        if not example.want:
+            _, elapsed = budget.measure(
+                lambda: exec(example.code, self._globals), limit
+            )
+            result = {'call': example.call}
+        else:
+            expected = example.expected_value(self._globals)
+            got, elapsed = budget.measure(
+                lambda: eval(example.code, self._globals), limit
+            )
+            result = self._timed_result(example.call, expected, got)
+
+        result.update(budget.report(elapsed, limit))
+        return result
+
+    def _timed_result(self, call, expected, got):
+        if self.timings is None:
+            return self._result(call, expected, got)
+
+        start = now_ns()
+        result = self._result(call, expected, got)
+        self.timings.add('repr', start)
+        return result
 
-        expected = self._eval(example.want)
-        got = self._eval(call)
-        return {
+    def _result(self, call, expected, got):
+        result = {
             'call': call,
-            'expected': repr(expected),
-            'received': repr(got),
-            'correct': got == expected
+            'expected': compare.render(expected),
+            'received': compare.render(got),
+            'correct': compare.equal(expected, got)
         }
+        if not result['correct']:
+            summary = compare.mismatch(expected, got)
+            if summary:
+                result['mismatch'] = summary
+        return result
 
     def _exec(self, source):
         compiled = compile(source, self.FILENAME, self.MODE)
@@ -0,0 +1,207 @@
+"""Time budgets of doctest examples.
+
+An example whose call ends with a budget directive, e.g.::
+
+    >>> solve(big_input)  # budget: 50ms
+
+must also run within that time (units: ns, us, ms or s). Its result gets
+the time the call took (`elapsed`) and the budget it had (`budget`), in
+milliseconds, and a `within_budget` flag.
+
+Budgets are written for a reference host. They are scaled by the speed
+of the running host, measured once per process with a reference workload
+(or set with the `CODEVERIFIER_SPEED_FACTOR` environment variable).
+
+"""
+import os
+import select
+import signal
+import time
+
+from codeverifier.timing import now_ns
+
+
+__all__ = ['parse', 'measure', 'report', 'scaled', 'speed_factor']
+
+
+DIRECTIVE = r'#\s*budget:\s*(\d+(?:\.\d+)?)\s*(ns|us|ms|s)\s*$'
+UNITS = {'ns': 1, 'us': 10 ** 3, 'ms': 10 ** 6, 's': 10 ** 9}
+# Best of that many runs of an example over its budget; the runs after
+# the first one are in a forked child.
+REPEAT = 5
+# Runs over that many times their budget are not repeated.
+HOPELESS = 10
+SPEED_FACTOR_ENV = 'CODEVERIFIER_SPEED_FACTOR'
+# Best time of `_reference()` on the reference host (CPython 3.11 on a
+# 2.x GHz Xeon core), in nanoseconds.
+REFERENCE_NS = 3000000
+REFERENCE_REPEAT = 5
+MIN_FACTOR = 0.2
+MAX_FACTOR = 20.0
+
+_speed_factor = None
+
+
+def parse(call):
+    """Return the budget (in ns) of an example call, or None."""
+    if '#' not in call:
+        return None
+
+    # Only imported for calls with a comment; re is slow to import.
+    import re
+
+    match = re.search(
+        DIRECTIVE, call.rstrip('\n').rsplit('\n', 1)[-1], re.IGNORECASE
+    )
+    if match is None:
+        return None
+
+    value, unit = match.groups()
+    return int(float(value) * UNITS[unit.lower()])
+
+
+def measure(run, budget):
+    """Call `run` and return its result and its duration (in ns).
+
+    A call over its budget (but not way over) is repeated, up to `REPEAT`
+    times in all, in a forked child discarding their side effects and
+    printed output, and the duration is the best one. Only the first call
+    counts when the code runner cannot fork (e.g. with a processes limit).
+
+    """
+    start = now_ns()
+    result = run()
+    elapsed = now_ns() - start
+
+    if budget < elapsed <= budget * HOPELESS:
+        best = _repeat(run, budget)
+        if best is not None:
+            elapsed = min(elapsed, best)
+
+    return result, elapsed
+
+
+def report(elapsed, budget):
+    return {
+        'elapsed': round(elapsed / 1e6, 3),
+        'budget': round(budget / 1e6, 3),
+        'within_budget': elapsed <= budget,
+    }
+
+
+def scaled(budget):
+    """Return a budget scaled to the speed of the running host."""
+    return int(budget * speed_factor())
+
+
+def speed_factor():
+    """Return how much slower than the reference host this host is.
+
+    Measured on first use and cached; forked processes inherit it.
+
+    """
+    global _speed_factor
+
+    if _speed_factor is None:
+        env = os.environ.get(SPEED_FACTOR_ENV)
+        if env:
+            _speed_factor = float(env)
+        else:
+            _speed_factor = min(
+                max(_reference_time() / REFERENCE_NS, MIN_FACTOR), MAX_FACTOR
+            )
+
+    return _speed_factor
+
+
+def _repeat(run, budget):
+    """Return the best time of `run` repeated in a child, or None."""
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.fork()
+    except OSError:
+        os.close(read_fd)
+        os.close(write_fd)
+        return None
+
+    if pid == 0:
+        code = 1
+        try:
+            os.close(read_fd)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            null = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(null, 1)
+            os.dup2(null, 2)
+            os.write(write_fd, str(_best_time(run, budget)).encode('ascii'))
+            code = 0
+        finally:
+            os._exit(code)
+
+    os.close(write_fd)
+    try:
+        data = _read_all(read_fd, budget * HOPELESS * REPEAT / 1e9)
+    finally:
+        os.close(read_fd)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+
+    try:
+        return int(data)
+    except ValueError:
+        # The child failed or timed out.
+        return None
+
+
+def _best_time(run, budget):
+    best = None
+    for _ in range(REPEAT - 1):
+        start = now_ns()
+        run()
+        elapsed = now_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+        if best <= budget or best > budget * HOPELESS:
+            break
+    return best
+
+
+def _read_all(fd, timeout):
+    """Read `fd` until EOF, or for up to `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    data = b''
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return data
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            continue
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def _reference_time():
+    best = None
+    for _ in range(REFERENCE_REPEAT):
+        start = now_ns()
+        _reference()
+        elapsed = now_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _reference():
+    # Loops, arithmetic, list and dict operations, like most solutions.
+    table = {}
+    items = []
+    total = 0
+    for i in range(20000):
+        total += i * i % 7
+        items.append(total)
+        table[i % 1000] = total
+    items.sort(reverse=True)
+    return total + len(table) + items[0]
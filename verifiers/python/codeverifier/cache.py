@@ -0,0 +1,194 @@
+"""Parsed and compiled test suites, cached across runs.
+
+Many submissions share the same tests. A `TestSuite` holds the doctest
+examples of some tests with their calls already compiled and, when the
+expected value is a literal, that value already evaluated.
+
+`TestSuiteCache` keeps the most recently used suites in memory and,
+optionally, the parsed examples and literal expected values on disk.
+
+"""
+import ast
+import collections
+import marshal
+import os
+import threading
+
+from codeverifier.parser import parse_examples
+
+
+__all__ = ['Example', 'TestSuite', 'TestSuiteCache', 'suites']
+
+
+FILENAME = '<string>'
+CACHE_SIZE = 128
+CACHE_DIR_ENV = 'CODEVERIFIER_SUITE_CACHE'
+# Bump when the on-disk format changes.
+DISK_FORMAT = 1
+
+
+class Example(object):
+    """A doctest example with its call compiled.
+
+    `expected` is the marshaled expected value when `want` is a literal;
+    unmarshaling it gives each run its own copy. Otherwise the want is
+    evaluated in the solution globals on each run.
+
+    `budget` is the time budget (in ns) set by the call budget directive,
+    if any (see `codeverifier.budget`).
+
+    """
+
+    __slots__ = (
+        'call', 'want', 'expected', 'code', 'want_code', 'error', 'budget'
+    )
+
+    def __init__(self, call, want, expected=None):
+        self.call = call
+        self.want = want
+        self.expected = expected
+        self.code = None
+        self.want_code = None
+        self.error = None
+        self.budget = None
+        if 'budget:' in call.lower():
+            # Only imported for calls that may have a budget directive.
+            from codeverifier import budget
+
+            self.budget = budget.parse(call)
+
+        # Compilation errors are raised when the example runs, like
+        # they would be if the call was compiled then.
+        try:
+            if want:
+                if expected is None:
+                    self.want_code = compile(want, FILENAME, 'eval')
+                self.code = compile(call, FILENAME, 'eval')
+            else:
+                self.code = compile(call, FILENAME, 'exec')
+        except SyntaxError as e:
+            self.error = e
+
+    @classmethod
+    def parse(cls, source, want):
+        return cls(source.strip(), want, literal(want) if want else None)
+
+    def expected_value(self, globals):
+        if self.expected is not None:
+            return marshal.loads(self.expected)
+        return eval(self.want_code, globals)
+
+
+class TestSuite(object):
+
+    def __init__(self, examples):
+        self.examples = examples
+
+    @classmethod
+    def parse(cls, tests):
+        return cls([
+            Example.parse(source, want)
+            for source, want in parse_examples(tests)
+        ])
+
+    def dumps(self):
+        return marshal.dumps((
+            DISK_FORMAT,
+            [(e.call, e.want, e.expected) for e in self.examples]
+        ))
+
+    @classmethod
+    def loads(cls, data):
+        version, examples = marshal.loads(data)
+        if version != DISK_FORMAT:
+            raise ValueError('Unsupported test suite format %r' % version)
+        return cls([Example(*e) for e in examples])
+
+
+class TestSuiteCache(object):
+    """LRU cache of test suites, keyed by their tests.
+
+    With a `path`, parsed suites are also stored in that directory, named
+    after a hash of their tests, and reloaded from it by new processes.
+
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.suites = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, tests):
+        with self.lock:
+            suite = self.suites.get(tests)
+            if suite is not None:
+                self.suites.move_to_end(tests)
+                return suite
+
+        suite = self._load(tests)
+        if suite is None:
+            suite = TestSuite.parse(tests)
+            self._save(tests, suite)
+
+        with self.lock:
+            self.suites[tests] = suite
+            while len(self.suites) > self.maxsize:
+                self.suites.popitem(last=False)
+
+        return suite
+
+    def clear(self):
+        with self.lock:
+            self.suites.clear()
+
+    def _file(self, tests):
+        import hashlib
+
+        key = hashlib.sha256(tests.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, '%s.suite' % key)
+
+    def _load(self, tests):
+        if self.path is None:
+            return
+
+        try:
+            with open(self._file(tests), 'rb') as fp:
+                return TestSuite.loads(fp.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            _warn('Failed to load cached test suite: %s', e)
+
+    def _save(self, tests, suite):
+        if self.path is None:
+            return
+
+        import tempfile
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path)
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(suite.dumps())
+            os.replace(tmp, self._file(tests))
+        except (OSError, ValueError) as e:
+            _warn('Failed to cache test suite: %s', e)
+
+
+def _warn(msg, *args):
+    # logging is only imported when needed; it is slow to import.
+    import logging
+
+    logging.warning(msg, *args)
+
+
+def literal(want):
+    """Return the marshaled value of want if it is a literal, else None."""
+    try:
+        return marshal.dumps(ast.literal_eval(want.strip()))
+    except (ValueError, SyntaxError, TypeError, MemoryError, RuntimeError):
+        return None
+
+
+suites = TestSuiteCache(path=os.environ.get(CACHE_DIR_ENV) or None)
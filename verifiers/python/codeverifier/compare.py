@@ -0,0 +1,207 @@
+"""Comparison and rendering of example values.
+
+`equal()` compares an example expected value with the value received;
+plain `==` is tried first. Expected floats (alone or in lists, tuples and
+dicts) only need to be within a tolerance, and array-likes (e.g. NumPy arrays,
+whose `==` returns an array) are equal when all their elements are.
+
+`render()` returns a repr capped in size; a large value is not fully
+rendered to be truncated afterward.
+
+`mismatch()` describes where a received value first differs from the
+expected one; it is only called for failing examples.
+
+"""
+import math
+import numbers
+import reprlib
+
+
+__all__ = ['equal', 'render', 'mismatch']
+
+
+REL_TOLERANCE = 1e-9
+ABS_TOLERANCE = 1e-12
+REPR_LIMIT = 4096
+SUMMARY_LIMIT = 80
+# Containers of up to that many items (in total) are rendered with repr().
+SMALL_SIZE = 256
+
+
+def equal(expected, got, rel_tol=REL_TOLERANCE, abs_tol=ABS_TOLERANCE):
+    """Tell if a received value matches the expected one."""
+    try:
+        if _truth(got == expected, expected, got):
+            return True
+    except (TypeError, ValueError):
+        # e.g. lists of arrays; their elements are compared one by one.
+        pass
+
+    if _is_number(expected) and _is_number(got):
+        return _close(expected, got, rel_tol, abs_tol)
+
+    if isinstance(expected, (list, tuple)) and type(got) is type(expected):
+        return len(got) == len(expected) and all(
+            equal(e, g, rel_tol, abs_tol) for e, g in zip(expected, got)
+        )
+
+    if isinstance(expected, dict) and isinstance(got, dict):
+        return set(got) == set(expected) and all(
+            equal(expected[k], got[k], rel_tol, abs_tol) for k in expected
+        )
+
+    if _is_array(expected) and _is_array(got):
+        return _array_close(expected, got, rel_tol, abs_tol)
+
+    return False
+
+
+def render(value, limit=REPR_LIMIT):
+    """Return the repr of a value, truncated to `limit` characters.
+
+    Small values are rendered with `repr()`; larger containers only have
+    their first items rendered.
+
+    """
+    if _size(value, SMALL_SIZE) <= SMALL_SIZE:
+        text = repr(value)
+    else:
+        text = _Repr(limit).repr(value)
+
+    if len(text) > limit:
+        return text[:limit - 3] + '...'
+    return text
+
+
+def mismatch(expected, got, limit=SUMMARY_LIMIT):
+    """Describe the first difference between two values that are not equal.
+
+    Returns None when the values differ as a whole; the expected and
+    received reprs already tell how.
+
+    """
+    path = []
+    while True:
+        sequences = isinstance(expected, (list, tuple))
+        if sequences and type(got) is type(expected):
+            index = _first_difference(expected, got)
+            if index is None:
+                return _at(path, 'expected %d items, got %d' % (
+                    len(expected), len(got)
+                ))
+            path.append('[%d]' % index)
+            expected, got = expected[index], got[index]
+        elif isinstance(expected, dict) and isinstance(got, dict):
+            for key in expected:
+                if key not in got:
+                    return _at(path, 'missing key %s' % render(key, limit))
+            for key in got:
+                if key not in expected:
+                    return _at(
+                        path, 'unexpected key %s' % render(key, limit)
+                    )
+            keys = [k for k in expected if not equal(expected[k], got[k])]
+            if not keys:
+                break
+            path.append('[%s]' % render(keys[0], limit))
+            expected, got = expected[keys[0]], got[keys[0]]
+        else:
+            break
+
+    if not path:
+        return None
+    return _at(path, 'expected %s, got %s' % (
+        render(expected, limit), render(got, limit)
+    ))
+
+
+def _at(path, description):
+    if not path:
+        return description[0].upper() + description[1:] + '.'
+    return 'At %s: %s.' % (''.join(path), description)
+
+
+def _first_difference(expected, got):
+    for i, (e, g) in enumerate(zip(expected, got)):
+        if not equal(e, g):
+            return i
+    return None
+
+
+def _truth(result, expected, got):
+    if isinstance(result, bool):
+        return result
+
+    # Array-likes compare element-wise; beware of broadcasting.
+    reduce_all = getattr(result, 'all', None)
+    if callable(reduce_all):
+        if getattr(expected, 'shape', None) != getattr(got, 'shape', None):
+            return False
+        return bool(reduce_all())
+
+    return bool(result)
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _close(expected, got, rel_tol, abs_tol):
+    # An expected int is exact; 1 is not 1.0000000001.
+    if isinstance(expected, numbers.Integral):
+        return False
+    try:
+        if math.isinf(expected) or math.isinf(got):
+            return False
+        return abs(got - expected) <= max(
+            rel_tol * max(abs(expected), abs(got)), abs_tol
+        )
+    except OverflowError:
+        # An int too large for a float; it cannot be close to one.
+        return False
+
+
+def _is_array(value):
+    return hasattr(value, 'shape') and callable(getattr(value, 'all', None))
+
+
+def _array_close(expected, got, rel_tol, abs_tol):
+    if expected.shape != got.shape:
+        return False
+    try:
+        return bool(
+            (abs(got - expected) <= abs_tol + rel_tol * abs(expected)).all()
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def _size(value, limit):
+    """Count the items of a value, giving up once over `limit`."""
+    if isinstance(value, (str, bytes)):
+        return 1 + len(value) // SUMMARY_LIMIT
+
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    else:
+        return 1
+
+    size = 1
+    for item in items:
+        size += _size(item, limit - size)
+        if size > limit:
+            break
+    return size
+
+
+class _Repr(reprlib.Repr):
+
+    def __init__(self, limit):
+        reprlib.Repr.__init__(self)
+        self.maxlevel = 6
+        self.maxtuple = self.maxlist = self.maxarray = 100
+        self.maxset = self.maxfrozenset = self.maxdeque = 100
+        self.maxdict = 50
+        self.maxstring = self.maxlong = self.maxother = limit
@@ -0,0 +1,67 @@
+"""Length-prefixed frames.
+
+Each frame is a 4 bytes big-endian unsigned length followed by that many
+bytes of payload: a UTF-8 encoded JSON document, or a document encoded
+with an other `codeverifier.payload` codec both ends agreed on.
+
+"""
+import struct
+
+from codeverifier import payload
+
+
+__all__ = ['MAX_FRAME_SIZE', 'read_frame', 'write_frame', 'FrameError']
+
+
+HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+class FrameError(ValueError):
+    pass
+
+
+def read_frame(fp, max_size=MAX_FRAME_SIZE, codec=None):
+    """Read one frame from a binary file object and decode its payload.
+
+    The payload is read into a single buffer and decoded with `codec`
+    (JSON by default). Returns None if the stream ended before a new
+    frame started.
+
+    """
+    header = _read_exactly(fp, HEADER.size)
+    if header is None:
+        return None
+
+    size, = HEADER.unpack(header)
+    if size > max_size:
+        raise FrameError('Frame too large (%d bytes)' % size)
+
+    data = _read_exactly(fp, size) if size else b''
+    if data is None:
+        raise FrameError('Truncated frame')
+
+    return (codec or payload.CODECS['json']).loads(data)
+
+
+def write_frame(fp, obj, codec=None):
+    """Encode obj (to JSON by default) and write it as one frame."""
+    data = (codec or payload.CODECS['json']).dumps(obj)
+    fp.write(HEADER.pack(len(data)))
+    fp.write(data)
+    fp.flush()
+
+
+def _read_exactly(fp, size):
+    # Read straight into the returned buffer instead of joining chunks.
+    data = bytearray(size)
+    view = memoryview(data)
+    pos = 0
+    while pos < size:
+        count = fp.readinto(view[pos:])
+        if not count:
+            if pos == 0:
+                return None
+            raise FrameError('Truncated frame')
+        pos += count
+    return data
@@ -0,0 +1,384 @@
+"""TestRunner running each example in a copy-on-write fork.
+
+The solution runs once in the code runner, which then forks a "holder"
+child keeping that state. For each example, the holder forks a worker
+that runs it, with its own timeout: when the example completes, the
+worker takes over as the holder, so the next example sees its side
+effects; when it crashes or times out, the holder (with the state from
+before it) reports the failure and carries on. A slow, hanging or
+crashing example only fails itself.
+
+Examples run one after the other, in order: an example may depend on
+what the previous ones changed (e.g. `>>> stack.pop()` twice).
+
+An example failing in a child gets a result with a `correct` of `False`
+and an `error` instead of failing the whole run; an example without an
+expected output (e.g. `>>> a = 1`) raising an exception still fails it.
+
+With an operation budget, each worker sends back its count, which carries
+on from the count of the state it was forked from: the budget covers the
+whole run. Lines run by an example crashing or timing out are not counted.
+
+"""
+import io
+import json
+import os
+import select
+import signal
+import sys
+import time
+
+from codeverifier import (
+    OPERATION_LIMIT_ERROR, TIMEOUT_ERROR, UNEXPECTED_ERROR, CappedStream,
+    TestRunner, error_message
+)
+from codeverifier.cache import suites
+from codeverifier.limits import signal_error
+from codeverifier.operations import OperationLimitExceeded
+from codeverifier.timing import now_ns
+
+
+__all__ = ['IsolatedTestRunner', 'PROCESSES']
+
+
+EXAMPLE_TIMEOUT = 2
+# Seconds kept, before the code runner is killed, to send the results.
+TIME_LIMIT_MARGIN = 0.5
+# Processes running at once besides the code runner: the holder, its
+# worker (and the child repeating a budgeted example it runs) and the
+# previous holder while it exits.
+PROCESSES = 4
+PR_SET_CHILD_SUBREAPER = 36
+
+
+class IsolatedTestRunner(TestRunner):
+    """TestRunner running each example in a fork.
+
+    Each example runs for up to `example_timeout` seconds, and no longer
+    than `time_limit` seconds after the runner is created. Examples run in
+    the code runner itself when it cannot fork (e.g. with a processes
+    limit).
+
+    """
+
+    def __init__(
+        self, solution, tests, example_timeout=EXAMPLE_TIMEOUT,
+        time_limit=None, **kw
+    ):
+        super().__init__(solution, tests, **kw)
+        self.example_timeout = example_timeout
+        # Examples still running `time_limit` seconds from now time out,
+        # so the results get back before the code runner is killed.
+        self.deadline = None
+        if time_limit is not None:
+            self.deadline = time.monotonic() + time_limit
+
+    def _run_tests(self):
+        suite = (self.cache or suites).get(self.tests)
+        if any(e.budget is not None for e in suite.examples):
+            # Calibrate once, before the holder is forked.
+            from codeverifier import budget
+
+            budget.speed_factor()
+
+        chain = _Chain.start(self, suite.examples)
+        if chain is None:
+            super()._run_tests()
+            return
+
+        results = []
+        try:
+            for i, example in enumerate(suite.examples):
+                if example.error is not None:
+                    raise example.error
+
+                if self.listener is not None:
+                    self.listener.start(example.call)
+                timeout = self._timeout()
+                if timeout > 0:
+                    result = self._run_in_chain(chain, i, example, timeout)
+                else:
+                    self._record(None)
+                    result = _failed(example, TIMEOUT_ERROR)
+                if self.listener is not None:
+                    self.listener.result(result)
+                results.append(result)
+        finally:
+            chain.close()
+
+        self.results = results
+
+    def _timeout(self):
+        if self.deadline is None:
+            return self.example_timeout
+        return min(self.example_timeout, self.deadline - time.monotonic())
+
+    def _record(self, elapsed):
+        # Failed examples get a null duration; the durations stay in line
+        # with the results.
+        if self.timings is not None:
+            self.timings.examples.append(elapsed)
+
+    def _run_in_chain(self, chain, i, example, timeout):
+        event = chain.run(i, timeout)
+        if self.operations is not None and event.get('operations'):
+            # The worker count carries on from the code runner's.
+            self.operations.update(event['operations'])
+            if event['operations'] > self.operations.limit:
+                self.operations.exceeded = True
+                raise OperationLimitExceeded()
+
+        if event.get('fatal') is not None:
+            raise _ExampleError(event['fatal'])
+
+        if event.get('failed') is not None:
+            self._record(None)
+            return _failed(example, event['failed'])
+
+        if event.get('printed'):
+            sys.stdout.write(event['printed'])
+        self._record(event.get('elapsed'))
+        return event['result']
+
+    def _hold(self, examples, commands, events):
+        """Run the examples the code runner asks for; never returns."""
+        code = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if self.profile is not None:
+                # The code runner profile cannot include forked examples.
+                self.profile.disable()
+
+            while True:
+                line = _read_line(commands)
+                if not line:
+                    break
+                i = int(line)
+                self._fork_worker(examples[i], i, events)
+            code = 0
+        finally:
+            os._exit(code)
+
+    def _fork_worker(self, example, i, events):
+        """Run an example in a worker taking over if it completes."""
+        read_fd, write_fd = os.pipe()
+        try:
+            pid = os.fork()
+        except OSError:
+            os.close(read_fd)
+            os.close(write_fd)
+            # Run in the holder instead; it keeps the example effects.
+            _send(events, self._work(example, i))
+            return
+
+        if pid == 0:
+            os.close(read_fd)
+            _send(events, {'index': i, 'worker': os.getpid()})
+            signal.alarm(int(self.example_timeout) + 1)
+            event = self._work(example, i)
+            signal.alarm(0)
+            _send(events, event)
+            # Take over as the holder; the previous one exits.
+            os.write(write_fd, b'.')
+            os.close(write_fd)
+            return
+
+        os.close(write_fd)
+        handed_over = os.read(read_fd, 1)
+        os.close(read_fd)
+        if handed_over:
+            os._exit(0)
+
+        _, status = os.waitpid(pid, 0)
+        if os.WIFSIGNALED(status):
+            error = signal_error(os.WTERMSIG(status)) or UNEXPECTED_ERROR
+        else:
+            error = UNEXPECTED_ERROR
+        # Starts a new line should the worker have died mid-event.
+        os.write(events, b'\n')
+        _send(events, {'index': i, 'failed': error})
+
+    def _work(self, example, i):
+        if self.printed_limit is None:
+            stream = io.StringIO()
+        else:
+            stream = CappedStream(self.printed_limit)
+        sys.stdout = sys.stderr = stream
+
+        event = {'index': i}
+        start = now_ns()
+        try:
+            event['result'] = self._run_example(example)
+        except Exception as e:
+            if not example.want:
+                event['fatal'] = error_message(e)
+            event['result'] = _failed(example, error_message(e))
+        event['elapsed'] = now_ns() - start
+        if self.operations is not None:
+            event['operations'] = self.operations.current()
+            if self.operations.exceeded:
+                event['result'] = _failed(example, OPERATION_LIMIT_ERROR)
+        event['printed'] = stream.getvalue()
+
+        try:
+            json.dumps(event)
+        except Exception as e:
+            event = {
+                'index': i, 'result': _failed(example, str(e)),
+                'operations': event.get('operations'),
+            }
+        return event
+
+
+class _Chain(object):
+    """The code runner end of the holder and worker processes."""
+
+    def __init__(self, holder, commands, events):
+        self.holder = holder
+        self.worker = None
+        self.commands = commands
+        self.events = events
+        self.buffer = b''
+
+    @classmethod
+    def start(cls, runner, examples):
+        """Fork the first holder; return None if it cannot fork."""
+        # Holders left behind by a worker taking over become children of
+        # the code runner, which reaps them.
+        _set_child_subreaper()
+
+        commands_read, commands_write = os.pipe()
+        events_read, events_write = os.pipe()
+        try:
+            pid = os.fork()
+        except OSError:
+            for fd in (
+                commands_read, commands_write, events_read, events_write
+            ):
+                os.close(fd)
+            return None
+
+        if pid == 0:
+            os.close(commands_write)
+            os.close(events_read)
+            runner._hold(examples, commands_read, events_write)
+
+        os.close(commands_read)
+        os.close(events_write)
+        return cls(pid, commands_write, events_read)
+
+    def run(self, i, timeout):
+        """Run example `i` and return its final event."""
+        os.write(self.commands, ('%d\n' % i).encode('ascii'))
+        deadline = time.monotonic() + timeout
+        timed_out = False
+        while True:
+            event = self._next(None if timed_out else deadline)
+            if event is None:
+                if self.worker is None:
+                    # The holder itself hangs; nothing can take over.
+                    raise _ExampleError(TIMEOUT_ERROR)
+                _kill(self.worker)
+                timed_out = True
+                continue
+
+            if event.get('index') != i:
+                continue
+            if 'worker' in event:
+                self.worker = event['worker']
+            elif 'failed' in event:
+                self.worker = None
+                if timed_out:
+                    event['failed'] = TIMEOUT_ERROR
+                return event
+            elif 'result' in event:
+                if self.worker is not None:
+                    previous, self.holder = self.holder, self.worker
+                    self.worker = None
+                    _reap(previous)
+                return event
+
+    def close(self):
+        os.close(self.commands)
+        os.close(self.events)
+        if self.worker is not None:
+            _kill(self.worker)
+        _kill(self.holder)
+        _reap(self.holder)
+
+    def _next(self, deadline):
+        """Return the next event, or None once past the deadline."""
+        while True:
+            while b'\n' not in self.buffer:
+                if deadline is None:
+                    remaining = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+
+                ready, _, _ = select.select([self.events], [], [], remaining)
+                if not ready:
+                    continue
+                chunk = os.read(self.events, 65536)
+                if not chunk:
+                    raise _ExampleError(UNEXPECTED_ERROR)
+                self.buffer += chunk
+
+            line, self.buffer = self.buffer.split(b'\n', 1)
+            try:
+                event = json.loads(line.decode('utf-8'))
+            except ValueError:
+                # e.g. the end of an event a worker died writing.
+                continue
+            if isinstance(event, dict):
+                return event
+
+
+class _ExampleError(Exception):
+    pass
+
+
+def _send(fd, event):
+    data = (json.dumps(event) + '\n').encode('utf-8')
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def _read_line(fd):
+    line = b''
+    while not line.endswith(b'\n'):
+        chunk = os.read(fd, 1)
+        if not chunk:
+            return b''
+        line += chunk
+    return line
+
+
+def _failed(example, error):
+    return {'call': example.call, 'correct': False, 'error': error}
+
+
+def _kill(pid):
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _reap(pid):
+    try:
+        os.waitpid(pid, 0)
+    except ChildProcessError:
+        # Not a child of ours: subreapers are Linux only.
+        pass
+
+
+def _set_child_subreaper():
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0)
+    except (ImportError, OSError, AttributeError):
+        pass
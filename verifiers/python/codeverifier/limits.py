@@ -0,0 +1,84 @@
+"""Resource limits for the code runner children.
+
+"""
+import resource
+import signal
+
+from codeverifier import CPU_LIMIT_ERROR, FILE_SIZE_LIMIT_ERROR
+
+
+__all__ = ['Limits', 'LimitExceeded', 'signal_error', 'usage']
+
+
+MB = 1024 * 1024
+
+MAX_MEMORY = 512 * MB
+MAX_CPU = 4
+MAX_PROCESSES = 0
+MAX_FILE_SIZE = 8 * MB
+
+
+class LimitExceeded(ChildProcessError):
+    """The code runner was killed for exceeding one of its limits."""
+
+
+class Limits(object):
+    """RLIMIT_AS, RLIMIT_CPU, RLIMIT_NPROC and RLIMIT_FSIZE limits.
+
+    A limit set to None is left unchanged. `apply()` is meant to be
+    called in the child, before it runs any solution.
+
+    """
+
+    def __init__(
+        self, memory=MAX_MEMORY, cpu=MAX_CPU, processes=MAX_PROCESSES,
+        file_size=MAX_FILE_SIZE
+    ):
+        self.memory = memory
+        self.cpu = cpu
+        self.processes = processes
+        self.file_size = file_size
+
+    def apply(self):
+        if self.memory is not None:
+            _set(resource.RLIMIT_AS, self.memory)
+
+        if self.cpu is not None:
+            # SIGXCPU at the soft limit, SIGKILL one second later.
+            _set(resource.RLIMIT_CPU, self.cpu, self.cpu + 1)
+
+        if self.processes is not None:
+            _set(resource.RLIMIT_NPROC, self.processes)
+
+        if self.file_size is not None:
+            _set(resource.RLIMIT_FSIZE, self.file_size)
+
+
+def _set(name, soft, hard=None):
+    hard = soft if hard is None else hard
+    _, current = resource.getrlimit(name)
+    if current != resource.RLIM_INFINITY:
+        hard = min(hard, current)
+        soft = min(soft, hard)
+    resource.setrlimit(name, (soft, hard))
+
+
+def signal_error(signum):
+    """Return the error for a child killed by signum, if it is a limit's.
+
+    """
+    if signum == signal.SIGXCPU:
+        return CPU_LIMIT_ERROR
+    if signum == signal.SIGXFSZ:
+        return FILE_SIZE_LIMIT_ERROR
+
+
+def usage():
+    """Peak RSS (in KiB) and CPU time (in seconds) of terminated children.
+
+    """
+    stats = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'maxrss': stats.ru_maxrss,
+        'cpu': round(stats.ru_utime + stats.ru_stime, 6),
+    }
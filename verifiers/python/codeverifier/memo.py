@@ -0,0 +1,253 @@
+"""Content-addressed memoization of verification results.
+
+Results are stored in a sqlite database, keyed by a hash of the
+verifier version, the normalized solution, the tests and the options
+the result depends on (e.g. resource limits). Entries expire
+after `ttl` seconds and the least recently used ones are evicted once
+the stored results exceed `max_size` bytes.
+
+"""
+import ast
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+import time
+
+import codeverifier
+
+
+__all__ = ['ResultCache', 'is_deterministic', 'result_key']
+
+
+MAX_SIZE = 64 * 1024 * 1024
+TTL = 24 * 60 * 60
+
+# Solutions importing those modules may not produce the same result twice.
+NONDETERMINISTIC_MODULES = frozenset([
+    'builtins',
+    'ctypes',
+    'datetime',
+    'gc',
+    'glob',
+    'importlib',
+    'io',
+    'os',
+    'pathlib',
+    'platform',
+    'random',
+    'resource',
+    'secrets',
+    'shutil',
+    'socket',
+    'subprocess',
+    'sys',
+    'tempfile',
+    'threading',
+    'time',
+    'urllib',
+    'uuid',
+])
+# Builtins reaching modules, files, object addresses or hash values.
+NONDETERMINISTIC_NAMES = frozenset([
+    '__builtins__',
+    '__import__',
+    'compile',
+    'eval',
+    'exec',
+    'hash',
+    'id',
+    'input',
+    'open',
+])
+# The order of sets (and, before Python 3.6, of dicts) of strings depends
+# on the hash seed.
+UNORDERED_NAMES = frozenset(['frozenset', 'set'])
+UNORDERED_NODES = (ast.Set, ast.SetComp)
+if sys.version_info < (3, 6):
+    UNORDERED_NAMES |= frozenset(['dict'])
+    UNORDERED_NODES += (ast.Dict, ast.DictComp)
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+
+class ResultCache(object):
+
+    def __init__(self, path, max_size=MAX_SIZE, ttl=TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def get(self, solution, tests, options=None):
+        """Return the stored result, or None.
+
+        """
+        key = result_key(solution, tests, options)
+        now = time.time()
+        row = self.db.execute(
+            'SELECT result FROM results WHERE key = ? AND created > ?',
+            (key, now - self.ttl)
+        ).fetchone()
+
+        if row is None:
+            self._count('misses')
+            return
+
+        self.db.execute(
+            'UPDATE results SET accessed = ? WHERE key = ?', (now, key)
+        )
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, solution, tests, result, options=None):
+        key = result_key(solution, tests, options)
+        data = json.dumps(result)
+        now = time.time()
+
+        with self.db:
+            self.db.execute('BEGIN IMMEDIATE')
+            self.db.execute(
+                'INSERT OR REPLACE INTO results '
+                '(key, result, size, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, data, len(data), now, now)
+            )
+            self._evict(now)
+
+    def stats(self):
+        counters = dict(self.db.execute('SELECT name, value FROM counters'))
+        count, size = self.db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+        return {
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'entries': count,
+            'size': size,
+        }
+
+    def _count(self, name):
+        try:
+            self.db.execute(
+                'INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)',
+                (name,)
+            )
+            self.db.execute(
+                'UPDATE counters SET value = value + 1 WHERE name = ?',
+                (name,)
+            )
+        except sqlite3.OperationalError as e:
+            logging.debug('Failed to update the %s counter: %s', name, e)
+
+    def _evict(self, now):
+        self.db.execute(
+            'DELETE FROM results WHERE created <= ?', (now - self.ttl,)
+        )
+
+        size, = self.db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+        if size <= self.max_size:
+            return
+
+        rows = self.db.execute(
+            'SELECT key, size FROM results ORDER BY accessed'
+        ).fetchall()
+        stale = []
+        for key, entry_size in rows:
+            if size <= self.max_size:
+                break
+            stale.append((key,))
+            size -= entry_size
+        self.db.executemany('DELETE FROM results WHERE key = ?', stale)
+
+
+def normalize(solution):
+    """Normalize line endings and trailing blank lines."""
+    return solution.replace('\r\n', '\n').replace('\r', '\n').rstrip() + '\n'
+
+
+def result_key(solution, tests, options=None):
+    """Return the key of a result.
+
+    `options` is a dict of the (json serializable) run options the result
+    depends on.
+
+    """
+    digest = hashlib.sha256()
+    parts = (
+        codeverifier.__version__, normalize(solution), tests,
+        json.dumps(options or {}, sort_keys=True),
+    )
+    for part in parts:
+        data = part.encode('utf-8')
+        digest.update(str(len(data)).encode('ascii'))
+        digest.update(b':')
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def is_deterministic(solution, tests=''):
+    """Tell if a solution can be assumed to always give the same result.
+
+    Solutions (or tests) importing modules giving access to the clock, to
+    random numbers or to the environment are not, nor are the ones using
+    sets, whose order depends on the hash seed.
+
+    """
+    sources = [solution]
+    if tests:
+        # Only imported when memoizing.
+        from codeverifier.parser import parse_examples
+
+        try:
+            sources.extend(source for source, _ in parse_examples(tests))
+        except ValueError:
+            pass
+
+    return all(_is_deterministic(source) for source in sources)
+
+
+def _is_deterministic(source):
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return True
+
+    for node in ast.walk(tree):
+        if isinstance(node, UNORDERED_NODES):
+            return False
+        elif isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names = [node.module or '']
+        elif isinstance(node, ast.Name) and (
+            node.id in NONDETERMINISTIC_NAMES or node.id in UNORDERED_NAMES
+        ):
+            return False
+        else:
+            continue
+
+        if any(n.split('.')[0] in NONDETERMINISTIC_MODULES for n in names):
+            return False
+
+    return True
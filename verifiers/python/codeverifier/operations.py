@@ -0,0 +1,84 @@
+"""Operation budget of a run.
+
+An `OperationCounter` counts the lines of the solution (and of the
+examples) a run executes, with a `sys.settrace` hook, and raises
+`OperationLimitExceeded` once they go over its limit. Unlike a timeout,
+the count does not depend on how loaded the host is: a solution looping
+too long fails the same way every time.
+
+Only frames of code compiled from `TestRunner.FILENAME` are traced; the
+library functions a solution calls run untraced and count as one line of
+their caller. A C function running for long (e.g. sorting a huge list),
+or an empty loop some interpreters run without line events (e.g.
+`while True: pass` on one line), are still only caught by the wall-clock
+timeout.
+
+"""
+import sys
+
+
+__all__ = ['OperationCounter', 'OperationLimitExceeded']
+
+
+FILENAME = '<string>'
+
+
+class OperationLimitExceeded(Exception):
+    pass
+
+
+class OperationCounter(object):
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        # Stays set should the solution catch the exception.
+        self.exceeded = False
+        self._previous = None
+        self._counted = None
+        self._update = None
+
+    def start(self):
+        # The hooks run for every line; they keep the count in a closure
+        # rather than in an attribute.
+        count = self.count
+        limit = self.limit
+
+        def line(frame, event, arg):
+            nonlocal count
+            if event == 'line':
+                count += 1
+                if count > limit:
+                    # Raising from the hook also removes it; a solution
+                    # catching the exception runs untraced.
+                    self.count = count
+                    self.exceeded = True
+                    raise OperationLimitExceeded()
+            return line
+
+        def update(counted):
+            nonlocal count
+            count = counted
+
+        def call(frame, event, arg):
+            if frame.f_code.co_filename == FILENAME:
+                return line
+            return None
+
+        self._counted = lambda: count
+        self._update = update
+        self._previous = sys.gettrace()
+        sys.settrace(call)
+
+    def stop(self):
+        sys.settrace(self._previous)
+        self.count = self._counted()
+        self._previous = self._counted = self._update = None
+
+    def current(self):
+        """Return the count so far of a started counter."""
+        return self._counted()
+
+    def update(self, count):
+        """Set the count of a started counter, e.g. to a forked child's."""
+        self._update(count)
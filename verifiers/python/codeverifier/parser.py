@@ -0,0 +1,104 @@
+"""Lightweight doctest examples parser.
+
+Importing `doctest` pulls in `pdb`, `unittest`, `difflib`, `inspect`...
+This parser handles the `>>>` / `...` / expected output examples tests
+are made of and only falls back to `doctest.DocTestParser` for what it
+does not handle the same way (badly indented or malformed examples).
+
+"""
+
+
+__all__ = ['parse_examples']
+
+
+PS1 = '>>>'
+PS2 = '...'
+
+
+class Unsupported(Exception):
+    pass
+
+
+def parse_examples(text):
+    """Return the (source, want) pairs of the examples in text.
+
+    Sources and wants are the ones `doctest.DocTestParser.get_examples()`
+    would give.
+
+    """
+    try:
+        return _parse(text)
+    except Unsupported:
+        import doctest
+
+        return [
+            (e.source, e.want)
+            for e in doctest.DocTestParser().get_examples(text)
+        ]
+
+
+def _parse(text):
+    if 'doctest:' in text:
+        # Option directives are validated by doctest.
+        raise Unsupported()
+
+    lines = text.expandtabs().split('\n')
+    examples = []
+    i, count = 0, len(lines)
+    while i < count:
+        line = lines[i]
+        stripped = line.lstrip(' ')
+        if stripped[:1].isspace():
+            # doctest would count it as indentation.
+            raise Unsupported()
+        if not stripped.startswith(PS1):
+            i += 1
+            continue
+
+        indent = len(line) - len(stripped)
+        prefix = ' ' * indent
+        source = [_strip_prompt(line, indent)]
+        i += 1
+
+        while i < count and lines[i].lstrip(' ').startswith(PS2):
+            if not lines[i].startswith(prefix + PS2):
+                raise Unsupported()
+            source.append(_strip_prompt(lines[i], indent))
+            i += 1
+
+        want = []
+        while i < count:
+            line = lines[i]
+            stripped = line.lstrip(' ')
+            if stripped[:1].isspace():
+                raise Unsupported()
+            if not stripped or stripped.startswith(PS1):
+                break
+            if not line.startswith(prefix):
+                raise Unsupported()
+            want.append(line[indent:])
+            i += 1
+
+        source = '\n'.join(source)
+        if _is_blank_or_comment(source):
+            continue
+        if not source.endswith('\n'):
+            source += '\n'
+        examples.append((source, '\n'.join(want) + '\n' if want else ''))
+
+    return examples
+
+
+def _is_blank_or_comment(source):
+    if source.endswith('\n'):
+        source = source[:-1]
+    if '\n' in source:
+        return False
+    source = source.lstrip(' ')
+    return not source or source.startswith('#')
+
+
+def _strip_prompt(line, indent):
+    if len(line) > indent + 3 and line[indent + 3] != ' ':
+        raise Unsupported()
+    return line[indent + 4:]
@@ -0,0 +1,167 @@
+"""Payload codecs.
+
+A codec encodes and decodes the payloads (and results) `verify`, its
+server mode and the code runner exchange:
+
+- `json`, always available;
+- `yaml`, decoded with libyaml's `CSafeLoader` when PyYAML was built with
+  it (`SafeLoader` otherwise);
+- `msgpack` and `cbor`, compact binary encodings, available when the
+  `msgpack` or `cbor2` package is installed.
+
+Codec modules are only imported when a codec is used.
+
+"""
+import collections
+import importlib
+import json
+import re
+import sys
+
+
+__all__ = ['Codec', 'available', 'binary', 'get', 'sniff']
+
+
+YAML_START = re.compile(r'\s*---')
+
+
+class Codec(object):
+    """Encode and decode payloads.
+
+    `loads()` accepts bytes, bytearray or memoryview data (and str for
+    text codecs) without copying it first when the codec allows it.
+
+    """
+
+    name = None
+    module = None
+
+    def available(self):
+        if self.module is None:
+            return True
+        try:
+            importlib.import_module(self.module)
+        except ImportError:
+            return False
+        return True
+
+    def loads(self, data):
+        raise NotImplementedError()
+
+    def dumps(self, obj):
+        raise NotImplementedError()
+
+
+class JSONCodec(Codec):
+
+    name = 'json'
+
+    def loads(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        if not isinstance(data, str) and sys.version_info < (3, 6):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode('utf-8')
+
+
+class YAMLCodec(Codec):
+
+    name = 'yaml'
+    module = 'yaml'
+
+    def loads(self, data):
+        import yaml
+
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        return yaml.load(data, Loader=loader)
+
+    def dumps(self, obj):
+        import yaml
+
+        dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+        return yaml.dump(
+            obj, Dumper=dumper, explicit_start=True, encoding='utf-8'
+        )
+
+
+class MsgpackCodec(Codec):
+
+    name = 'msgpack'
+    module = 'msgpack'
+
+    def loads(self, data):
+        import msgpack
+
+        return msgpack.unpackb(data, raw=False)
+
+    def dumps(self, obj):
+        import msgpack
+
+        return msgpack.packb(obj, use_bin_type=True)
+
+
+class CBORCodec(Codec):
+
+    name = 'cbor'
+    module = 'cbor2'
+
+    def loads(self, data):
+        import cbor2
+
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return cbor2.loads(data)
+
+    def dumps(self, obj):
+        import cbor2
+
+        return cbor2.dumps(obj)
+
+
+CODECS = collections.OrderedDict(
+    (codec.name, codec) for codec in (
+        JSONCodec(), YAMLCodec(), MsgpackCodec(), CBORCodec()
+    )
+)
+
+# Preferred binary codecs, most compact first.
+BINARY_CODECS = ('msgpack', 'cbor', 'json')
+
+
+def get(name):
+    """Return the named codec; raise ValueError if it is not available."""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError('Unknown payload format "%s"' % name)
+    if not codec.available():
+        raise ValueError(
+            'The "%s" payload format requires the "%s" package'
+            % (name, codec.module)
+        )
+    return codec
+
+
+def available():
+    """Return the names of the available codecs."""
+    return [name for name, codec in CODECS.items() if codec.available()]
+
+
+def binary():
+    """Return the most compact binary codec available."""
+    for name in BINARY_CODECS:
+        if CODECS[name].available():
+            return CODECS[name]
+
+
+def sniff(payload):
+    """Return the codec of a text payload: yaml if it starts with "---".
+
+    """
+    if YAML_START.match(payload):
+        return CODECS['yaml']
+    return CODECS['json']
@@ -0,0 +1,144 @@
+"""Checks of a submission that do not need to run it.
+
+`check()` compiles the solution and parses the tests in the calling
+process. A submission failing those checks would fail in the code runner
+too; its result is returned without starting one.
+
+The calling process has none of the code runner limits: large solutions,
+and solutions whose compilation would fold costly constant expressions
+(e.g. `10 ** 10 ** 8`), are only parsed, or left to the code runner.
+
+"""
+import ast
+import sys
+
+from codeverifier import TestRunner
+from codeverifier.cache import suites
+
+
+__all__ = ['check', 'forbidden_imports']
+
+
+EMPTY_SOLUTION_ERROR = 'The solution is empty.'
+FORBIDDEN_IMPORT_ERROR = 'Importing "%s" is not allowed.'
+# Larger solutions are not compiled (nor parsed, unless some imports are
+# forbidden) before running; deeply nested code could exhaust the stack.
+MAX_COMPILE_SIZE = 16 * 1024
+FOLDED_OPS = (ast.Pow, ast.LShift, ast.Mult)
+if sys.version_info >= (3, 8):
+    CONSTANT_NODES = (ast.Constant,)
+else:
+    CONSTANT_NODES = (ast.Num, ast.Str, ast.Bytes, ast.NameConstant)
+
+
+def check(solution, tests, forbidden=()):
+    """Return the failed result of an invalid submission, or None.
+
+    The result has the `TestRunner.to_dict()` shape; for syntax errors,
+    its error is the one the code runner would report. With `forbidden`
+    module names, a solution importing one of them (or one of their
+    submodules) is rejected too.
+
+    """
+    if not solution.strip():
+        return failed(EMPTY_SOLUTION_ERROR)
+
+    try:
+        return _check_solution(solution, forbidden) or _check_tests(tests)
+    except (RuntimeError, MemoryError, OverflowError):
+        # e.g. a RecursionError compiling deeply nested code; the code
+        # runner reports it.
+        return None
+
+
+def _check_solution(solution, forbidden):
+    small = len(solution) <= MAX_COMPILE_SIZE
+    if not small and not forbidden:
+        return None
+
+    try:
+        tree = compile(
+            solution, TestRunner.FILENAME, TestRunner.MODE, ast.PyCF_ONLY_AST
+        )
+        if small and not costly_folding(tree):
+            compile(tree, TestRunner.FILENAME, TestRunner.MODE)
+    except (SyntaxError, ValueError) as e:
+        return failed(str(e))
+
+    if forbidden:
+        names = forbidden_imports(tree, forbidden)
+        if names:
+            return failed(FORBIDDEN_IMPORT_ERROR % names[0])
+
+
+def _check_tests(tests):
+    try:
+        suite = suites.get(tests)
+    except ValueError as e:
+        return failed(str(e))
+
+    for example in suite.examples:
+        if example.error is not None:
+            return failed(str(example.error))
+
+
+def costly_folding(tree):
+    """Tell if compiling a solution AST may fold a costly constant.
+
+    e.g. `10 ** 10 ** 8` or `'x' * 10 ** 9`, which the compiler would
+    compute.
+
+    """
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.BinOp)
+            and isinstance(node.op, FOLDED_OPS)
+            and _constant(node.left)
+            and _constant(node.right)
+        ):
+            return True
+    return False
+
+
+def _constant(node):
+    nodes = [node]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, ast.BinOp):
+            nodes.extend((node.left, node.right))
+        elif isinstance(node, ast.UnaryOp):
+            nodes.append(node.operand)
+        elif isinstance(node, ast.Tuple):
+            nodes.extend(node.elts)
+        elif not isinstance(node, CONSTANT_NODES):
+            return False
+    return True
+
+
+def forbidden_imports(tree, forbidden):
+    """Return the modules in `forbidden` a solution AST imports.
+
+    Only import statements are found; this is not a sandbox.
+
+    """
+    forbidden = frozenset(forbidden)
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names = [node.module or '']
+        else:
+            continue
+
+        for name in names:
+            parts = name.split('.')
+            prefixes = ('.'.join(parts[:i + 1]) for i in range(len(parts)))
+            if any(p in forbidden for p in prefixes) and name not in found:
+                found.append(name)
+
+    return found
+
+
+def failed(error):
+    return {'solved': False, 'printed': '', 'errors': error}
@@ -0,0 +1,68 @@
+"""Opt-in profile of the solution functions.
+
+A `Profile` runs `cProfile` while the solution and its examples run and
+reports the solution's own functions (the ones compiled from
+`TestRunner.FILENAME`) taking the most time, with their call count and
+their own and cumulative time, in milliseconds.
+
+A code runner killed for taking too long would lose its profile;
+`flush_on_sigterm()` sends it when the runner is asked to terminate, before
+it is killed (see `codeverifier.stream.stop()`).
+
+"""
+import os
+import signal
+
+
+__all__ = ['Profile', 'flush_on_sigterm']
+
+
+FILENAME = '<string>'
+PROFILE_TOP = 10
+
+
+class Profile(object):
+
+    def __init__(self, top=PROFILE_TOP):
+        # Only imported when profiling.
+        import cProfile
+
+        self.top = top
+        self.profiler = cProfile.Profile()
+
+    def enable(self):
+        self.profiler.enable()
+
+    def disable(self):
+        self.profiler.disable()
+
+    def to_list(self):
+        """Return the `top` solution functions by cumulative time."""
+        self.profiler.create_stats()
+        rows = [
+            {
+                'function': name,
+                'line': line,
+                'calls': calls,
+                'time': round(own * 1000, 3),
+                'cumulative': round(cumulative * 1000, 3),
+            }
+            for (filename, line, name), (_, calls, own, cumulative, _)
+            in self.profiler.stats.items()
+            # The module level code of the solution and of the examples.
+            if filename == FILENAME and name != '<module>'
+        ]
+        rows.sort(key=lambda r: (-r['cumulative'], r['line']))
+        return rows[:self.top]
+
+
+def flush_on_sigterm(profile, writer):
+    """Send the profile to a `ResultWriter` and exit on SIGTERM."""
+    def flush(signum, frame):
+        profile.disable()
+        try:
+            writer.profile(profile.to_list())
+        finally:
+            os._exit(1)
+
+    signal.signal(signal.SIGTERM, flush)
@@ -0,0 +1,192 @@
+"""Bulk re-grading of stored submissions.
+
+Reads submissions from a JSON Lines stream (one `{"id": ..., "solution":
+..., "tests": ...}` object per line), runs each one in its own child
+forked from a warm `Zygote` and writes one `{"id": ..., "result": ...}`
+line per submission as soon as it is graded.
+
+The output file doubles as the checkpoint: when resuming, submissions
+already in it are skipped. Submissions without an id (or that are not
+valid JSON) are written with a null id and their line number.
+
+"""
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from codeverifier import TIMEOUT_ERROR, UNEXPECTED_ERROR
+from codeverifier.limits import LimitExceeded
+from codeverifier.stream import ResultReader, errors
+from codeverifier.zygote import Zygote
+
+
+__all__ = ['Regrader', 'read_checkpoint', 'INVALID_SUBMISSION_ERROR']
+
+
+INVALID_SUBMISSION_ERROR = 'Invalid submission.'
+
+
+# Checkpoint key of a submission without an id; unlike an int, it cannot
+# be mistaken for a submission id.
+LineKey = collections.namedtuple('LineKey', 'line')
+
+
+class Regrader(object):
+    """Grade submissions on a pool of `workers` forked children.
+
+    `tests`, if set, replaces the tests of every submission.
+
+    """
+
+    def __init__(
+        self, output, workers=None, timeout=5, tests=None, zygote=None,
+        done=None, report_interval=10
+    ):
+        self.output = output
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.tests = tests
+        self.zygote = zygote or Zygote()
+        self.done = done or set()
+        self.report_interval = report_interval
+        self.count = 0
+        self.skipped = 0
+        self.lock = threading.Lock()
+        self.started = None
+        self.last_report = None
+
+    @property
+    def throughput(self):
+        elapsed = time.monotonic() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def run(self, lines):
+        self.zygote.warm()
+        self.started = self.last_report = time.monotonic()
+        # Bound the submissions read ahead of the workers.
+        pending = threading.BoundedSemaphore(2 * self.workers)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for n, line in enumerate(lines):
+                if not line.strip():
+                    continue
+
+                pending.acquire()
+                future = pool.submit(self._grade, n, line)
+                future.add_done_callback(
+                    lambda f: self._done(f, pending)
+                )
+
+        logging.info(
+            'Graded %d submissions (%d skipped) at %.1f tasks/s',
+            self.count, self.skipped, self.throughput
+        )
+
+    def _done(self, future, pending):
+        pending.release()
+        if future.exception() is not None:
+            logging.error('Failed to grade: %s', future.exception())
+
+    def _grade(self, n, line):
+        try:
+            submission = json.loads(line)
+        except ValueError:
+            submission = None
+
+        key = submission_key(submission, n)
+        if key in self.done:
+            with self.lock:
+                self.skipped += 1
+            return
+
+        try:
+            solution = submission['solution']
+            tests = self.tests
+            if tests is None:
+                tests = submission.get('tests') or ''
+        except (KeyError, TypeError, AttributeError):
+            logging.error('Invalid submission on line %d', n + 1)
+            self._write(key, errors(INVALID_SUBMISSION_ERROR))
+            return
+
+        progress = ResultReader()
+        try:
+            result = self.zygote.run(
+                solution, tests, timeout=self.timeout, progress=progress
+            )
+        except TimeoutError:
+            result = progress.failed(TIMEOUT_ERROR)
+        except LimitExceeded as e:
+            result = progress.failed(str(e))
+        except ChildProcessError as e:
+            logging.error('Submission %s: %s', key, e)
+            result = progress.failed(UNEXPECTED_ERROR)
+
+        self._write(key, result)
+
+    def _write(self, key, result):
+        if isinstance(key, LineKey):
+            record = {'id': None, 'line': key.line, 'result': result}
+        else:
+            record = {'id': key, 'result': result}
+        line = json.dumps(record) + '\n'
+        with self.lock:
+            self.output.write(line)
+            self.output.flush()
+            self.count += 1
+            self._report()
+
+    def _report(self):
+        now = time.monotonic()
+        if now - self.last_report < self.report_interval:
+            return
+
+        self.last_report = now
+        logging.info(
+            'Graded %d submissions at %.1f tasks/s',
+            self.count, self.throughput
+        )
+
+
+def read_checkpoint(path):
+    """Return the ids of the submissions already graded in `path`.
+
+    A last line left incomplete by an interrupted run is truncated so
+    that new results can be appended.
+
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, 'rb+') as fp:
+        good = 0
+        for line in fp:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line.decode('utf-8'))
+                key = record['id']
+                if key is None:
+                    key = LineKey(record['line'])
+                done.add(key)
+            except (ValueError, KeyError, TypeError):
+                break
+            good += len(line)
+
+        fp.truncate(good)
+
+    return done
+
+
+def submission_key(submission, n):
+    """Return the checkpoint key of the submission on line `n` (from 0)."""
+    key = submission.get('id') if isinstance(submission, dict) else None
+    if isinstance(key, (str, int)):
+        return key
+    return LineKey(n + 1)
@@ -0,0 +1,177 @@
+"""Long-lived verifier server.
+
+Listens on a Unix socket or a localhost TCP port for framed
+`{"solution": ..., "tests": ...}` requests (see `codeverifier.framing`)
+and replies with one framed result per request. Each request runs in a
+child forked from a warm `Zygote`.
+
+"""
+import logging
+import os
+import socket
+import threading
+
+from codeverifier import TIMEOUT_ERROR, UNEXPECTED_ERROR
+from codeverifier.framing import read_frame, write_frame
+from codeverifier.limits import LimitExceeded
+from codeverifier.stream import ResultReader, errors
+from codeverifier.zygote import Zygote
+
+
+__all__ = ['Server', 'INVALID_REQUEST_ERROR']
+
+
+INVALID_REQUEST_ERROR = 'Invalid request.'
+ACCEPT_POLL_INTERVAL = 0.5
+
+
+class Server(object):
+    """Serve verification requests with a bounded concurrency.
+
+    At most `concurrency` children run at the same time; other requests
+    wait for a slot. Once `max_connections` connections are open, the
+    server stops accepting new ones until one closes, leaving clients
+    waiting in the listen backlog.
+
+    Frames are encoded with `codec`, a `codeverifier.payload` codec (JSON
+    by default).
+
+    """
+
+    def __init__(
+        self, sock, timeout, concurrency=None, max_connections=None,
+        zygote=None, codec=None
+    ):
+        self.sock = sock
+        self.timeout = timeout
+        self.concurrency = concurrency or os.cpu_count() or 1
+        self.max_connections = max_connections or 4 * self.concurrency
+        self.zygote = zygote or Zygote()
+        self.codec = codec
+        self.slots = threading.BoundedSemaphore(self.concurrency)
+        self.connections = threading.BoundedSemaphore(self.max_connections)
+        self.draining = threading.Event()
+        self.handlers = set()
+        self.idle = set()
+        self.idle_lock = threading.Lock()
+
+    @classmethod
+    def unix(cls, path, *args, **kw):
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.listen(128)
+        return cls(sock, *args, **kw)
+
+    @classmethod
+    def tcp(cls, port, *args, **kw):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('127.0.0.1', port))
+        sock.listen(128)
+        return cls(sock, *args, **kw)
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def drain(self, *args, **kw):
+        """Stop accepting connections and let in-flight requests finish."""
+        logging.info('Draining verifier server...')
+        self.draining.set()
+
+    def serve_forever(self):
+        self.zygote.warm()
+        self.sock.settimeout(ACCEPT_POLL_INTERVAL)
+        logging.info('Verifier server listening on %s', self.address)
+
+        try:
+            while not self.draining.is_set():
+                if not self.connections.acquire(
+                    timeout=ACCEPT_POLL_INTERVAL
+                ):
+                    continue
+
+                try:
+                    conn, _ = self.sock.accept()
+                except socket.timeout:
+                    self.connections.release()
+                    continue
+
+                conn.settimeout(None)
+                handler = threading.Thread(target=self._handle, args=(conn,))
+                self.handlers.add(handler)
+                handler.start()
+        finally:
+            self._close()
+
+    def _close(self):
+        address = self.address
+        self.sock.close()
+
+        # Connections waiting for their next request would never end.
+        with self.idle_lock:
+            for conn in self.idle:
+                conn.shutdown(socket.SHUT_RD)
+
+        for handler in list(self.handlers):
+            handler.join()
+
+        if self.sock.family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+
+        logging.info('Verifier server stopped')
+
+    def _handle(self, conn):
+        try:
+            with conn, conn.makefile('rwb') as fp:
+                while not self.draining.is_set():
+                    try:
+                        with self.idle_lock:
+                            self.idle.add(conn)
+                        req = read_frame(fp, codec=self.codec)
+                    except Exception as e:
+                        # Decoders raise their own errors on invalid data.
+                        logging.error('Invalid frame: %s', e)
+                        write_frame(
+                            fp, errors(INVALID_REQUEST_ERROR), self.codec
+                        )
+                        return
+                    finally:
+                        with self.idle_lock:
+                            self.idle.discard(conn)
+
+                    if req is None:
+                        return
+
+                    write_frame(fp, self.verify(req), self.codec)
+        except OSError as e:
+            logging.error('Connection error: %s', e)
+        finally:
+            self.connections.release()
+            self.handlers.discard(threading.current_thread())
+
+    def verify(self, req):
+        try:
+            solution, tests = req['solution'], req.get('tests') or ''
+        except (KeyError, TypeError):
+            logging.error(
+                'Could not find the "tests" and "solution" in the request'
+            )
+            return errors(INVALID_REQUEST_ERROR)
+
+        progress = ResultReader()
+        with self.slots:
+            try:
+                return self.zygote.run(
+                    solution, tests, timeout=self.timeout, progress=progress
+                )
+            except TimeoutError:
+                logging.error('Code runner timed out')
+                return progress.failed(TIMEOUT_ERROR)
+            except LimitExceeded as e:
+                return progress.failed(str(e))
+            except ChildProcessError as e:
+                logging.error(str(e))
+                return progress.failed(UNEXPECTED_ERROR)
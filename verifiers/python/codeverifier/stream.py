@@ -0,0 +1,193 @@
+"""Streaming of TestRunner results from a code runner to its parent.
+
+The runner writes one compact JSON line per event:
+
+- `{"running": call}` before an example runs,
+- `{"result": result}` once it ran,
+- `{"done": data}` at the end, `data` being `TestRunner.to_dict()`
+  without the results already sent,
+- `{"profile": rows}` instead, when a profiling runner is terminated
+  (see `codeverifier.profiling`).
+
+The parent feeds what it reads to a `ResultReader`; if the runner times
+out or crashes, the reader still knows which examples completed and
+which call was running.
+
+"""
+import json
+import os
+import select
+import time
+
+from codeverifier.timing import now_ns
+
+
+__all__ = ['ResultReader', 'ResultWriter', 'drain', 'errors', 'read', 'stop']
+
+
+# Time a terminated code runner has to send its last events and exit.
+STOP_GRACE = 0.5
+
+
+class ResultWriter(object):
+    """TestRunner listener writing events to a file descriptor.
+
+    With `timings`, the time spent encoding and writing events is added
+    to its "write" phase.
+
+    """
+
+    def __init__(self, fd, timings=None):
+        self.fd = fd
+        self.timings = timings
+
+    def start(self, call):
+        self._write({'running': call})
+
+    def result(self, result):
+        self._write({'result': result})
+
+    def done(self, runner):
+        data = runner.to_dict()
+        data.pop('results', None)
+        self._write({'done': data})
+
+    def profile(self, rows):
+        self._write({'profile': rows})
+
+    def _write(self, event):
+        if self.timings is None:
+            self._send(event)
+        else:
+            start = now_ns()
+            self._send(event)
+            self.timings.add('write', start)
+
+    def _send(self, event):
+        data = json.dumps(event, separators=(',', ':')).encode('utf-8')
+        data += b'\n'
+        while data:
+            data = data[os.write(self.fd, data):]
+
+
+class ResultReader(object):
+    """Collect the events sent by a ResultWriter.
+
+    With `timings`, the time spent decoding events is added to its
+    "decode" phase.
+
+    """
+
+    def __init__(self, timings=None):
+        self.timings = timings
+        self.buffer = b''
+        self.results = []
+        self.running = None
+        self.summary = None
+        self.profile = None
+
+    def feed(self, data):
+        if self.timings is None:
+            self._feed(data)
+        else:
+            start = now_ns()
+            self._feed(data)
+            self.timings.add('decode', start)
+
+    def _feed(self, data):
+        lines = (self.buffer + data).split(b'\n')
+        self.buffer = lines.pop()
+        for line in lines:
+            try:
+                event = json.loads(line.decode('utf-8'))
+            except ValueError:
+                # Not ours; e.g. a solution writing straight to fd 1.
+                continue
+            if isinstance(event, dict):
+                self._event(event)
+
+    def result(self):
+        """Return the complete result, as `TestRunner.to_dict()` would."""
+        if self.summary is None:
+            raise ChildProcessError('Code runner exited without a result')
+
+        data = dict(self.summary)
+        if 'errors' not in data:
+            data['results'] = self.results
+        return data
+
+    def failed(self, error):
+        """Return an error result holding the examples that completed."""
+        data = errors(error)
+        if self.results or self.running is not None:
+            data['results'] = self.results
+        if self.running is not None:
+            data['running'] = self.running
+        if self.profile is not None:
+            data['profile'] = self.profile
+        return data
+
+    def _event(self, event):
+        if 'running' in event:
+            self.running = event['running']
+        elif 'result' in event:
+            self.results.append(event['result'])
+            self.running = None
+        elif 'done' in event:
+            self.summary = event['done']
+            self.running = None
+        elif 'profile' in event:
+            self.profile = event['profile']
+
+
+def errors(msg):
+    """Return the result of a verification that failed with `msg`."""
+    return {'solved': False, 'errors': msg}
+
+
+def read(fd, reader, timeout=None):
+    """Feed reader with what is read from fd until it reaches EOF.
+
+    Raises TimeoutError if fd is still open after `timeout` seconds.
+
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        if deadline is None:
+            remaining = None
+        else:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError()
+
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            continue
+
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return
+        reader.feed(chunk)
+
+
+def drain(fd, reader):
+    """Feed reader with what is left to read from fd without waiting."""
+    while select.select([fd], [], [], 0)[0]:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return
+        reader.feed(chunk)
+
+
+def stop(fd, reader, terminate, kill, grace=STOP_GRACE):
+    """Terminate a code runner, still reading what it writes to fd.
+
+    The runner is killed if fd is still open after `grace` seconds.
+
+    """
+    terminate()
+    try:
+        read(fd, reader, timeout=grace)
+    except TimeoutError:
+        kill()
+        drain(fd, reader)
@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+import unittest
+
+from codeverifier import TestRunner
+from codeverifier.cache import TestSuite, TestSuiteCache
+
+
+class TestTestSuite(unittest.TestCase):
+
+    def test_parse(self):
+        suite = TestSuite.parse('>>> a = 1\n>>> foo\n[1, 2]\n>>> foo\nbar\n')
+        statement, literal, other = suite.examples
+
+        self.assertEqual('a = 1', statement.call)
+        self.assertEqual('', statement.want)
+        self.assertIsNone(statement.expected)
+
+        self.assertEqual('foo', literal.call)
+        self.assertEqual([1, 2], literal.expected_value({}))
+        self.assertIsNot(
+            literal.expected_value({}), literal.expected_value({})
+        )
+
+        self.assertIsNone(other.expected)
+        self.assertEqual(3, other.expected_value({'bar': 3}))
+
+    def test_syntax_error(self):
+        example, = TestSuite.parse('>>> foo(\n1').examples
+        self.assertIsInstance(example.error, SyntaxError)
+
+    def test_dumps(self):
+        suite = TestSuite.parse('>>> a = 1\n>>> foo\n[1, 2]\n>>> foo\nbar\n')
+        copy = TestSuite.loads(suite.dumps())
+
+        self.assertEqual(
+            [(e.call, e.want, e.expected) for e in suite.examples],
+            [(e.call, e.want, e.expected) for e in copy.examples],
+        )
+
+
+class TestTestSuiteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get(self):
+        cache = TestSuiteCache()
+        suite = cache.get('>>> foo\n1')
+        self.assertIs(suite, cache.get('>>> foo\n1'))
+        self.assertIsNot(suite, cache.get('>>> foo\n2'))
+
+    def test_lru(self):
+        cache = TestSuiteCache(maxsize=2)
+        first = cache.get('>>> foo\n1')
+        cache.get('>>> foo\n2')
+        cache.get('>>> foo\n1')
+        cache.get('>>> foo\n3')
+
+        self.assertEqual(2, len(cache.suites))
+        self.assertIs(first, cache.get('>>> foo\n1'))
+
+    def test_disk(self):
+        TestSuiteCache(path=self.path).get('>>> foo\n[1, 2]')
+
+        cache = TestSuiteCache(path=self.path)
+        cache._save = None
+        example, = cache.get('>>> foo\n[1, 2]').examples
+        self.assertEqual([1, 2], example.expected_value({}))
+
+    def test_runner(self):
+        cache = TestSuiteCache()
+        for solution, solved in [('foo = [1]', True), ('foo = [2]', False)]:
+            runner = TestRunner(solution, '>>> foo\n[1]', cache=cache)
+            runner.run()
+            self.assertEqual(solved, runner.solved)
+
+    def test_runner_gets_own_expected_value(self):
+        cache = TestSuiteCache()
+        solution = (
+            'class Foo:\n'
+            '  def __eq__(self, other):\n'
+            '    other.append(2)\n'
+            '    return True\n'
+            'foo = Foo()\n'
+        )
+        for _ in range(2):
+            runner = TestRunner(solution, '>>> foo\n[1]', cache=cache)
+            runner.run()
+            self.assertEqual('[1]', runner.results[0]['expected'])
@@ -0,0 +1,146 @@
+import unittest
+
+from codeverifier import TestRunner
+from codeverifier.compare import equal, mismatch, render
+
+
+class Array(object):
+    """Minimal array-like: `==` compares element-wise."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.shape = (len(self.values),)
+
+    def __eq__(self, other):
+        return Array(
+            a == b for a, b in zip(self.values, getattr(other, 'values', []))
+        )
+
+    def __sub__(self, other):
+        return Array(a - b for a, b in zip(self.values, other.values))
+
+    def __abs__(self):
+        return Array(abs(a) for a in self.values)
+
+    def __le__(self, other):
+        return Array(a <= b for a, b in zip(self.values, other.values))
+
+    def __add__(self, other):
+        return Array(other + a for a in self.values)
+
+    __radd__ = __add__
+
+    def __rmul__(self, other):
+        return Array(other * a for a in self.values)
+
+    def __bool__(self):
+        raise ValueError('The truth value of an array is ambiguous.')
+
+    __nonzero__ = __bool__
+
+    def all(self):
+        return all(self.values)
+
+
+class TestEqual(unittest.TestCase):
+
+    def test_plain(self):
+        self.assertTrue(equal([1, 2], [1, 2]))
+        self.assertFalse(equal([1, 2], [1, 3]))
+        self.assertFalse(equal([1, 2], (1, 2)))
+        self.assertFalse(equal(1, '1'))
+
+    def test_float_tolerance(self):
+        self.assertTrue(equal(0.3, 0.1 + 0.2))
+        self.assertTrue(
+            equal([0.3, {'a': 0.3}], [0.1 + 0.2, {'a': 0.1 + 0.2}])
+        )
+        self.assertTrue(equal(3.0, 3.0000000000001))
+        self.assertFalse(equal(0.3, 0.31))
+        self.assertFalse(equal(float('inf'), 1e308))
+        self.assertFalse(equal(10 ** 20, 10 ** 20 + 1))
+
+    def test_int_exact(self):
+        self.assertTrue(equal(1, 1.0))
+        self.assertFalse(equal(1, 1.0000000001))
+        self.assertFalse(equal([1], [1.0000000001]))
+
+    def test_overflow(self):
+        self.assertFalse(equal(10 ** 400, 1.5))
+        self.assertFalse(equal(1.5, 10 ** 400))
+        self.assertFalse(equal([1e308], [10 ** 400]))
+
+    def test_array_like(self):
+        self.assertTrue(equal(Array([1, 2]), Array([1, 2])))
+        self.assertFalse(equal(Array([1, 2]), Array([1, 3])))
+        self.assertFalse(equal(Array([1, 2]), Array([1, 2, 3])))
+        self.assertTrue(equal(Array([0.3]), Array([0.1 + 0.2])))
+        self.assertTrue(equal([Array([1, 2])], [Array([1, 2])]))
+
+
+class TestRender(unittest.TestCase):
+
+    def test_small(self):
+        self.assertEqual(
+            "[3, 'a', ({'b': 1}, None)]", render([3, 'a', ({'b': 1}, None)])
+        )
+
+    def test_large(self):
+        text = render(list(range(10 ** 6)))
+        self.assertTrue(text.startswith('[0, 1, 2'))
+        self.assertTrue(text.endswith('...]'))
+        self.assertLess(len(text), 1000)
+
+    def test_limit(self):
+        self.assertEqual(10, len(render('x' * 100, limit=10)))
+        self.assertEqual(10, len(render('x' * 10 ** 6, limit=10)))
+
+
+class TestMismatch(unittest.TestCase):
+
+    def test_values(self):
+        self.assertIsNone(mismatch(1, 2))
+
+    def test_nested(self):
+        self.assertEqual(
+            "At [1]['a']: expected 1, got 2.",
+            mismatch([0, {'a': 1}], [0, {'a': 2}])
+        )
+
+    def test_length(self):
+        self.assertEqual(
+            'Expected 3 items, got 2.', mismatch([1, 2, 3], [1, 2])
+        )
+        self.assertEqual('At [2]: expected 2, got 6.', mismatch(
+            list(range(10)), [0, 1, 6]
+        ))
+
+    def test_keys(self):
+        self.assertEqual("Missing key 'a'.", mismatch({'a': 1}, {}))
+        self.assertEqual(
+            "At [0]: unexpected key 'b'.",
+            mismatch([{'a': 1}], [{'a': 1, 'b': 2}])
+        )
+
+
+class TestRunnerResults(unittest.TestCase):
+
+    def test_mismatch(self):
+        runner = TestRunner(
+            'foo = list(range(1000))', '>>> foo\n%r' % list(range(999))
+        )
+        runner.run()
+        result, = runner.to_dict()['results']
+
+        self.assertFalse(result['correct'])
+        self.assertEqual('Expected 999 items, got 1000.', result['mismatch'])
+        self.assertTrue(result['received'].endswith('...]'))
+
+    def test_no_mismatch_when_solved(self):
+        runner = TestRunner('foo = 0.1 + 0.2', '>>> foo\n0.3')
+        runner.run()
+        result, = runner.to_dict()['results']
+
+        self.assertTrue(result['correct'])
+        self.assertNotIn('mismatch', result)
+        self.assertEqual('0.30000000000000004', result['received'])
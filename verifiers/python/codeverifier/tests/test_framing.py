@@ -0,0 +1,67 @@
+import io
+import unittest
+
+from codeverifier import payload
+from codeverifier.framing import FrameError, read_frame, write_frame
+
+
+class TestFraming(unittest.TestCase):
+
+    def test_round_trip(self):
+        fp = io.BytesIO()
+        write_frame(fp, {'solution': 'foo = 1', 'tests': '>>> foo\n1'})
+        write_frame(fp, {'solution': 'bar = 1'})
+        fp.seek(0)
+
+        self.assertEqual(
+            {'solution': 'foo = 1', 'tests': '>>> foo\n1'}, read_frame(fp)
+        )
+        self.assertEqual({'solution': 'bar = 1'}, read_frame(fp))
+        self.assertIsNone(read_frame(fp))
+
+    def test_truncated(self):
+        fp = io.BytesIO()
+        write_frame(fp, {'solution': 'foo = 1'})
+        fp = io.BytesIO(fp.getvalue()[:-2])
+
+        with self.assertRaises(FrameError):
+            read_frame(fp)
+
+    def test_too_large(self):
+        fp = io.BytesIO()
+        write_frame(fp, {'solution': 'foo = 1'})
+        fp.seek(0)
+
+        with self.assertRaises(FrameError):
+            read_frame(fp, max_size=4)
+
+    def test_codec(self):
+        codec = payload.get('yaml')
+        fp = io.BytesIO()
+        write_frame(fp, {'solution': 'foo = 1'}, codec)
+        fp.seek(0)
+
+        self.assertTrue(fp.getvalue()[4:].startswith(b'---'))
+        self.assertEqual({'solution': 'foo = 1'}, read_frame(fp, codec=codec))
+
+    def test_short_reads(self):
+        data = io.BytesIO()
+        write_frame(data, {'solution': 'foo = 1'})
+        fp = io.BufferedReader(SlowReader(data.getvalue()))
+
+        self.assertEqual({'solution': 'foo = 1'}, read_frame(fp))
+
+
+class SlowReader(io.RawIOBase):
+    """Raw stream returning at most 3 bytes per read."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        chunk, self.data = self.data[:3], self.data[3:]
+        b[:len(chunk)] = chunk
+        return len(chunk)
@@ -0,0 +1,132 @@
+import time
+import unittest
+
+from codeverifier.isolation import IsolatedTestRunner
+from codeverifier.timing import Timings
+
+
+SOLUTION = 'import time\ndef slow(n):\n  time.sleep(n)\n  return n\n'
+
+
+class TestIsolatedTestRunner(unittest.TestCase):
+
+    def test_run(self):
+        runner = IsolatedTestRunner(
+            'foo = 1\nprint("solution")\n'
+            'def show(x):\n  print(x)\n  return x\n',
+            '>>> foo\n1\n>>> foo = 2\n>>> print(foo)\n>>> foo\n2\n'
+            '>>> show(foo + 1)\n3\n'
+        )
+        runner.run()
+
+        self.assertIsNone(runner.errors)
+        self.assertTrue(runner.solved)
+        self.assertEqual(
+            ['foo', 'foo = 2', 'print(foo)', 'foo', 'show(foo + 1)'],
+            [r['call'] for r in runner.results]
+        )
+        self.assertEqual('solution\n2\n3\n', runner.printed)
+
+    def test_examples_share_state(self):
+        runner = IsolatedTestRunner(
+            's = [1, 2]\nn = 0\n'
+            'def count():\n  global n\n  n += 1\n  return n\n',
+            '>>> s.pop()\n2\n>>> s.pop()\n1\n>>> count()\n1\n'
+            '>>> count()\n2\n'
+        )
+        runner.run()
+
+        self.assertIsNone(runner.errors)
+        self.assertTrue(runner.solved, runner.results)
+
+    def test_failed_example_state_discarded(self):
+        runner = IsolatedTestRunner(
+            's = [1, 2, 3]\n',
+            '>>> s.pop() and __import__("os")._exit(3)\n1\n'
+            '>>> s.pop()\n3\n>>> s\n[1, 2]\n',
+        )
+        runner.run()
+
+        self.assertIsNone(runner.errors)
+        self.assertEqual(
+            [False, True, True], [r['correct'] for r in runner.results]
+        )
+
+    def test_statement_error(self):
+        runner = IsolatedTestRunner('foo = 1', '>>> foo = 1 / 0\n>>> foo\n1\n')
+        runner.run()
+        self.assertEqual('division by zero', runner.errors)
+
+    def test_example_errors(self):
+        runner = IsolatedTestRunner(
+            SOLUTION,
+            '>>> slow(5)\n5\n>>> 1/0\n1\n>>> __import__("os")._exit(3)\n1\n'
+            '>>> slow(0)\n0\n',
+            example_timeout=0.3
+        )
+        runner.run()
+
+        self.assertIsNone(runner.errors)
+        self.assertFalse(runner.solved)
+        self.assertEqual(
+            [
+                {
+                    'call': 'slow(5)',
+                    'correct': False,
+                    'error': 'The verification timed out.'
+                },
+                {
+                    'call': '1/0',
+                    'correct': False,
+                    'error': 'division by zero'
+                },
+                {
+                    'call': '__import__("os")._exit(3)',
+                    'correct': False,
+                    'error': 'Unexpected error.'
+                },
+                {
+                    'call': 'slow(0)',
+                    'expected': '0',
+                    'received': '0',
+                    'correct': True
+                },
+            ],
+            runner.results
+        )
+
+    def test_timings(self):
+        runner = IsolatedTestRunner(
+            'foo = 1', '>>> foo\n1\n>>> bar = 1\n>>> foo\n1\n',
+            timings=Timings()
+        )
+        runner.run()
+        self.assertEqual(3, len(runner.to_dict()['timings']['examples']))
+
+    def test_timings_of_failed_examples(self):
+        runner = IsolatedTestRunner(
+            SOLUTION, '>>> slow(0)\n0\n>>> slow(1)\n1\n'
+            '>>> __import__("os")._exit(3)\n>>> slow(0)\n0\n',
+            example_timeout=0.2, timings=Timings()
+        )
+        runner.run()
+
+        examples = runner.to_dict()['timings']['examples']
+        self.assertEqual(4, len(examples))
+        self.assertIsNone(examples[1])
+        self.assertIsNone(examples[2])
+        self.assertIsNotNone(examples[3])
+
+    def test_time_limit(self):
+        start = time.monotonic()
+        runner = IsolatedTestRunner(
+            SOLUTION, '>>> slow(10)\n10\n' * 3 + '>>> slow(0)\n0\n',
+            time_limit=0.5
+        )
+        runner.run()
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(
+            ['The verification timed out.'] * 4,
+            [r['error'] for r in runner.results]
+        )
@@ -0,0 +1,50 @@
+import unittest
+
+from codeverifier import (
+    CPU_LIMIT_ERROR, FILE_SIZE_LIMIT_ERROR, MEMORY_LIMIT_ERROR, TestRunner
+)
+from codeverifier.limits import MB, LimitExceeded, Limits, usage
+from codeverifier.zygote import Zygote
+
+
+class TestLimits(unittest.TestCase):
+
+    def run_limited(self, solution, **kw):
+        limits = Limits(
+            memory=kw.get('memory'), cpu=kw.get('cpu'),
+            processes=None, file_size=kw.get('file_size')
+        )
+        return Zygote(preload=(), limits=limits).run(solution, '', timeout=5)
+
+    def test_memory(self):
+        result = self.run_limited('foo = [0] * 10**9', memory=512 * MB)
+        self.assertEqual(MEMORY_LIMIT_ERROR, result['errors'])
+
+    def test_cpu(self):
+        with self.assertRaises(LimitExceeded) as ctx:
+            self.run_limited('while True: pass', cpu=1)
+        self.assertEqual(CPU_LIMIT_ERROR, str(ctx.exception))
+
+    def test_file_size(self):
+        result = self.run_limited(
+            'import tempfile\n'
+            'with tempfile.TemporaryFile() as fp:\n'
+            '  fp.write(b"0" * 2 * 1024 * 1024)\n'
+            '  fp.flush()\n',
+            file_size=MB
+        )
+        self.assertEqual(FILE_SIZE_LIMIT_ERROR, result['errors'])
+
+    def test_usage(self):
+        self.run_limited('foo = 1')
+        stats = usage()
+        self.assertGreater(stats['maxrss'], 0)
+        self.assertGreaterEqual(stats['cpu'], 0)
+
+
+class TestRunnerLimits(unittest.TestCase):
+
+    def test_memory_error(self):
+        runner = TestRunner('raise MemoryError()', '')
+        runner.run()
+        self.assertEqual(MEMORY_LIMIT_ERROR, runner.errors)
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+from codeverifier.memo import ResultCache, is_deterministic, result_key
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_get_set(self):
+        cache = ResultCache(self.path)
+        self.assertIsNone(cache.get('foo = 1', '>>> foo\n1'))
+
+        cache.set('foo = 1', '>>> foo\n1', {'solved': True})
+        self.assertEqual(
+            {'solved': True}, cache.get('foo = 1\r\n', '>>> foo\n1')
+        )
+        self.assertIsNone(cache.get('foo = 1', '>>> foo\n2'))
+        self.assertIsNone(
+            cache.get('foo = 1', '>>> foo\n1', {'isolate': True})
+        )
+
+        stats = cache.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(3, stats['misses'])
+        self.assertEqual(1, stats['entries'])
+        cache.close()
+
+    def test_ttl(self):
+        cache = ResultCache(self.path, ttl=-1)
+        cache.set('foo = 1', '', {'solved': True})
+        self.assertIsNone(cache.get('foo = 1', ''))
+        cache.close()
+
+    def test_evict(self):
+        cache = ResultCache(self.path, max_size=30)
+        cache.set('foo = 1', '', {'solved': True})
+        cache.set('foo = 2', '', {'solved': True})
+
+        self.assertIsNone(cache.get('foo = 1', ''))
+        self.assertEqual({'solved': True}, cache.get('foo = 2', ''))
+        cache.close()
+
+
+class TestResultKey(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(
+            result_key('foo = 1\n', ''), result_key('foo = 1\r\n\n', '')
+        )
+        self.assertNotEqual(
+            result_key('foo = 1', ''), result_key('foo =  1', '')
+        )
+
+    def test_tests(self):
+        self.assertNotEqual(result_key('a', 'b'), result_key('ab', ''))
+
+    def test_options(self):
+        self.assertEqual(result_key('a', 'b'), result_key('a', 'b', {}))
+        self.assertEqual(
+            result_key('a', 'b', {'x': 1, 'y': 2}),
+            result_key('a', 'b', {'y': 2, 'x': 1})
+        )
+        self.assertNotEqual(
+            result_key('a', 'b'), result_key('a', 'b', {'max_operations': 1})
+        )
+
+
+class TestIsDeterministic(unittest.TestCase):
+
+    def test_deterministic(self):
+        self.assertTrue(is_deterministic('import math\nfoo = math.pi'))
+
+    def test_nondeterministic(self):
+        self.assertFalse(is_deterministic('import random'))
+        self.assertFalse(is_deterministic('from os.path import join'))
+        self.assertFalse(is_deterministic('time = __import__("time")'))
+
+    def test_files_and_interpreter(self):
+        self.assertFalse(is_deterministic('data = open("/tmp/x").read()'))
+        self.assertFalse(is_deterministic('import sys\nn = len(sys.argv)'))
+        self.assertFalse(is_deterministic('import importlib'))
+        self.assertFalse(is_deterministic('from builtins import open'))
+        self.assertFalse(is_deterministic('f = __builtins__.open'))
+
+    def test_addresses_and_hashes(self):
+        self.assertFalse(is_deterministic('def f(x):\n    return id(x)'))
+        self.assertFalse(is_deterministic('h = hash("a")'))
+
+    def test_sets(self):
+        self.assertFalse(is_deterministic('s = {"a", "b"}'))
+        self.assertFalse(is_deterministic('s = set(["a", "b"])'))
+        self.assertFalse(is_deterministic('s = {c for c in "ab"}'))
+        self.assertFalse(is_deterministic('s = frozenset("ab")'))
+
+    def test_tests(self):
+        self.assertTrue(is_deterministic('a = 1', '>>> a\n1'))
+        self.assertFalse(is_deterministic('a = 1', '>>> {"a", "b"}\n'))
+        self.assertFalse(is_deterministic('a = 1', '>>> import sys\n'))
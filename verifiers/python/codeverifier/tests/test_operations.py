@@ -0,0 +1,99 @@
+import sys
+import unittest
+
+from codeverifier import OPERATION_LIMIT_ERROR, TestRunner
+from codeverifier.isolation import IsolatedTestRunner
+from codeverifier.operations import OperationCounter
+
+
+SOLUTION = '''
+def total(n):
+    t = 0
+    for i in range(n):
+        t += i
+    return t
+'''
+
+
+class TestOperations(unittest.TestCase):
+
+    def run_solution(self, solution, tests, limit, runner_class=TestRunner):
+        runner = runner_class(
+            solution, tests, operations=OperationCounter(limit)
+        )
+        runner.run()
+        return runner.to_dict()
+
+    def test_within_limit(self):
+        data = self.run_solution(SOLUTION, '>>> total(10)\n45', 1000)
+        self.assertTrue(data['solved'])
+        self.assertLess(data['operations'], 100)
+        self.assertGreater(data['operations'], 20)
+
+    def test_exceeded(self):
+        data = self.run_solution(SOLUTION, '>>> total(10 ** 6)\n0', 1000)
+        self.assertFalse(data['solved'])
+        self.assertEqual(OPERATION_LIMIT_ERROR, data['errors'])
+        self.assertEqual(1001, data['operations'])
+
+    def test_deterministic(self):
+        counts = set(
+            self.run_solution(SOLUTION, '>>> total(100)\n4950', 10 ** 6)[
+                'operations'
+            ]
+            for _ in range(3)
+        )
+        self.assertEqual(1, len(counts))
+
+    def test_infinite_loop(self):
+        data = self.run_solution(
+            'i = 0\nwhile True: i += 1', '', 10 ** 4
+        )
+        self.assertEqual(OPERATION_LIMIT_ERROR, data['errors'])
+
+    def test_caught(self):
+        solution = (
+            'try:\n'
+            '    while True: i = 1\n'
+            'except Exception:\n'
+            '    pass'
+        )
+        data = self.run_solution(solution, '', 100)
+        self.assertEqual(OPERATION_LIMIT_ERROR, data['errors'])
+
+    def test_library_code_untraced(self):
+        data = self.run_solution(
+            'import json\nfoo = json.dumps(list(range(1000)))', '', 10
+        )
+        self.assertNotIn('errors', data)
+        self.assertEqual(2, data['operations'])
+
+    def test_restores_trace(self):
+        runner = TestRunner(
+            SOLUTION, '>>> total(3)\n3', operations=OperationCounter(100)
+        )
+        previous = sys.gettrace()
+        runner.run()
+        self.assertIs(previous, sys.gettrace())
+
+    def test_isolated(self):
+        tests = '>>> total(3)\n3\n>>> total(10)\n45'
+        data = self.run_solution(
+            SOLUTION, tests, 1000, runner_class=IsolatedTestRunner
+        )
+        self.assertTrue(data['solved'])
+        # The forked examples count as if run in the code runner.
+        self.assertEqual(
+            self.run_solution(SOLUTION, tests, 1000)['operations'],
+            data['operations']
+        )
+
+    def test_isolated_exceeded(self):
+        # Each example is within the limit, but not all of them.
+        data = self.run_solution(
+            SOLUTION, '>>> total(100)\n4950\n' * 3, 500,
+            runner_class=IsolatedTestRunner
+        )
+        self.assertFalse(data['solved'])
+        self.assertEqual(OPERATION_LIMIT_ERROR, data['errors'])
+        self.assertGreater(data['operations'], 500)
@@ -0,0 +1,54 @@
+import doctest
+import unittest
+
+from codeverifier.parser import parse_examples
+
+
+def doctest_examples(text):
+    return [
+        (e.source, e.want)
+        for e in doctest.DocTestParser().get_examples(text)
+    ]
+
+
+class TestParseExamples(unittest.TestCase):
+
+    def assertSameAsDoctest(self, text):
+        self.assertEqual(doctest_examples(text), parse_examples(text))
+
+    def test_examples(self):
+        self.assertSameAsDoctest(
+            '>>> a = 1\n'
+            '>>> foo(a)\n'
+            '[1, 2]\n'
+            '\n'
+            'Some text\n'
+            '>>> for i in range(2):\n'
+            '...     print(i)\n'
+            '0\n'
+            '1\n'
+        )
+
+    def test_indented(self):
+        self.assertSameAsDoctest(
+            '  >>> foo\n'
+            '  1\n'
+            '    >>> bar\n'
+            '      2\n'
+        )
+
+    def test_blank_and_comments(self):
+        self.assertSameAsDoctest('>>>\n>>> # comment\n>>> foo\n1')
+
+    def test_tabs(self):
+        self.assertSameAsDoctest('\t>>> foo\n\t1\n')
+
+    def test_directives(self):
+        self.assertSameAsDoctest('>>> foo  # doctest: +ELLIPSIS\n1...\n')
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            parse_examples('>>>foo\n1\n')
+
+        with self.assertRaises(ValueError):
+            parse_examples('  >>> foo\n1\n')
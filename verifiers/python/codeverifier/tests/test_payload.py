@@ -0,0 +1,43 @@
+import unittest
+
+from codeverifier import payload
+
+
+class TestPayload(unittest.TestCase):
+
+    def test_sniff(self):
+        self.assertEqual('yaml', payload.sniff('---\nsolution: foo').name)
+        self.assertEqual('yaml', payload.sniff('\n  ---\n').name)
+        self.assertEqual('json', payload.sniff('{"solution": "---"}').name)
+
+    def test_json(self):
+        codec = payload.get('json')
+        obj = {'solution': 'foo = 1', 'tests': '>>> foo\n1'}
+        data = codec.dumps(obj)
+
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(obj, codec.loads(data))
+        self.assertEqual(obj, codec.loads(bytearray(data)))
+        self.assertEqual(obj, codec.loads(memoryview(data)))
+        self.assertEqual(obj, codec.loads(data.decode('utf-8')))
+
+    def test_yaml(self):
+        codec = payload.get('yaml')
+        obj = {'solution': 'foo = 1\n', 'tests': '>>> foo\n1\n'}
+
+        self.assertEqual(obj, codec.loads(codec.dumps(obj)))
+        self.assertEqual(
+            obj, codec.loads('---\nsolution: |\n  foo = 1\ntests: |\n'
+                             '  >>> foo\n  1\n')
+        )
+
+    def test_get(self):
+        with self.assertRaises(ValueError):
+            payload.get('xml')
+
+        for name in payload.available():
+            self.assertEqual(name, payload.get(name).name)
+
+    def test_binary(self):
+        self.assertIn(payload.binary().name, payload.BINARY_CODECS)
+        self.assertIn(payload.binary().name, payload.available())
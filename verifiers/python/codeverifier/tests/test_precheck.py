@@ -0,0 +1,68 @@
+import unittest
+
+from codeverifier import TestRunner
+from codeverifier.precheck import check
+
+
+class TestCheck(unittest.TestCase):
+
+    def assertSameAsRunner(self, solution, tests):
+        runner = TestRunner(solution, tests)
+        runner.run()
+        self.assertEqual(runner.to_dict(), check(solution, tests))
+
+    def test_valid(self):
+        self.assertIsNone(check('foo = 1', '>>> foo\n1'))
+        self.assertIsNone(check('import os', '>>> 1\n1'))
+
+    def test_empty_solution(self):
+        self.assertEqual(
+            {
+                'solved': False,
+                'printed': '',
+                'errors': 'The solution is empty.'
+            },
+            check(' \n', '>>> 1\n1')
+        )
+
+    def test_solution_syntax_error(self):
+        self.assertSameAsRunner('def foo(:\n  pass', '>>> foo()\n1')
+        self.assertSameAsRunner('return 1', '>>> 1\n1')
+        self.assertSameAsRunner('foo = 1\n\0', '>>> foo\n1')
+
+    def test_tests_errors(self):
+        self.assertSameAsRunner('foo = 1', '>>> foo(\n1')
+        self.assertSameAsRunner('foo = 1', '>>>foo\n1')
+
+    def test_forbidden(self):
+        result = check(
+            'import math, os.path', '>>> 1\n1', forbidden=['os']
+        )
+        self.assertEqual(
+            'Importing "os.path" is not allowed.', result['errors']
+        )
+
+        result = check(
+            'from subprocess import run', '>>> 1\n1', forbidden=['subprocess']
+        )
+        self.assertEqual(
+            'Importing "subprocess" is not allowed.', result['errors']
+        )
+
+        self.assertIsNone(
+            check('import os', '>>> 1\n1', forbidden=['os.path'])
+        )
+
+    def test_deeply_nested(self):
+        solution = 'x = ' + '+'.join(['1'] * 100000)
+        self.assertIsNone(check(solution, '>>> 1\n1'))
+        self.assertIsNone(check(solution, '>>> 1\n1', forbidden=['os']))
+
+    def test_costly_folding(self):
+        self.assertIsNone(check('x = 10 ** 10 ** 8', '>>> 1\n1'))
+        self.assertIsNone(check("x = 'x' * (10 ** 9)", '>>> 1\n1'))
+
+    def test_large_solution_forbidden(self):
+        solution = 'import os\n' + '# padding\n' * 4096
+        result = check(solution, '>>> 1\n1', forbidden=['os'])
+        self.assertEqual('Importing "os" is not allowed.', result['errors'])
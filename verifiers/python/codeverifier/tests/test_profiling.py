@@ -0,0 +1,52 @@
+import unittest
+
+from codeverifier import TestRunner
+from codeverifier.profiling import Profile
+
+
+SOLUTION = '''
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+def solve(n):
+    return [fib(i) for i in range(n)]
+'''
+
+
+class TestProfile(unittest.TestCase):
+
+    def test_to_dict(self):
+        runner = TestRunner(
+            SOLUTION, '>>> solve(15)[-1]\n377', profile=Profile()
+        )
+        runner.run()
+        data = runner.to_dict()
+
+        self.assertTrue(data['solved'])
+        rows = dict((r['function'], r) for r in data['profile'])
+        self.assertIn('fib', rows)
+        self.assertIn('solve', rows)
+        self.assertNotIn('<module>', rows)
+        self.assertEqual(2, rows['fib']['line'])
+        self.assertEqual(1, rows['solve']['calls'])
+        self.assertGreater(rows['fib']['calls'], 1000)
+        self.assertGreaterEqual(
+            rows['solve']['cumulative'], rows['fib']['cumulative']
+        )
+        self.assertEqual(
+            sorted(data['profile'], key=lambda r: -r['cumulative']),
+            data['profile']
+        )
+
+    def test_top(self):
+        solution = '\n'.join(
+            'def f%d(): pass\nf%d()' % (i, i) for i in range(5)
+        )
+        runner = TestRunner(solution, '', profile=Profile(3))
+        runner.run()
+        self.assertEqual(3, len(runner.to_dict()['profile']))
+
+    def test_no_profile(self):
+        runner = TestRunner(SOLUTION, '>>> solve(3)\n[0, 1, 1]')
+        runner.run()
+        self.assertNotIn('profile', runner.to_dict())
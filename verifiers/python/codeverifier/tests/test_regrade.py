@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from codeverifier.regrade import (
+    INVALID_SUBMISSION_ERROR, LineKey, Regrader, read_checkpoint
+)
+from codeverifier.zygote import Zygote
+
+
+def submissions(*items):
+    return [json.dumps(item) + '\n' for item in items]
+
+
+class TestRegrader(unittest.TestCase):
+
+    def regrade(self, lines, **kw):
+        output = io.StringIO()
+        regrader = Regrader(
+            output, workers=2, timeout=0.5, zygote=Zygote(preload=()), **kw
+        )
+        regrader.run(lines)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        return regrader, {
+            r['id'] if r['id'] is not None else LineKey(r['line']): r['result']
+            for r in results
+        }
+
+    def test_run(self):
+        _, results = self.regrade(submissions(
+            {'id': 'a', 'solution': 'foo = 1', 'tests': '>>> foo\n1'},
+            {'id': 'b', 'solution': 'foo = 2', 'tests': '>>> foo\n1'},
+        ))
+        self.assertEqual({'a', 'b'}, set(results))
+        self.assertTrue(results['a']['solved'])
+        self.assertFalse(results['b']['solved'])
+
+    def test_tests_override(self):
+        _, results = self.regrade(
+            submissions({'id': 'a', 'solution': 'foo = 2', 'tests': ''}),
+            tests='>>> foo\n2'
+        )
+        self.assertTrue(results['a']['results'][0]['correct'])
+
+    def test_skip_done(self):
+        regrader, results = self.regrade(
+            submissions(
+                {'id': 'a', 'solution': 'foo = 1', 'tests': ''},
+                {'id': 'b', 'solution': 'foo = 1', 'tests': ''},
+            ),
+            done={'a'}
+        )
+        self.assertEqual({'b'}, set(results))
+        self.assertEqual(1, regrader.skipped)
+
+    def test_invalid_submission(self):
+        _, results = self.regrade(['{"id": "a"}\n', 'not json\n'])
+        self.assertEqual(
+            {
+                'a': {'solved': False, 'errors': INVALID_SUBMISSION_ERROR},
+                LineKey(2): {
+                    'solved': False, 'errors': INVALID_SUBMISSION_ERROR
+                },
+            },
+            results
+        )
+
+    def test_line_keys_do_not_collide(self):
+        _, results = self.regrade(submissions(
+            {'solution': 'foo = 1', 'tests': ''},
+            {'id': 0, 'solution': 'foo = 1', 'tests': ''},
+            {'id': 1, 'solution': 'foo = 1', 'tests': ''},
+        ))
+        self.assertEqual({LineKey(1), 0, 1}, set(results))
+
+    def test_skip_done_invalid(self):
+        regrader, results = self.regrade(['not json\n'], done={LineKey(1)})
+        self.assertEqual({}, results)
+        self.assertEqual(1, regrader.skipped)
+
+    def test_output_not_inherited(self):
+        forge = (
+            'import os\n'
+            'for fd in range(3, 256):\n'
+            '    try:\n'
+            '        os.write(fd, b\'{"id": "forged", "result": {}}\\n\')\n'
+            '    except OSError:\n'
+            '        pass'
+        )
+        with tempfile.TemporaryFile('w+') as output:
+            regrader = Regrader(
+                output, workers=1, timeout=2, zygote=Zygote(preload=())
+            )
+            regrader.run(submissions({'id': 'a', 'solution': forge}))
+            output.seek(0)
+            ids = [json.loads(line)['id'] for line in output]
+
+        self.assertEqual(['a'], ids)
+
+
+class TestReadCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_missing(self):
+        os.unlink(self.path)
+        self.assertEqual(set(), read_checkpoint(self.path))
+        open(self.path, 'w').close()
+
+    def test_truncate_partial_line(self):
+        with open(self.path, 'w') as fp:
+            fp.write('{"id": "a", "result": {}}\n{"id": "b", "res')
+
+        self.assertEqual({'a'}, read_checkpoint(self.path))
+        with open(self.path) as fp:
+            self.assertEqual('{"id": "a", "result": {}}\n', fp.read())
+
+    def test_line_keys(self):
+        with open(self.path, 'w') as fp:
+            fp.write('{"id": null, "line": 3, "result": {}}\n')
+            fp.write('{"id": 3, "result": {}}\n')
+
+        self.assertEqual({LineKey(3), 3}, read_checkpoint(self.path))
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+
+RUNNER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'runner'
+)
+
+
+def run(*args):
+    proc = subprocess.Popen(
+        [sys.executable, RUNNER_SCRIPT] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stdout, stderr = proc.communicate()
+    return proc.returncode, stdout.decode(), stderr.decode()
+
+
+def done(stdout):
+    return json.loads(stdout.splitlines()[-1])['done']
+
+
+class TestRunnerScript(unittest.TestCase):
+
+    def test_options_in_any_order(self):
+        for args in (
+            ['--timings', '--max-operations', '100', 'a = 1', '>>> a\n1'],
+            ['--max-operations', '100', '--timings', 'a = 1', '>>> a\n1'],
+            ['a = 1', '>>> a\n1', '--max-operations', '100', '--timings'],
+        ):
+            code, stdout, _ = run(*args)
+            self.assertEqual(0, code)
+            result = done(stdout)
+            self.assertTrue(result['solved'])
+            self.assertIn('timings', result)
+            self.assertIn('operations', result)
+
+    def test_unknown_option(self):
+        code, stdout, stderr = run('--isolated', 'a = 1')
+        self.assertEqual(2, code)
+        self.assertEqual('', stdout)
+        self.assertIn('unknown option --isolated', stderr)
+
+    def test_missing_value(self):
+        code, _, stderr = run('a = 1', '--profile')
+        self.assertEqual(2, code)
+        self.assertIn('--profile expects a number', stderr)
+
+    def test_too_many_arguments(self):
+        code, _, _ = run('a = 1', '>>> a\n1', 'extra')
+        self.assertEqual(2, code)
+
+    def test_separator(self):
+        code, stdout, _ = run('--', '--x', '>>> 1\n1')
+        self.assertEqual(0, code)
+        self.assertIn('errors', done(stdout))
+
+    def test_budget_imported_lazily(self):
+        code = (
+            'import sys\n'
+            'from codeverifier import TestRunner\n'
+            'TestRunner("a = 1", ">>> a  # a comment\\n1").run()\n'
+            'print("codeverifier.budget" in sys.modules)\n'
+        )
+        output = subprocess.check_output(
+            [sys.executable, '-c', code],
+            cwd=os.path.dirname(RUNNER_SCRIPT)
+        )
+        self.assertEqual(b'False\n', output)
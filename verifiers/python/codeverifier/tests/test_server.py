@@ -0,0 +1,59 @@
+import socket
+import threading
+import unittest
+
+from codeverifier import TIMEOUT_ERROR
+from codeverifier.framing import read_frame, write_frame
+from codeverifier.server import INVALID_REQUEST_ERROR, Server
+from codeverifier.zygote import Zygote
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server.tcp(
+            0, 0.5, concurrency=2, zygote=Zygote(preload=())
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.drain()
+        self.thread.join()
+
+    def request(self, *reqs):
+        with socket.create_connection(self.server.address) as conn:
+            with conn.makefile('rwb') as fp:
+                results = []
+                for req in reqs:
+                    write_frame(fp, req)
+                    results.append(read_frame(fp))
+                return results
+
+    def test_verify(self):
+        results = self.request(
+            {'solution': 'foo = 1', 'tests': '>>> foo\n1'},
+            {'solution': 'foo = 2', 'tests': '>>> foo\n1'},
+        )
+        self.assertEqual([True, False], [r['solved'] for r in results])
+
+    def test_timeout(self):
+        result, = self.request({'solution': 'while True: pass', 'tests': ''})
+        self.assertEqual({'solved': False, 'errors': TIMEOUT_ERROR}, result)
+
+    def test_invalid_request(self):
+        result, = self.request({'tests': '>>> foo\n1'})
+        self.assertEqual(
+            {'solved': False, 'errors': INVALID_REQUEST_ERROR}, result
+        )
+
+    def test_drain_closes_idle_connections(self):
+        with socket.create_connection(self.server.address) as conn:
+            with conn.makefile('rwb') as fp:
+                write_frame(fp, {'solution': 'foo = 1', 'tests': ''})
+                self.assertTrue(read_frame(fp)['solved'])
+
+                self.server.drain()
+                self.thread.join(5)
+                self.assertFalse(self.thread.is_alive())
+                self.assertIsNone(read_frame(fp))
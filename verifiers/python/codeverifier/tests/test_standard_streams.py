@@ -1,7 +1,7 @@
 import io
 import unittest
 
-from codeverifier import StandardStreams
+from codeverifier import CappedStream, StandardStreams, TRUNCATION_MARKER
 
 
 class TestStandardStreams(unittest.TestCase):
@@ -41,3 +41,59 @@ class TestStandardStreams(unittest.TestCase):
 
         self.assertEqual('', self.sys.stdout.getvalue())
         self.assertEqual('', self.sys.stderr.getvalue())
+
+    def test_limit(self):
+        patcher = StandardStreams(self.sys, limit=10)
+        patcher.switch()
+        self.sys.stdout.write('0123')
+        self.sys.stderr.write('4567')
+
+        mock = patcher.restore()
+        self.assertEqual('01234567', mock.getvalue())
+        self.assertEqual(0, mock.dropped)
+        patcher.close()
+
+
+class TestCappedStream(unittest.TestCase):
+
+    def test_head_and_tail(self):
+        stream = CappedStream(10)
+        for i in range(10):
+            stream.write('%d' % i * 3)
+
+        self.assertEqual(20, stream.dropped)
+        self.assertEqual(
+            '00011' + TRUNCATION_MARKER % 20 + '88999', stream.getvalue()
+        )
+
+    def test_print(self):
+        stream = CappedStream(8)
+        for i in range(1000):
+            print(i, file=stream)
+
+        self.assertTrue(stream.getvalue().startswith('0\n1\n'))
+        self.assertTrue(stream.getvalue().endswith('999\n'))
+        marker = TRUNCATION_MARKER % stream.dropped
+        self.assertEqual(8, len(stream.getvalue()) - len(marker))
+
+    def test_under_limit(self):
+        stream = CappedStream(8)
+        stream.write('01234567')
+        self.assertEqual(0, stream.dropped)
+        self.assertEqual('01234567', stream.getvalue())
+
+        stream.write('8')
+        self.assertEqual(1, stream.dropped)
+        self.assertEqual(
+            '0123' + TRUNCATION_MARKER % 1 + '5678', stream.getvalue()
+        )
+
+    def test_closed(self):
+        stream = CappedStream(8)
+        stream.close()
+        with self.assertRaises(ValueError):
+            stream.write('foo')
+
+    def test_type_error(self):
+        with self.assertRaises(TypeError):
+            CappedStream().write(b'foo')
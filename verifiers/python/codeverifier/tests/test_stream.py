@@ -0,0 +1,72 @@
+import os
+import unittest
+
+from codeverifier import TestRunner
+from codeverifier.stream import ResultReader, ResultWriter, read
+from codeverifier.zygote import Zygote
+
+
+class TestStream(unittest.TestCase):
+
+    def stream(self, runner):
+        read_fd, write_fd = os.pipe()
+        writer = ResultWriter(write_fd)
+        runner.listener = writer
+        runner.run()
+        writer.done(runner)
+        os.close(write_fd)
+
+        reader = ResultReader()
+        read(read_fd, reader, timeout=1)
+        os.close(read_fd)
+        return reader
+
+    def test_result(self):
+        runner = TestRunner('foo = 1\nprint(foo)', '>>> foo\n1\n>>> foo\n2')
+        reader = self.stream(runner)
+        self.assertEqual(runner.to_dict(), reader.result())
+        self.assertIsNone(reader.running)
+
+    def test_errors(self):
+        runner = TestRunner('foo = 1', '>>> foo\n1\n>>> bar\n2')
+        reader = self.stream(runner)
+        self.assertEqual(runner.to_dict(), reader.result())
+
+    def test_feed_partial_lines(self):
+        reader = ResultReader()
+        reader.feed(b'{"running":"foo"}\n{"res')
+        self.assertEqual('foo', reader.running)
+        reader.feed(b'ult":{"call":"foo"}}\njunk\n{"running":"bar"}\n')
+        self.assertEqual([{'call': 'foo'}], reader.results)
+        self.assertEqual('bar', reader.running)
+
+        with self.assertRaises(ChildProcessError):
+            reader.result()
+
+        self.assertEqual(
+            {
+                'solved': False,
+                'errors': 'oops',
+                'results': [{'call': 'foo'}],
+                'running': 'bar'
+            },
+            reader.failed('oops')
+        )
+
+    def test_failed_without_progress(self):
+        self.assertEqual(
+            {'solved': False, 'errors': 'oops'}, ResultReader().failed('oops')
+        )
+
+    def test_timeout_progress(self):
+        progress = ResultReader()
+        with self.assertRaises(TimeoutError):
+            Zygote(preload=()).run(
+                'def foo(n):\n  while n: pass\n  return n',
+                '>>> foo(0)\n0\n>>> foo(1)\n1',
+                timeout=0.5,
+                progress=progress
+            )
+
+        self.assertEqual(1, len(progress.results))
+        self.assertEqual('foo(1)', progress.running)
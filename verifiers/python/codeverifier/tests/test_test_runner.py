@@ -1,7 +1,8 @@
 import json
 import unittest
 
-from codeverifier import TestRunner
+from codeverifier import TestRunner, budget
+from codeverifier.timing import Timings
 
 
 class TestTestRunner(unittest.TestCase):
@@ -113,3 +114,134 @@ class TestTestRunner(unittest.TestCase):
         self.assertEqual('', data['printed'])
         self.assertTrue(data['solved'])
         self.assertIsNone(data.get('errors'))
+
+    def test_printed_limit(self):
+        runner = TestRunner(
+            solution='for i in range(100):\n  print("%02d" % i)',
+            tests='',
+            printed_limit=12
+        )
+        runner.run()
+        data = runner.to_dict()
+
+        self.assertEqual(288, data['truncated'])
+        self.assertTrue(data['printed'].startswith('00\n01\n'))
+        self.assertTrue(data['printed'].endswith('98\n99\n'))
+
+
+class TestTimings(unittest.TestCase):
+
+    def test_no_timings(self):
+        runner = TestRunner(solution='foo = 1', tests='>>> foo\n1')
+        runner.run()
+        self.assertNotIn('timings', runner.to_dict())
+
+    def test_timings(self):
+        runner = TestRunner(
+            solution='foo = 1',
+            tests='>>> bar = 2\n>>> foo\n1',
+            timings=Timings()
+        )
+        runner.run()
+        timings = runner.to_dict()['timings']
+
+        for phase in ('solution', 'suite', 'repr'):
+            self.assertGreaterEqual(timings[phase], 0)
+        self.assertEqual(2, len(timings['examples']))
+        json.dumps(timings)
+
+
+class TestBudget(unittest.TestCase):
+
+    SOLUTION = (
+        'import time\n'
+        'calls = []\n'
+        'def wait(seconds):\n'
+        '    calls.append(seconds)\n'
+        '    time.sleep(seconds)\n'
+        '    return len(calls)\n'
+    )
+
+    def setUp(self):
+        self.speed_factor = budget._speed_factor
+        budget._speed_factor = 1.0
+
+    def tearDown(self):
+        budget._speed_factor = self.speed_factor
+
+    def run_tests(self, tests):
+        runner = TestRunner(self.SOLUTION, tests)
+        runner.run()
+        return runner.to_dict()
+
+    def test_parse(self):
+        self.assertEqual(50 * 10 ** 6, budget.parse('foo()  # budget: 50ms'))
+        self.assertEqual(1500, budget.parse('foo()  #budget:1.5us'))
+        self.assertEqual(2 * 10 ** 9, budget.parse('foo(\n  1)  # budget: 2s'))
+        self.assertIsNone(budget.parse('foo()  # budget: 50'))
+        self.assertIsNone(budget.parse('foo("# budget: 50ms")'))
+
+    def test_within_budget(self):
+        data = self.run_tests('>>> wait(0)  # budget: 1s\n1')
+        result, = data['results']
+
+        self.assertTrue(data['solved'])
+        self.assertTrue(result['correct'])
+        self.assertTrue(result['within_budget'])
+        self.assertEqual(1000, result['budget'])
+        self.assertLess(result['elapsed'], 1000)
+
+    def test_over_budget(self):
+        data = self.run_tests('>>> wait(0.05)  # budget: 1ms\n1')
+        result, = data['results']
+
+        self.assertFalse(data['solved'])
+        self.assertTrue(result['correct'])
+        self.assertFalse(result['within_budget'])
+        self.assertGreaterEqual(result['elapsed'], 50)
+
+    def test_repeat_over_budget(self):
+        data = self.run_tests(
+            '>>> wait(0.003)  # budget: 2ms\n1\n>>> len(calls)\n1'
+        )
+        over, count = data['results']
+
+        self.assertFalse(over['within_budget'])
+        # The repeats ran in a child.
+        self.assertTrue(count['correct'])
+
+    def test_repeat_best_time(self):
+        runner = TestRunner(
+            'import time\n'
+            'calls = []\n'
+            'def warm_up():\n'
+            '    calls.append(1)\n'
+            '    print(len(calls))\n'
+            '    if len(calls) == 1:\n'
+            '        time.sleep(0.01)\n'
+            '    return 0\n',
+            '>>> warm_up()  # budget: 5ms\n0\n>>> len(calls)\n1\n'
+        )
+        runner.run()
+        data = runner.to_dict()
+        over, count = data['results']
+
+        self.assertTrue(over['within_budget'])
+        self.assertTrue(count['correct'])
+        self.assertEqual('1\n', data['printed'])
+
+    def test_statement(self):
+        data = self.run_tests('>>> wait(0)  # budget: 1s')
+        result, = data['results']
+
+        self.assertTrue(data['solved'])
+        self.assertTrue(result['within_budget'])
+
+    def test_no_budget(self):
+        result, = self.run_tests('>>> wait(0)\n1')['results']
+        self.assertNotIn('within_budget', result)
+
+    def test_speed_factor(self):
+        budget._speed_factor = 2.0
+        result, = self.run_tests('>>> wait(0)  # budget: 10ms\n1')['results']
+        self.assertEqual(20, result['budget'])
@@ -0,0 +1,104 @@
+import os
+import unittest
+
+from codeverifier.stream import ResultReader
+from codeverifier.timing import Timings
+from codeverifier.zygote import Zygote
+
+
+class TestZygote(unittest.TestCase):
+
+    def setUp(self):
+        self.zygote = Zygote(preload=())
+
+    def test_run(self):
+        result = self.zygote.run('foo = 1\nprint(foo)', '>>> foo\n1')
+        self.assertEqual(
+            {
+                'solved': True,
+                'printed': '1\n',
+                'results': [{
+                    'call': 'foo',
+                    'expected': '1',
+                    'received': '1',
+                    'correct': True
+                }]
+            },
+            result
+        )
+        self.assertEqual(set(), self.zygote.children)
+
+    def test_run_timings(self):
+        timings = Timings()
+        result = self.zygote.run('foo = 1', '>>> foo\n1', timings=timings)
+        self.assertEqual(1, len(result['timings']['examples']))
+        self.assertIn('write', result['timings'])
+        self.assertEqual(['fork', 'wait'], list(timings.to_dict()))
+
+    def test_run_is_isolated(self):
+        self.zygote.run('import math\nmath.pi = 3', '')
+        result = self.zygote.run(
+            'import math\npi = math.pi', '>>> pi > 3\nTrue'
+        )
+        self.assertTrue(result['solved'])
+
+    def test_timeout(self):
+        with self.assertRaises(TimeoutError):
+            self.zygote.run('while True: pass', '', timeout=0.2)
+        self.assertEqual(set(), self.zygote.children)
+
+    def test_timeout_profile(self):
+        progress = ResultReader()
+        with self.assertRaises(TimeoutError):
+            self.zygote.run(
+                'def spin():\n    while True: pass\nspin()', '',
+                timeout=0.3, progress=progress, profile=5
+            )
+        self.assertEqual(set(), self.zygote.children)
+
+        result = progress.failed('timeout')
+        self.assertEqual(['spin'], [r['function'] for r in result['profile']])
+
+    def test_max_operations(self):
+        zygote = Zygote(preload=(), max_operations=1000)
+        result = zygote.run('i = 0\nwhile True: i += 1', '', timeout=2)
+        self.assertEqual('Operation budget exceeded.', result['errors'])
+        self.assertEqual(1001, result['operations'])
+
+    def test_isolate_time_limit(self):
+        # Examples still running close to the timeout time out on their
+        # own, before the child is killed.
+        zygote = Zygote(preload=(), isolate=True, example_timeout=10)
+        result = zygote.run(
+            'import time', '>>> time.sleep(10)\n>>> 1\n1', timeout=1
+        )
+        self.assertEqual(
+            ['The verification timed out.'] * 2,
+            [r['error'] for r in result['results']]
+        )
+
+    def test_inherited_fds_closed(self):
+        # e.g. a server socket; numbered above any the child opens.
+        read_fd, write_fd = os.pipe()
+        os.dup2(read_fd, 100)
+        os.dup2(write_fd, 101)
+        os.close(read_fd)
+        os.close(write_fd)
+        try:
+            result = self.zygote.run(
+                'import os\nfds = os.listdir("/proc/self/fd")',
+                ">>> '100' in fds or '101' in fds\nFalse"
+            )
+        finally:
+            os.close(100)
+            os.close(101)
+        self.assertTrue(result['solved'], result)
+
+    def test_crash(self):
+        with self.assertRaises(ChildProcessError):
+            self.zygote.run('import os\nos._exit(3)', '')
+
+    def test_warm(self):
+        zygote = Zygote(preload=('math', 'not_a_module_at_all'))
+        with self.assertLogs(level='WARNING'):
+            zygote.warm()
@@ -0,0 +1,45 @@
+"""Opt-in per-phase timings of a verification.
+
+Durations are in nanoseconds, measured with `time.perf_counter_ns` (or
+`time.perf_counter` on Python versions without it).
+
+"""
+import collections
+import time
+
+
+__all__ = ['Timings', 'now_ns']
+
+
+if hasattr(time, 'perf_counter_ns'):
+    now_ns = time.perf_counter_ns
+else:
+    def now_ns():
+        return int(time.perf_counter() * 1e9)
+
+
+class Timings(object):
+    """Accumulate the time spent in each phase.
+
+    `add(phase, start)` adds the time elapsed since `start` (a `now_ns()`
+    value) to the phase; `example(start)` records one example duration.
+
+    """
+
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+        self.examples = []
+
+    def add(self, phase, start):
+        elapsed = now_ns() - start
+        self.phases[phase] = self.phases.get(phase, 0) + elapsed
+        return elapsed
+
+    def example(self, start):
+        self.examples.append(now_ns() - start)
+
+    def to_dict(self):
+        data = dict(self.phases)
+        if self.examples:
+            data['examples'] = list(self.examples)
+        return data
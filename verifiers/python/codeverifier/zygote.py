@@ -0,0 +1,242 @@
+"""Fork-server ("zygote") running each TestRunner in a forked child.
+
+The parent imports codeverifier, and the modules solutions commonly use,
+once. Each run then only pays for a copy-on-write fork instead of a new
+interpreter start-up.
+
+"""
+import importlib
+import logging
+import os
+import signal
+import threading
+
+from codeverifier import TestRunner, budget
+from codeverifier.cache import suites
+from codeverifier.limits import LimitExceeded, signal_error
+from codeverifier.operations import OperationCounter
+from codeverifier.stream import ResultReader, ResultWriter, read, stop
+from codeverifier.timing import Timings, now_ns
+
+
+__all__ = ['PRELOAD_MODULES', 'Zygote']
+
+
+PRELOAD_MODULES = (
+    'collections',
+    'functools',
+    'itertools',
+    'math',
+    'random',
+    're',
+    'string',
+)
+
+
+class Zygote(object):
+    """Fork a child per run from a warmed up parent.
+
+    `run()` keeps the `verify`'s `spawn()` contract: it returns the
+    `TestRunner.to_dict()` result, raises `TimeoutError` when the child
+    runs for too long (the child is killed) and `ChildProcessError` when
+    the child did not exit cleanly (`LimitExceeded` if it was killed for
+    exceeding one of its `codeverifier.limits.Limits`). With `isolate`,
+    the child runs a `codeverifier.isolation.IsolatedTestRunner`, whose
+    examples time out after `example_timeout` seconds or close to the run
+    `timeout`. With `max_operations`, the child runs at most that many
+    lines of the solution (see `codeverifier.operations`).
+
+    The child streams its results; pass a `codeverifier.stream.ResultReader`
+    as `progress` to get the examples completed before a failure.
+
+    With a `codeverifier.timing.Timings` as `timings`, the child times its
+    phases (in the result "timings") and the "fork" and "wait" phases are
+    added to `timings`.
+
+    With `profile` (a number of functions), the result includes the child's
+    `codeverifier.profiling.Profile`; a child timing out is given a chance
+    to send it before being killed.
+
+    """
+
+    def __init__(
+        self, preload=PRELOAD_MODULES, limits=None, isolate=False,
+        max_operations=None, example_timeout=None
+    ):
+        self.preload = preload
+        self.limits = limits
+        self.isolate = isolate
+        self.max_operations = max_operations
+        self.example_timeout = example_timeout
+        self.children = set()
+        # A child forked by an other thread must not inherit a result
+        # pipe write end, or that pipe would not reach EOF before it exits.
+        self.lock = threading.Lock()
+
+    def warm(self):
+        for name in self.preload:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                logging.warning('Failed to preload "%s"', name)
+
+        # Children inherit the host speed used to scale time budgets.
+        budget.speed_factor()
+
+    def kill(self, *args, **kw):
+        for pid in list(self.children):
+            self._kill(pid)
+
+    def run(
+        self, solution, tests, timeout=None, progress=None, timings=None,
+        profile=None
+    ):
+        start = now_ns() if timings is not None else None
+        with self.lock:
+            # Parse the tests in the parent so the following runs of the
+            # same tests find them in the inherited cache. It holds the
+            # lock so that no child is forked while an other thread holds
+            # the cache lock.
+            try:
+                suites.get(tests)
+            except Exception:
+                pass
+
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                self._child(
+                    solution, tests, write_fd, timings is not None, profile,
+                    timeout
+                )
+
+            os.close(write_fd)
+            self.children.add(pid)
+
+        if timings is not None:
+            timings.add('fork', start)
+            start = now_ns()
+
+        if progress is None:
+            progress = ResultReader()
+
+        try:
+            read(read_fd, progress, timeout)
+        except TimeoutError:
+            stop(
+                read_fd, progress,
+                lambda: self._kill(pid, signal.SIGTERM),
+                lambda: self._kill(pid)
+            )
+            self._wait(pid)
+            raise
+        finally:
+            os.close(read_fd)
+
+        status = self._wait(pid)
+        if timings is not None:
+            timings.add('wait', start)
+        if os.WIFSIGNALED(status):
+            error = signal_error(os.WTERMSIG(status))
+            if error is not None:
+                raise LimitExceeded(error)
+            raise ChildProcessError(
+                'Code runner killed by signal %d' % os.WTERMSIG(status)
+            )
+
+        code = os.WEXITSTATUS(status)
+        if code != 0:
+            raise ChildProcessError('Code runner exit with code %d' % code)
+
+        return progress.result()
+
+    def _child(
+        self, solution, tests, write_fd, timed=False, profile=None,
+        timeout=None
+    ):
+        code = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+            # The solution must not reach the parent's files and sockets
+            # (e.g. the server socket and its connections).
+            _close_fds(keep=write_fd)
+
+            # The result pipe is the only output channel; anything
+            # written straight to fd 1 must not reach the parent's stdout.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, 1)
+            os.close(devnull)
+
+            if self.limits is not None:
+                self.limits.apply()
+
+            timings = Timings() if timed else None
+            writer = ResultWriter(write_fd, timings=timings)
+            if profile:
+                from codeverifier.profiling import Profile, flush_on_sigterm
+                profile = Profile(profile)
+                flush_on_sigterm(profile, writer)
+            else:
+                profile = None
+
+            operations = None
+            if self.max_operations:
+                operations = OperationCounter(self.max_operations)
+
+            runner_class, options = self._runner_class(timeout)
+            runner = runner_class(
+                solution, tests, listener=writer, timings=timings,
+                profile=profile, operations=operations, **options
+            )
+            runner.run()
+            writer.done(runner)
+            code = 0
+        finally:
+            os._exit(code)
+
+    def _runner_class(self, timeout=None):
+        """Return the runner class and its extra options."""
+        if not self.isolate:
+            return TestRunner, {}
+
+        from codeverifier.isolation import (
+            TIME_LIMIT_MARGIN, IsolatedTestRunner
+        )
+
+        options = {}
+        if self.example_timeout is not None:
+            options['example_timeout'] = self.example_timeout
+        if timeout is not None:
+            options['time_limit'] = timeout - TIME_LIMIT_MARGIN
+        return IsolatedTestRunner, options
+
+    def _kill(self, pid, sig=signal.SIGKILL):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _wait(self, pid):
+        _, status = os.waitpid(pid, 0)
+        self.children.discard(pid)
+        return status
+
+
+def _close_fds(keep):
+    """Close the inherited file descriptors but stdio and `keep`."""
+    try:
+        fds = [int(fd) for fd in os.listdir('/proc/self/fd')]
+    except OSError:
+        os.closerange(3, keep)
+        os.closerange(keep + 1, os.sysconf('SC_OPEN_MAX'))
+        return
+
+    for fd in fds:
+        if fd > 2 and fd != keep:
+            try:
+                os.close(fd)
+            except OSError:
+                # e.g. the descriptor listdir used.
+                pass